@@ -3,6 +3,7 @@
 # This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
 # conditions defined in the file COPYING, which is part of this source code package.
 
+import marshal
 from ast import literal_eval
 from collections.abc import (
     Callable,
@@ -35,6 +36,39 @@ _TKey = TypeVar("_TKey", bound=Hashable)
 _TValue = TypeVar("_TValue")
 _TDefault = TypeVar("_TDefault")
 
+# Marks the files written with marshal. Files without it are in the old text format.
+_MARSHAL_MAGIC: Final = b"\x00mk-value-store-marshal\n"
+
+
+def _serialize_value_store(data: Mapping[_TKey, _TValue]) -> bytes:
+    """Serialize the stored values, preferably in the fast binary format
+
+    Data marshal can not handle (other mappings than dicts, subclasses of builtin
+    types) is written in the text format, just like before.
+
+    >>> _deserialize_value_store(_serialize_value_store({("a", None, "b"): [1.5, None]}))
+    {('a', None, 'b'): [1.5, None]}
+    """
+    if isinstance(data, dict):
+        try:
+            return _MARSHAL_MAGIC + marshal.dumps(data)
+        except ValueError:
+            pass
+    return repr(data).encode("utf-8")
+
+
+def _deserialize_value_store(raw: bytes) -> Mapping[Any, Any]:
+    """Deserialize the stored values, binary or text
+
+    >>> _deserialize_value_store(b"{('a', None, 'b'): 42}")
+    {('a', None, 'b'): 42}
+    >>> _deserialize_value_store(b"")
+    {}
+    """
+    if raw.startswith(_MARSHAL_MAGIC):
+        return marshal.loads(raw[len(_MARSHAL_MAGIC) :])
+    return literal_eval(raw.decode("utf-8")) if raw else {}
+
 
 class _DynamicDiskSyncedMapping(dict[_TKey, _TValue]):
     """Represents the values that have been changed in a session
@@ -79,8 +113,8 @@ class _StaticDiskSyncedMapping(Mapping[_TKey, _TValue]):
         *,
         path: Path,
         log_debug: Callable[[str], None],
-        serializer: Callable[[Mapping[_TKey, _TValue]], str],
-        deserializer: Callable[[str], Mapping[_TKey, _TValue]],
+        serializer: Callable[[Mapping[_TKey, _TValue]], bytes],
+        deserializer: Callable[[bytes], Mapping[_TKey, _TValue]],
     ) -> None:
         self._path: Final = path
         self._last_sync: float | None = None
@@ -124,14 +158,14 @@ class _StaticDiskSyncedMapping(Mapping[_TKey, _TValue]):
                 else:
                     self._log_debug("loading from disk")
                     self._data = self._deserializer(
-                        store.load_text_from_file(self._path, default="{}", lock=False)
+                        store.load_bytes_from_file(self._path, default=b"", lock=False)
                     )
 
                 if removed or updated:
                     data = {k: v for k, v in self._data.items() if k not in removed}
                     data.update(updated)
                     self._log_debug("writing to disk")
-                    store.save_text_to_file(self._path, self._serializer(data))
+                    store.save_bytes_to_file(self._path, self._serializer(data))
                     self._data = data
 
                 self._last_sync = self._path.stat().st_mtime
@@ -148,8 +182,8 @@ class _DiskSyncedMapping(MutableMapping[_TKey, _TValue]):  # pylint: disable=too
         *,
         path: Path,
         log_debug: Callable[[str], None],
-        serializer: Callable[[Mapping[_TKey, _TValue]], str],
-        deserializer: Callable[[str], Mapping[_TKey, _TValue]],
+        serializer: Callable[[Mapping[_TKey, _TValue]], bytes],
+        deserializer: Callable[[bytes], Mapping[_TKey, _TValue]],
     ) -> "_DiskSyncedMapping":
         return cls(
             dynamic=_DynamicDiskSyncedMapping(),
@@ -280,8 +314,8 @@ class ValueStoreManager:
         self._value_store: _DiskSyncedMapping[_ValueStoreKey, Any] = _DiskSyncedMapping.make(
             path=self.STORAGE_PATH / str(host_name),
             log_debug=lambda x: logger.debug("value store: %s", x),
-            serializer=repr,
-            deserializer=literal_eval,
+            serializer=_serialize_value_store,
+            deserializer=_deserialize_value_store,
         )
         self.active_service_interface: _ValueStore | None = None
         self._host_name = host_name
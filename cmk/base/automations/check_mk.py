@@ -5,22 +5,26 @@
 
 import abc
 import ast
+import collections
 import functools
 import glob
 import io
 import itertools
 import logging
+import multiprocessing
 import operator
 import os
+import queue
 import shlex
 import shutil
 import socket
 import subprocess
 import sys
 import time
-from collections.abc import Container, Iterable, Mapping, Sequence
-from contextlib import redirect_stderr, redirect_stdout, suppress
+from collections.abc import Callable, Container, Generator, Iterable, Iterator, Mapping, Sequence
+from contextlib import closing, redirect_stderr, redirect_stdout, suppress
 from itertools import islice
+from multiprocessing.pool import AsyncResult
 from pathlib import Path
 from typing import Any, cast
 
@@ -31,6 +35,7 @@ import cmk.utils.debug
 import cmk.utils.log as log
 import cmk.utils.man_pages as man_pages
 import cmk.utils.password_store
+import cmk.utils.piggyback as piggyback
 import cmk.utils.tty as tty
 from cmk.utils.agentdatatype import AgentRawData
 from cmk.utils.auto_queue import AutoQueue
@@ -577,6 +582,76 @@ class AutomationAutodiscovery(DiscoveryAutomation):
 automations.register(AutomationAutodiscovery())
 
 
+def _discover_hosts(
+    discover: Callable[[HostName], tuple[DiscoveryResult | None, bool]],
+    host_names: Sequence[HostName],
+    *,
+    max_processes: int,
+    deadline: float,
+    message: str,
+) -> Generator[tuple[HostName, tuple[DiscoveryResult | None, bool]], None, None]:
+    """Discover the hosts, either one after another or in a pool of forked processes
+
+    No new host is started after the deadline.  Hosts that are already being
+    discovered are finished, then TimeoutError is raised if hosts are left.
+    If we are interrupted (e.g. MKTimeout), the workers are terminated: They
+    would otherwise update the autochecks and the queue of hosts whose results
+    never reach us.
+    """
+    if max_processes <= 1 or len(host_names) <= 1:
+        for host_name in host_names:
+            if time.monotonic() > deadline:
+                raise TimeoutError(message)
+            yield host_name, discover(host_name)
+        return
+
+    global _autodiscovery_worker_function
+    _autodiscovery_worker_function = discover
+
+    queued = collections.deque(host_names)
+    max_workers = min(max_processes, len(host_names))
+    running: dict[HostName, AsyncResult[tuple[DiscoveryResult | None, bool]]] = {}
+    finished: queue.SimpleQueue[HostName] = queue.SimpleQueue()
+
+    def notify_finished(host_name: HostName) -> Callable[[object], None]:
+        return lambda _result: finished.put(host_name)
+
+    try:
+        # The workers are forked, so they share the already loaded configuration
+        # and plugins with this process instead of loading them again.
+        # Leaving the context terminates the pool.
+        with multiprocessing.get_context("fork").Pool(max_workers) as pool:
+            while True:
+                while queued and len(running) < max_workers and time.monotonic() <= deadline:
+                    host_name = queued.popleft()
+                    running[host_name] = pool.apply_async(
+                        _discover_host_in_worker,
+                        (host_name,),
+                        callback=notify_finished(host_name),
+                        error_callback=notify_finished(host_name),
+                    )
+                if not running:
+                    break
+                host_name = finished.get()
+                yield host_name, running.pop(host_name).get()
+
+        if queued:
+            raise TimeoutError(message)
+    finally:
+        _autodiscovery_worker_function = None
+
+
+_autodiscovery_worker_function: Callable[
+    [HostName], tuple[DiscoveryResult | None, bool]
+] | None = None
+
+
+def _discover_host_in_worker(host_name: HostName) -> tuple[DiscoveryResult | None, bool]:
+    # Set by _discover_hosts() before the workers are forked.
+    assert _autodiscovery_worker_function is not None
+    return _autodiscovery_worker_function(host_name)
+
+
 def _execute_autodiscovery() -> tuple[Mapping[HostName, DiscoveryResult], bool]:
     # pylint: disable=too-many-branches
     file_cache_options = FileCacheOptions(use_outdated=True)
@@ -634,6 +709,60 @@ def _execute_autodiscovery() -> tuple[Mapping[HostName, DiscoveryResult], bool]:
     activation_required = False
     rediscovery_reference_time = time.time()
 
+    def discover(host_name: HostName) -> tuple[DiscoveryResult | None, bool]:
+        def section_error_handling(
+            section_name: SectionName,
+            raw_data: Sequence[object],
+        ) -> str:
+            return create_section_crash_dump(
+                operation="parsing",
+                section_name=section_name,
+                section_content=raw_data,
+                host_name=host_name,
+                rtc_package=None,
+            )
+
+        console.verbose(f"{tty.bold}{host_name}{tty.normal}:\n")
+        params = config_cache.discovery_check_parameters(host_name)
+        if params.commandline_only:
+            console.verbose("  failed: discovery check disabled\n")
+            return None, False
+
+        with plugin_contexts.current_host(host_name):
+            hosts_config = config_cache.hosts_config
+            return autodiscovery(
+                host_name,
+                is_cluster=host_name in config_cache.hosts_config.clusters,
+                cluster_nodes=config_cache.nodes_of(host_name) or (),
+                active_hosts={
+                    hn
+                    for hn in itertools.chain(hosts_config.hosts, hosts_config.clusters)
+                    if config_cache.is_active(hn) and config_cache.is_online(hn)
+                },
+                ruleset_matcher=ruleset_matcher,
+                parser=parser,
+                fetcher=fetcher,
+                summarizer=CMKSummarizer(config_cache, host_name, override_non_ok_state=None),
+                section_plugins=section_plugins,
+                section_error_handling=section_error_handling,
+                host_label_plugins=host_label_plugins,
+                plugins=plugins,
+                ignore_service=config_cache.service_ignored,
+                ignore_plugin=config_cache.check_plugin_ignored,
+                get_effective_host=config_cache.effective_host,
+                get_service_description=(
+                    functools.partial(get_service_description, ruleset_matcher)
+                ),
+                schedule_discovery_check=_schedule_discovery_check,
+                rediscovery_parameters=params.rediscovery,
+                invalidate_host_config=config_cache.invalidate_host_config,
+                autodiscovery_queue=autodiscovery_queue,
+                reference_time=rediscovery_reference_time,
+                oldest_queued=oldest_queued,
+                enforced_services=config_cache.enforced_services_table(host_name),
+                on_error=on_error,
+            )
+
     hosts_processed = set()
     discovery_results = {}
 
@@ -642,70 +771,20 @@ def _execute_autodiscovery() -> tuple[Mapping[HostName, DiscoveryResult], bool]:
     message = f"  Timeout of {limit} seconds reached. Let's do the remaining hosts next time."
 
     try:
-        with Timeout(limit + 10, message=message):
-            for host_name in autodiscovery_queue:
-                if time.monotonic() > start + limit:
-                    raise TimeoutError(message)
-
-                if host_name not in process_hosts:
-                    continue
-
-                def section_error_handling(
-                    section_name: SectionName,
-                    raw_data: Sequence[object],
-                    host_name: HostName = host_name,
-                ) -> str:
-                    return create_section_crash_dump(
-                        operation="parsing",
-                        section_name=section_name,
-                        section_content=raw_data,
-                        host_name=host_name,
-                        rtc_package=None,
-                    )
-
+        # Closing the hosts' discovery terminates the workers still running.
+        with Timeout(limit + 10, message=message), closing(
+            _discover_hosts(
+                discover,
+                # Hosts that wait the longest are discovered first, so that no
+                # host starves if the queue can not be processed in one run.
+                [hn for hn in autodiscovery_queue.oldest_first() if hn in process_hosts],
+                max_processes=config.autodiscovery_max_processes,
+                deadline=start + limit,
+                message=message,
+            )
+        ) as discovered_hosts:
+            for host_name, (discovery_result, activate_host) in discovered_hosts:
                 hosts_processed.add(host_name)
-                console.verbose(f"{tty.bold}{host_name}{tty.normal}:\n")
-                params = config_cache.discovery_check_parameters(host_name)
-                if params.commandline_only:
-                    console.verbose("  failed: discovery check disabled\n")
-                    discovery_result, activate_host = None, False
-                else:
-                    with plugin_contexts.current_host(host_name):
-                        hosts_config = config_cache.hosts_config
-                        discovery_result, activate_host = autodiscovery(
-                            host_name,
-                            is_cluster=host_name in config_cache.hosts_config.clusters,
-                            cluster_nodes=config_cache.nodes_of(host_name) or (),
-                            active_hosts={
-                                hn
-                                for hn in itertools.chain(hosts_config.hosts, hosts_config.clusters)
-                                if config_cache.is_active(hn) and config_cache.is_online(hn)
-                            },
-                            ruleset_matcher=ruleset_matcher,
-                            parser=parser,
-                            fetcher=fetcher,
-                            summarizer=CMKSummarizer(
-                                config_cache, host_name, override_non_ok_state=None
-                            ),
-                            section_plugins=section_plugins,
-                            section_error_handling=section_error_handling,
-                            host_label_plugins=host_label_plugins,
-                            plugins=plugins,
-                            ignore_service=config_cache.service_ignored,
-                            ignore_plugin=config_cache.check_plugin_ignored,
-                            get_effective_host=config_cache.effective_host,
-                            get_service_description=(
-                                functools.partial(get_service_description, ruleset_matcher)
-                            ),
-                            schedule_discovery_check=_schedule_discovery_check,
-                            rediscovery_parameters=params.rediscovery,
-                            invalidate_host_config=config_cache.invalidate_host_config,
-                            autodiscovery_queue=autodiscovery_queue,
-                            reference_time=rediscovery_reference_time,
-                            oldest_queued=oldest_queued,
-                            enforced_services=config_cache.enforced_services_table(host_name),
-                            on_error=on_error,
-                        )
                 if discovery_result:
                     discovery_results[host_name] = discovery_result
                     activation_required |= activate_host
@@ -713,6 +792,20 @@ def _execute_autodiscovery() -> tuple[Mapping[HostName, DiscoveryResult], bool]:
     except (MKTimeout, TimeoutError) as exc:
         console.verbose(str(exc))
 
+    duration = time.monotonic() - start
+    oldest_remaining = autodiscovery_queue.oldest()
+    console.verbose(
+        f"Autodiscovery: Processed {len(hosts_processed)} hosts in {duration:.1f} seconds "
+        f"({len(hosts_processed) / max(duration, 0.001):.1f} hosts/s), "
+        f"{len(autodiscovery_queue)} hosts left in queue"
+        + (
+            ""
+            if oldest_remaining is None
+            else f" (oldest queued {rediscovery_reference_time - oldest_remaining:.0f} seconds ago)"
+        )
+        + "\n"
+    )
+
     if not activation_required:
         return discovery_results, False
 
@@ -990,6 +1083,9 @@ class AutomationRenameHosts(Automation):
                 if self._rename_host_file(piggybase + piggydir, oldname, newname):
                     actions.append("piggyback-pig")
 
+        if piggyback.rename_host_in_piggyback_indexes(HostName(oldname), HostName(newname)):
+            actions.append("piggyback-index")
+
         # Logwatch
         if self._rename_host_dir(logwatch_dir, oldname, newname):
             actions.append("logwatch")
@@ -1001,6 +1097,9 @@ class AutomationRenameHosts(Automation):
         # HW/SW-Inventory
         if self._rename_host_file(var_dir + "/inventory", oldname, newname):
             self._rename_host_file(var_dir + "/inventory", oldname + ".gz", newname + ".gz")
+            self._rename_host_file(
+                var_dir + "/inventory", oldname + ".indexed", newname + ".indexed"
+            )
             actions.append("inv")
 
         if self._rename_host_dir(var_dir + "/inventory_archive", oldname, newname):
@@ -1465,6 +1564,7 @@ class AutomationDeleteHosts(ABCDeleteHosts, Automation):
             f"{var_dir}/persisted/{hostname}",
             f"{var_dir}/inventory/{hostname}",
             f"{var_dir}/inventory/{hostname}.gz",
+            f"{var_dir}/inventory/{hostname}.indexed",
             f"{var_dir}/agent_deployment/{hostname}",
         ]
 
@@ -1506,6 +1606,7 @@ class AutomationDeleteHostsKnownRemote(ABCDeleteHosts, Automation):
             f"{var_dir}/persisted/{hostname}",
             f"{var_dir}/inventory/{hostname}",
             f"{var_dir}/inventory/{hostname}.gz",
+            f"{var_dir}/inventory/{hostname}.indexed",
         ]
 
     def _delete_host_files(self, hostname: HostName) -> None:
@@ -2100,6 +2201,7 @@ class AutomationDiagHost(Automation):
             snmpv3_contexts_skip_on_timeout=snmp_config.snmpv3_contexts_skip_on_timeout,
             character_encoding=snmp_config.character_encoding,
             snmp_backend=snmp_config.snmp_backend,
+            batch_table_walks=snmp_config.batch_table_walks,
         )
 
         data = get_snmp_table(
@@ -10,7 +10,9 @@ from __future__ import annotations
 import functools
 import itertools
 import logging
+import posix
 from collections.abc import Callable, Container, Iterable, Iterator, Mapping, Sequence
+from concurrent.futures import ThreadPoolExecutor
 from functools import partial
 from typing import Final
 
@@ -31,7 +33,7 @@ from cmk.utils.timeperiod import timeperiod_active
 
 from cmk.snmplib import SNMPBackendEnum, SNMPRawData
 
-from cmk.fetchers import Fetcher, get_raw_data, Mode
+from cmk.fetchers import Fetcher, FetcherType, get_raw_data, Mode
 from cmk.fetchers.filecache import FileCache, FileCacheOptions, MaxAge
 
 from cmk.checkengine.checking import (
@@ -89,18 +91,85 @@ __all__ = [
 
 
 def _fetch_all(
-    sources: Iterable[Source], *, simulation: bool, file_cache_options: FileCacheOptions, mode: Mode
+    sources: Iterable[Source],
+    *,
+    simulation: bool,
+    file_cache_options: FileCacheOptions,
+    mode: Mode,
+    max_workers: int = 1,
 ) -> Sequence[tuple[SourceInfo, result.Result[AgentRawData | SNMPRawData, Exception], Snapshot,]]:
     console.verbose("%s+%s %s\n", tty.yellow, tty.normal, "Fetching data".upper())
-    return [
-        _do_fetch(
+    jobs = [
+        (
             source.source_info(),
-            source.file_cache(simulation=simulation, file_cache_options=file_cache_options),
-            source.fetcher(),
-            mode=mode,
+            partial(
+                _do_fetch,
+                source.source_info(),
+                source.file_cache(simulation=simulation, file_cache_options=file_cache_options),
+                source.fetcher(),
+                mode=mode,
+            ),
         )
         for source in sources
     ]
+    # The fetchers of a host are independent of each other (different
+    # file caches, different connections), so we can wait for them at the
+    # same time.  Only the SNMP fetchers (e.g. of the host and of its management
+    # board) share the global single OID cache of the SNMP scan, so they are run
+    # one after the other.
+    snmp_jobs = [
+        index
+        for index, (source_info, _job) in enumerate(jobs)
+        if source_info.fetcher_type is FetcherType.SNMP
+    ]
+    job_groups = ([snmp_jobs] if snmp_jobs else []) + [
+        [index] for index in range(len(jobs)) if index not in snmp_jobs
+    ]
+    if max_workers <= 1 or len(job_groups) <= 1:
+        return [job() for _source_info, job in jobs]
+
+    executor = ThreadPoolExecutor(
+        max_workers=min(max_workers, len(job_groups)), thread_name_prefix="fetcher"
+    )
+    try:
+        with CPUTracker() as tracker:
+            fetched_groups = list(
+                executor.map(
+                    lambda job_group: [(index, jobs[index][1]()) for index in job_group],
+                    job_groups,
+                )
+            )
+    finally:
+        # Don't wait for outstanding fetchers if we are interrupted (e.g. MKTimeout).
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    # The results are returned in the order of `sources`.
+    fetched = dict(itertools.chain.from_iterable(fetched_groups))
+    return _distribute_duration([fetched[index] for index in range(len(jobs))], tracker.duration)
+
+
+def _distribute_duration(
+    fetched: Sequence[
+        tuple[SourceInfo, result.Result[AgentRawData | SNMPRawData, Exception], Snapshot]
+    ],
+    duration: Snapshot,
+) -> Sequence[tuple[SourceInfo, result.Result[AgentRawData | SNMPRawData, Exception], Snapshot,]]:
+    """Distribute the duration of all concurrent fetches among the sources
+
+    The snapshots of the single fetchers measure the whole process while the
+    others are running as well.  Summing them up would count the overlapping
+    times several times, so we split the duration of the whole pool according
+    to the elapsed time of each fetcher instead.
+    """
+    total_elapsed = sum(snapshot.process.elapsed for _info, _raw, snapshot in fetched)
+    weights = [
+        snapshot.process.elapsed / total_elapsed if total_elapsed else 1.0 / len(fetched)
+        for _info, _raw, snapshot in fetched
+    ]
+    return [
+        (source_info, raw_data, Snapshot(posix.times_result(v * weight for v in duration.process)))
+        for (source_info, raw_data, _snapshot), weight in zip(fetched, weights)
+    ]
 
 
 def _do_fetch(
@@ -296,6 +365,7 @@ class CMKFetcher:
             simulation=self.simulation_mode,
             file_cache_options=self.file_cache_options,
             mode=self.mode,
+            max_workers=config.max_concurrent_fetches,
         )
 
 
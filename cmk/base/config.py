@@ -132,6 +132,7 @@ from cmk.checkengine.parser import (
     NO_SELECTION,
     SectionNameCollection,
 )
+from cmk.checkengine.sectionparser import parsed_sections_cache
 
 import cmk.base.api.agent_based.register as agent_based_register
 import cmk.base.default_config as default_config
@@ -523,6 +524,7 @@ def _perform_post_config_loading_actions() -> None:
     """These tasks must be performed after loading the Check_MK base configuration"""
     # First cleanup things (needed for e.g. reloading the config)
     cache_manager.clear_all()
+    parsed_sections_cache.configure(maxsize=parsed_sections_cache_size)
 
     global_dict = globals()
     _collect_parameter_rulesets_from_globals(global_dict)
@@ -2140,6 +2142,9 @@ class ConfigCache:
                 snmpv3_contexts_skip_on_timeout=True,
                 character_encoding=self._snmp_character_encoding(host_name),
                 snmp_backend=self.get_snmp_backend(host_name),
+                batch_table_walks=self.ruleset_matcher.get_host_bool_value(
+                    host_name, snmp_batch_table_walks
+                ),
             ),
         )
 
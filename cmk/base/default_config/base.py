@@ -71,6 +71,15 @@ check_mk_perfdata_with_times = True
 debug_log = False  # deprecated
 monitoring_host: str | None = None  # deprecated
 max_num_processes = 50
+# Number of data sources of a single host (or of all nodes of a cluster)
+# that are fetched concurrently. 1 means: fetch one after another.
+max_concurrent_fetches = 1
+# Number of hosts that are discovered concurrently (in forked processes) by the
+# automatic service discovery. 1 means: discover one host after another.
+autodiscovery_max_processes = 1
+# Number of parse results kept in memory and shared by checking, inventory and
+# discovery of a process (e.g. a keepalive helper). 0 disables the cache.
+parsed_sections_cache_size = 0
 fallback_agent_output_encoding = "latin-1"
 stored_passwords: dict[str, Password] = {}
 # Collection of predefined rule conditions. For the moment this setting is only stored
@@ -219,6 +228,7 @@ tcp_hosts: list = [
 cmk_agent_connection: dict[HostName, Literal["pull-agent", "push-agent"]] = {}
 bulkwalk_hosts: list[RuleSpec[bool]] = []
 snmpv2c_hosts: list[RuleSpec[bool]] = []
+snmp_batch_table_walks: list[RuleSpec[bool]] = []
 snmp_without_sys_descr: list[RuleSpec[bool]] = []
 snmpv3_contexts: list[RuleSpec[tuple[str | None, Sequence[str]]]] = []
 usewalk_hosts: list[RuleSpec[bool]] = []
@@ -7,8 +7,12 @@ from __future__ import annotations
 
 import enum
 import socket
-from collections.abc import Iterable, Iterator, Mapping, MutableMapping, Sequence
+import time
+from collections.abc import Callable, Iterable, Iterator, Mapping, MutableMapping, Sequence
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
 from contextlib import contextmanager
+from functools import partial
 from pathlib import Path
 from typing import Any, NamedTuple
 
@@ -24,6 +28,11 @@ from cmk.snmplib import SNMPBackendEnum  # pylint: disable=cmk-module-layer-viol
 
 IPLookupCacheId = tuple[HostName | HostAddress, socket.AddressFamily]
 
+# Used by update_dns_cache(): The number of concurrent DNS lookups and the
+# time in seconds after which a single lookup is considered to have failed.
+_DNS_LOOKUP_MAX_WORKERS = 32
+_DNS_LOOKUP_TIMEOUT = 30.0
+
 
 _fake_dns: HostAddress | None = None
 _enforce_localhost = False
@@ -102,6 +111,35 @@ def lookup_ip_address(
     force_file_cache_renewal: bool,
 ) -> HostAddress | None:
     """This function *may* look up an IP address, or return a host name"""
+    ip_address = _lookup_ip_address_without_dns(
+        host_name=host_name,
+        family=family,
+        configured_ip_address=configured_ip_address,
+        simulation_mode=simulation_mode,
+        is_snmp_usewalk_host=is_snmp_usewalk_host,
+        override_dns=override_dns,
+        is_dyndns_host=is_dyndns_host,
+    )
+    if isinstance(ip_address, socket.AddressFamily):
+        return cached_dns_lookup(
+            host_name,
+            family=ip_address,
+            force_file_cache_renewal=force_file_cache_renewal,
+        )
+    return ip_address
+
+
+def _lookup_ip_address_without_dns(
+    *,
+    host_name: HostName | HostAddress,
+    family: AddressFamily | socket.AddressFamily,
+    configured_ip_address: HostAddress | None,
+    simulation_mode: bool,
+    is_snmp_usewalk_host: bool,
+    override_dns: HostAddress | None,
+    is_dyndns_host: bool,
+) -> HostAddress | socket.AddressFamily | None:
+    """Return the address if it is known without DNS, or the family to look up via DNS"""
     # Quick hack, where all IP addresses are faked (--fake-dns)
     if _fake_dns:
         return _fake_dns
@@ -128,14 +166,10 @@ def lookup_ip_address(
     if family is AddressFamily.NO_IP:
         return None
 
-    return cached_dns_lookup(
-        host_name,
-        # NO_IP handled in guard.
-        # TODO(ml): [IPv6] Default to IPv4 for DUAL_STACK.  Why doesn't this
-        # obey `default_address_family()` or handle both addresses in that case?
-        family=socket.AF_INET if AddressFamily.IPv4 in family else socket.AF_INET6,
-        force_file_cache_renewal=force_file_cache_renewal,
-    )
+    # NO_IP handled in guard.
+    # TODO(ml): [IPv6] Default to IPv4 for DUAL_STACK.  Why doesn't this
+    # obey `default_address_family()` or handle both addresses in that case?
+    return socket.AF_INET if AddressFamily.IPv4 in family else socket.AF_INET6
 
 
 # Variables needed during the renaming of hosts (see automation.py)
@@ -365,6 +399,8 @@ def update_dns_cache(
     # will just clear the cache.
     simulation_mode: bool,
     override_dns: HostAddress | None,
+    max_workers: int = _DNS_LOOKUP_MAX_WORKERS,
+    lookup_timeout: float | None = _DNS_LOOKUP_TIMEOUT,
 ) -> tuple[int, Sequence[HostName]]:
     failed = []
 
@@ -376,10 +412,11 @@ def update_dns_cache(
 
         console.verbose("Updating DNS cache...\n")
         # `_annotate_family()` handles DUAL_STACK and NO_IP
-        for host_name, host_config, family in _annotate_family(ip_lookup_configs):
-            console.verbose(f"{host_name} ({family})...")
-            try:
-                ip = lookup_ip_address(
+        lookups = [
+            (
+                host_name,
+                family,
+                _lookup_ip_address_without_dns(
                     host_name=host_name,
                     family=family,
                     configured_ip_address=(
@@ -394,30 +431,118 @@ def update_dns_cache(
                     ),
                     override_dns=override_dns,
                     is_dyndns_host=host_config.is_dyndns_host,
-                    force_file_cache_renewal=True,  # it's cleared anyway
-                )
+                ),
+            )
+            for host_name, host_config, family in _annotate_family(ip_lookup_configs)
+        ]
+        # The DNS lookups are the slow part.  They are independent of each
+        # other, so we resolve them concurrently and only update the cache
+        # (and the output) in the original order afterwards.
+        resolved = iter(
+            _resolve_concurrently(
+                [
+                    (host_name, dns_family)
+                    for host_name, _family, dns_family in lookups
+                    if isinstance(dns_family, socket.AddressFamily)
+                ],
+                max_workers=max_workers,
+                timeout=lookup_timeout,
+            )
+        )
+        for host_name, family, ip in lookups:
+            console.verbose(f"{host_name} ({family})...")
+            if not isinstance(ip, socket.AddressFamily):
                 console.verbose(f"{ip}\n")
+                continue
 
-            except (MKTerminate, MKTimeout):
-                # We should be more specific with the exception handler below, then we
-                # could drop this special handling here
-                raise
-            except MKIPAddressLookupError as e:
+            result = next(resolved)
+            if isinstance(result, MKIPAddressLookupError):
                 failed.append(host_name)
-                console.verbose("lookup failed: %s\n" % e)
+                console.verbose("lookup failed: %s\n" % result)
                 continue
-            except Exception as e:
+            if isinstance(result, Exception):
                 failed.append(host_name)
-                console.verbose("lookup failed: %s\n" % e)
+                console.verbose("lookup failed: %s\n" % result)
                 if cmk.utils.debug.enabled():
-                    raise
+                    raise result
                 continue
 
+            ip_lookup_cache[(host_name, ip)] = result
+            console.verbose(f"{result}\n")
+
     ip_lookup_cache.save_persisted()
 
     return len(ip_lookup_cache), failed
 
 
+def _resolve_concurrently(
+    lookups: Sequence[IPLookupCacheId],
+    *,
+    max_workers: int,
+    timeout: float | None,
+) -> Sequence[HostAddress | Exception]:
+    """Look up the given host names via DNS, at most `max_workers` at a time
+
+    The results are returned in the order of `lookups`.  Failed lookups and
+    lookups that take longer than `timeout` seconds are reported as exceptions.
+    """
+    if not lookups:
+        return []
+
+    started: dict[int, float] = {}
+
+    def lookup(index: int) -> HostAddress:
+        started[index] = time.monotonic()
+        host_name, family = lookups[index]
+        return _actual_dns_lookup(host_name=host_name, family=family)
+
+    executor = ThreadPoolExecutor(
+        max_workers=max(1, min(max_workers, len(lookups))), thread_name_prefix="dns"
+    )
+    try:
+        futures = [executor.submit(lookup, index) for index in range(len(lookups))]
+        return [
+            _wait_for_lookup(future, partial(started.get, index), lookups[index], timeout)
+            for index, future in enumerate(futures)
+        ]
+    finally:
+        # Don't wait for hanging lookups (or if we are interrupted, e.g. MKTimeout).
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _wait_for_lookup(
+    future: Future[HostAddress],
+    started: Callable[[], float | None],
+    lookup: IPLookupCacheId,
+    timeout: float | None,
+) -> HostAddress | Exception:
+    while True:
+        # The timeout applies from the moment the lookup actually started,
+        # not from the moment it was queued.
+        started_at = started()
+        try:
+            return future.result(
+                timeout=(
+                    timeout
+                    if timeout is None or started_at is None
+                    else max(0.0, started_at + timeout - time.monotonic())
+                )
+            )
+        except FutureTimeoutError:
+            if started_at is None:
+                continue
+            host_name, family = lookup
+            family_str = {socket.AF_INET: "IPv4", socket.AF_INET6: "IPv6"}[family]
+            return MKIPAddressLookupError(
+                f"Failed to lookup {family_str} address of {host_name} via DNS: "
+                f"Timed out after {timeout} seconds"
+            )
+        except (MKTerminate, MKTimeout):
+            raise
+        except Exception as e:
+            return e
+
+
 def _annotate_family(
     ip_lookup_configs: Iterable[IPLookupConfig],
 ) -> Iterable[tuple[HostName, IPLookupConfig, socket.AddressFamily]]:
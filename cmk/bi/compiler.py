@@ -6,10 +6,14 @@
 from __future__ import annotations
 
 import ast
+import hashlib
+import multiprocessing
 import os
 import pickle
 import time
+from collections.abc import Iterator, Mapping, Sequence
 from pathlib import Path
+from typing import Any
 
 from redis import Redis
 from typing_extensions import TypedDict
@@ -24,7 +28,7 @@ from cmk.utils.redis import get_redis_client
 from cmk.bi.aggregation import BIAggregation
 from cmk.bi.data_fetcher import BIStructureFetcher, get_cache_dir, SiteProgramStart
 from cmk.bi.lib import SitesCallback
-from cmk.bi.packs import BIAggregationPacks
+from cmk.bi.packs import BIAggregationPacks, RuleNotFoundException
 from cmk.bi.searcher import BISearcher
 from cmk.bi.trees import BICompiledAggregation, BICompiledRule, FrozenBIInfo
 from cmk.bi.type_defs import frozen_aggregations_dir
@@ -36,6 +40,16 @@ class ConfigStatus(TypedDict):
     online_sites: set[SiteProgramStart]
 
 
+# Aggregations and searcher of the running compilation, inherited by the forked workers
+_compilation_context: tuple[Mapping[str, BIAggregation], BISearcher] | None = None
+
+
+def _compile_serialized(aggr_id: str) -> dict[str, Any]:
+    assert _compilation_context is not None
+    aggregations, bi_searcher = _compilation_context
+    return aggregations[aggr_id].compile(bi_searcher).serialize()
+
+
 class BICompiler:
     def __init__(self, bi_configuration_file: str, sites_callback: SitesCallback) -> None:
         self._sites_callback = sites_callback
@@ -47,6 +61,7 @@ class BICompiler:
         self._path_compilation_timestamp = Path(get_cache_dir(), "last_compilation")
         self._path_compiled_aggregations = Path(get_cache_dir(), "compiled_aggregations")
         self._path_compiled_aggregations.mkdir(parents=True, exist_ok=True)
+        self._path_compilation_fingerprints = Path(get_cache_dir(), "compilation_fingerprints")
 
         self._redis_client: Redis[str] | None = None
         self._setup()
@@ -217,17 +232,42 @@ class BICompiler:
 
             self.prepare_for_compilation(current_configstatus["online_sites"])
 
-            # Compile the raw tree
+            # Only compile the aggregations whose configuration, used rules or
+            # underlying structure data changed since their last compilation
             all_aggregations_by_id: dict[str, BIAggregation] = {
                 x.id: x for x in self._bi_packs.get_all_aggregations()
             }
-            for aggregation in all_aggregations_by_id.values():
-                start = time.time()
-                self._compiled_aggregations[aggregation.id] = aggregation.compile(self.bi_searcher)
-                self._logger.debug(f"Compilation of {aggregation.id} took {time.time() - start:f}")
+            structure_fingerprint = self._bi_structure_fetcher.get_structure_fingerprint()
+            fingerprints = {
+                aggr_id: self._aggregation_fingerprint(aggregation, structure_fingerprint)
+                for aggr_id, aggregation in all_aggregations_by_id.items()
+            }
+            previous_fingerprints = self._load_compilation_fingerprints()
+            outdated_ids = [
+                aggr_id
+                for aggr_id, fingerprint in fingerprints.items()
+                if not fingerprint
+                or fingerprint != previous_fingerprints.get(aggr_id)
+                or not self._path_compiled_aggregations.joinpath(aggr_id).exists()
+            ]
+            self._logger.debug(
+                "Compiling %d of %d aggregations" % (len(outdated_ids), len(fingerprints))
+            )
+
+            compiled_aggregations = dict(
+                self._compile_aggregations(all_aggregations_by_id, outdated_ids)
+            )
+            self._compiled_aggregations = {
+                aggr_id: compiled_aggregations[aggr_id]
+                if aggr_id in compiled_aggregations
+                else BIAggregation.create_trees_from_schema(
+                    self._load_data(self._path_compiled_aggregations.joinpath(aggr_id))
+                )
+                for aggr_id in all_aggregations_by_id
+            }
             self._verify_aggregation_title_uniqueness(self._compiled_aggregations)
 
-            for aggr_id, compiled_aggr in self._compiled_aggregations.items():
+            for aggr_id, compiled_aggr in compiled_aggregations.items():
                 start = time.time()
                 result = compiled_aggr.serialize()
                 self._logger.debug(
@@ -235,6 +275,7 @@ class BICompiler:
                     % (aggr_id, time.time() - start, len(compiled_aggr.branches))
                 )
                 self._save_data(self._path_compiled_aggregations.joinpath(aggr_id), result)
+            store.save_object_to_file(self._path_compilation_fingerprints, fingerprints)
 
             self._compiled_aggregations = self._manage_frozen_branches(self._compiled_aggregations)
             self._generate_part_of_aggregation_lookup(self._compiled_aggregations)
@@ -246,6 +287,54 @@ class BICompiler:
             str(self._path_compilation_timestamp), str(current_configstatus["configfile_timestamp"])
         )
 
+    def _compile_aggregations(
+        self, aggregations: Mapping[str, BIAggregation], aggr_ids: Sequence[str]
+    ) -> Iterator[tuple[str, BICompiledAggregation]]:
+        """Compile the given aggregations, in worker processes if there are several"""
+        global _compilation_context
+        processes = min(len(aggr_ids), max(1, (os.cpu_count() or 1) - 1))
+        if processes < 2:
+            for aggr_id in aggr_ids:
+                start = time.time()
+                compiled_aggr = aggregations[aggr_id].compile(self.bi_searcher)
+                self._logger.debug(f"Compilation of {aggr_id} took {time.time() - start:f}")
+                yield aggr_id, compiled_aggr
+            return
+
+        # The workers are forked, so they share the loaded configuration and structure data
+        _compilation_context = (aggregations, self.bi_searcher)
+        try:
+            start = time.time()
+            with multiprocessing.get_context("fork").Pool(processes) as pool:
+                for aggr_id, result in zip(aggr_ids, pool.imap(_compile_serialized, aggr_ids)):
+                    yield aggr_id, BIAggregation.create_trees_from_schema(result)
+            self._logger.debug(
+                f"Compilation of {len(aggr_ids)} aggregations with {processes} processes"
+                f" took {time.time() - start:f}"
+            )
+        finally:
+            _compilation_context = None
+
+    def _aggregation_fingerprint(
+        self, aggregation: BIAggregation, structure_fingerprint: str
+    ) -> str:
+        """Identifies everything the compiled aggregation depends on
+
+        An empty fingerprint means the dependencies are unknown."""
+        try:
+            rules = [
+                self._bi_packs.get_rule_mandatory(rule_id).serialize()
+                for rule_id in sorted(self._bi_packs.get_rule_ids_of_aggregation(aggregation.id))
+            ]
+        except RuleNotFoundException:
+            return ""
+        return hashlib.sha256(
+            repr((aggregation.serialize(), rules, structure_fingerprint)).encode()
+        ).hexdigest()
+
+    def _load_compilation_fingerprints(self) -> dict[str, str]:
+        return store.load_object_from_file(self._path_compilation_fingerprints, default={})
+
     def _cleanup_vanished_aggregations(self) -> None:
         valid_aggregations = list(self._compiled_aggregations.keys())
         for path_object in self._path_compiled_aggregations.iterdir():
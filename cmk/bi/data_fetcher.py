@@ -3,13 +3,20 @@
 # This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
 # conditions defined in the file COPYING, which is part of this source code package.
 
+import hashlib
 import marshal
 import os
 import time
-from collections.abc import Mapping
+from collections.abc import Mapping, Sequence
 from pathlib import Path
 
-from livestatus import LivestatusColumn, LivestatusOutputFormat, LivestatusResponse, SiteId
+from livestatus import (
+    LivestatusColumn,
+    LivestatusOutputFormat,
+    LivestatusResponse,
+    LivestatusRow,
+    SiteId,
+)
 
 from cmk.utils.hostaddress import HostName
 from cmk.utils.paths import tmp_dir
@@ -29,6 +36,13 @@ from cmk.bi.trees import BICompiledAggregation, BICompiledRule
 
 SiteProgramStart = tuple[SiteId, int]
 
+# Sites with more required hosts are queried for all their hosts instead of
+# using a host filter. The core slows down if the filter gets too big.
+MAX_FILTERED_HOSTS = 1000
+
+# Seconds the complete host status of a site is reused for
+STATUS_SNAPSHOT_TTL = 5
+
 #   .--Defines-------------------------------------------------------------.
 #   |                  ____        __ _                                    |
 #   |                 |  _ \  ___ / _(_)_ __   ___  ___                    |
@@ -82,6 +96,35 @@ class BIStructureFetcher:
     def hosts(self) -> dict[str, BIHostData]:
         return self._hosts
 
+    def get_structure_fingerprint(self) -> str:
+        """Return a digest of the loaded structure data
+
+        The digest does not depend on the order of the hosts, services, tags and labels.
+        """
+        digest = hashlib.sha256()
+        for host_name in sorted(self._hosts):
+            host = self._hosts[host_name]
+            digest.update(
+                repr(
+                    (
+                        host_name,
+                        host.site_id,
+                        sorted(host.tags),
+                        sorted(host.labels.items()),
+                        host.folder,
+                        sorted(
+                            (description, sorted(service.tags), sorted(service.labels.items()))
+                            for description, service in host.services.items()
+                        ),
+                        host.children,
+                        host.parents,
+                        host.alias,
+                        host.name,
+                    )
+                ).encode()
+            )
+        return digest.hexdigest()
+
     def get_cached_program_starts(self) -> set[SiteProgramStart]:
         return {
             (site_id, timestamp)
@@ -287,6 +330,9 @@ class BIStructureFetcher:
 
 
 class BIStatusFetcher(ABCBIStatusFetcher):
+    # Status of all hosts of a site, by status cache scope and site
+    _status_snapshots: dict[tuple[str, SiteId], tuple[float, list[LivestatusRow]]] = {}
+
     def set_assumed_states(self, assumed_states: dict) -> None:
         # Streamline format to site, host, service (may be None)
         self.assumed_states = {}
@@ -325,25 +371,99 @@ class BIStatusFetcher(ABCBIStatusFetcher):
             return {}
 
         # Query each site only for hosts that that site provides
-        req_hosts: set[HostName] = set()
-        req_sites: set[SiteId] = set()
-
+        req_hosts_by_site: dict[SiteId, set[HostName]] = {}
         for site, host, _service in required_elements:
-            req_hosts.add(host)
-            req_sites.add(site)
-
-        # TODO: the cmc slows down if the host filter gets too big
-        #       fetch all hosts if the filter exceeds 1000 hosts
-        host_filter = "".join(f"Filter: name = {host}\n" for host in req_hosts)
-        if len(req_hosts) > 1:
-            host_filter += f"Or: {len(req_hosts)}\n"
+            req_hosts_by_site.setdefault(site, set()).add(host)
 
-        query = "GET hosts\nColumns: %s\n" % " ".join(self.get_status_columns()) + host_filter
-        return self.create_bi_status_data(
-            self.sites_callback.query(
-                query, list(req_sites), output_format=LivestatusOutputFormat.JSON
+        # Large sites are queried for all of their hosts, which are shared for a few seconds
+        snapshot_sites = [
+            site
+            for site, hosts in req_hosts_by_site.items()
+            if len(hosts) > MAX_FILTERED_HOSTS or self._has_status_snapshot(site)
+        ]
+        rows = self._get_status_rows_of_all_hosts(snapshot_sites)
+        rows.extend(
+            self._get_status_rows_of_hosts(
+                {
+                    site: hosts
+                    for site, hosts in req_hosts_by_site.items()
+                    if site not in snapshot_sites
+                }
             )
         )
+        return self.create_bi_status_data(
+            LivestatusResponse([row for row in rows if row[1] in req_hosts_by_site.get(row[0], ())])
+        )
+
+    def _get_status_rows_of_hosts(
+        self, hosts_by_site: Mapping[SiteId, set[HostName]]
+    ) -> list[LivestatusRow]:
+        """Fetch the status of the given hosts, with at most MAX_FILTERED_HOSTS per query"""
+        host_names = sorted({host for hosts in hosts_by_site.values() for host in hosts})
+        rows: list[LivestatusRow] = []
+        for chunk_start in range(0, len(host_names), MAX_FILTERED_HOSTS):
+            chunk = host_names[chunk_start : chunk_start + MAX_FILTERED_HOSTS]
+            host_filter = "".join(f"Filter: name = {host}\n" for host in chunk)
+            if len(chunk) > 1:
+                host_filter += f"Or: {len(chunk)}\n"
+
+            query = "GET hosts\nColumns: %s\n" % " ".join(self.get_status_columns()) + host_filter
+            rows.extend(
+                self.sites_callback.query(
+                    query,
+                    [site for site, hosts in hosts_by_site.items() if hosts.intersection(chunk)],
+                    output_format=LivestatusOutputFormat.JSON,
+                )
+            )
+        return rows
+
+    def _status_cache_scope(self) -> str | None:
+        if self.sites_callback.status_cache_scope is None:
+            return None
+        return self.sites_callback.status_cache_scope()
+
+    def _has_status_snapshot(self, site: SiteId) -> bool:
+        if (scope := self._status_cache_scope()) is None:
+            return False
+        snapshot = self._status_snapshots.get((scope, site))
+        return snapshot is not None and time.time() - snapshot[0] <= STATUS_SNAPSHOT_TTL
+
+    def _get_status_rows_of_all_hosts(self, sites: Sequence[SiteId]) -> list[LivestatusRow]:
+        """Fetch the status of all hosts of the given sites
+
+        The result of each site is shared with the other status fetchers of this process
+        for a few seconds, if the sites callback tells whose status it fetches.
+        """
+        now = time.time()
+        snapshots = self._status_snapshots
+        for key, (timestamp, _rows) in list(snapshots.items()):
+            if now - timestamp > STATUS_SNAPSHOT_TTL:
+                snapshots.pop(key, None)
+
+        scope = self._status_cache_scope()
+        rows: list[LivestatusRow] = []
+        missing_sites = []
+        for site in sites:
+            if scope is not None and (snapshot := snapshots.get((scope, site))) is not None:
+                rows.extend(snapshot[1])
+            else:
+                missing_sites.append(site)
+
+        if not missing_sites:
+            return rows
+
+        query = "GET hosts\nColumns: %s\n" % " ".join(self.get_status_columns())
+        rows_by_site: dict[SiteId, list[LivestatusRow]] = {site: [] for site in missing_sites}
+        for row in self.sites_callback.query(
+            query, missing_sites, output_format=LivestatusOutputFormat.JSON
+        ):
+            rows_by_site.setdefault(row[0], []).append(row)
+
+        for site, site_rows in rows_by_site.items():
+            if scope is not None:
+                snapshots[(scope, site)] = (now, site_rows)
+            rows.extend(site_rows)
+        return rows
 
     # This variant of the function is configured not with a list of
     # hosts but with a livestatus filter header and a list of columns
@@ -95,6 +95,9 @@ class SitesCallback(NamedTuple):
     all_sites_with_id_and_online: Callable[[], list[tuple[SiteId, bool]]]
     query: QueryCallback
     translate: Callable[[str], str]
+    # Identifies whose view of the monitoring status the query callback returns.
+    # Fetched status data is only shared between fetchers of the same scope.
+    status_cache_scope: Callable[[], str] | None = None
 
 
 MapGroup2Value = dict[str, str]
@@ -7,6 +7,7 @@ from __future__ import annotations
 
 import abc
 import logging
+import re
 import time
 from collections.abc import Iterator, Mapping, MutableMapping, Sequence
 from typing import final, Final, NamedTuple
@@ -40,6 +41,9 @@ class SectionWithHeader(NamedTuple):
 MutableSection = list[SectionWithHeader]
 ImmutableSection = Sequence[SectionWithHeader]
 
+# Lines that may be section or piggyback markers, see `ParserState.__call__`.
+_MARKER_LINE: Final = re.compile(rb"^<<<.*>>>\r*$", re.MULTILINE)
+
 
 class ParserState(abc.ABC):
     """Base class for the state machine.
@@ -100,6 +104,15 @@ class ParserState(abc.ABC):
     def do_action(self, line: bytes) -> ParserState:
         raise NotImplementedError()
 
+    def do_bulk_action(self, data: bytes, selection: SectionNameCollection) -> ParserState:
+        """Process a chunk of lines that contains no markers
+
+        This is equivalent to calling the state on every line of `data`.
+        States that ignore their lines do not even split the chunk.
+
+        """
+        return self
+
     @abc.abstractmethod
     def on_section_header(self, line: bytes) -> ParserState:
         raise NotImplementedError()
@@ -349,6 +362,16 @@ class PiggybackSectionParser(ParserState):
         self.piggyback_sections[self.current_host][-1].section.append(AgentRawData(line))
         return self
 
+    def do_bulk_action(self, data: bytes, selection: SectionNameCollection) -> ParserState:
+        if not (selection is NO_SELECTION or self.current_section.name in selection):
+            return self
+
+        assert self.piggyback_sections[self.current_host][-1].header == self.current_section
+        self.piggyback_sections[self.current_host][-1].section.extend(
+            AgentRawData(line.rstrip(b"\r")) for line in data.split(b"\n") if line.strip()
+        )
+        return self
+
     def on_piggyback_header(self, line: bytes) -> ParserState:
         piggyback_header = PiggybackMarker.from_headerline(
             line,
@@ -451,6 +474,22 @@ class HostSectionParser(ParserState):
         self.sections[-1].section.append(AgentRawData(line))
         return self
 
+    def do_bulk_action(self, data: bytes, selection: SectionNameCollection) -> ParserState:
+        if not (selection is NO_SELECTION or self.current_section.name in selection):
+            return self
+
+        assert self.sections[-1].header == self.current_section
+        lines = data.split(b"\n")
+        if self.current_section.nostrip:
+            self.sections[-1].section.extend(
+                AgentRawData(line.rstrip(b"\r")) for line in lines if line.strip()
+            )
+        else:
+            self.sections[-1].section.extend(
+                AgentRawData(stripped) for line in lines if (stripped := line.strip())
+            )
+        return self
+
     def on_piggyback_header(self, line: bytes) -> ParserState:
         piggyback_header = PiggybackMarker.from_headerline(
             line,
@@ -510,7 +549,7 @@ class AgentParser(Parser[AgentRawData, AgentRawDataSection]):
 
         now = int(time.time())
 
-        raw_sections, piggyback_sections = self._parse_host_section(raw_data)
+        raw_sections, piggyback_sections = self._parse_host_section(raw_data, selection)
         section_info = {
             header.name: header
             for header, _ in raw_sections
@@ -522,7 +561,10 @@ class AgentParser(Parser[AgentRawData, AgentRawDataSection]):
         ) -> MutableSectionMap[list[AgentRawDataSectionElem]]:
             out: MutableSectionMap[list[AgentRawDataSectionElem]] = {}
             for header, content in sections:
-                out.setdefault(header.name, []).extend(header.parse_line(line) for line in content)
+                if selection is NO_SELECTION or header.name in selection:
+                    out.setdefault(header.name, []).extend(
+                        header.parse_line(line) for line in content
+                    )
             return out
 
         def flatten_piggyback_section(
@@ -596,8 +638,15 @@ class AgentParser(Parser[AgentRawData, AgentRawDataSection]):
     def _parse_host_section(
         self,
         raw_data: AgentRawData,
+        selection: SectionNameCollection = NO_SELECTION,
     ) -> tuple[ImmutableSection, Mapping[PiggybackMarker, ImmutableSection]]:
-        """Split agent output in chunks, splits lines by whitespaces."""
+        """Split agent output in chunks, splits lines by whitespaces.
+
+        The markers are located in one pass over the data.  Only the marker lines
+        go through the state machine one by one, the lines in between are handed
+        over in bulk.  The lines of sections that are not selected are dropped.
+
+        """
         parser: ParserState = NOOPParser(
             self.hostname,
             [],
@@ -606,7 +655,11 @@ class AgentParser(Parser[AgentRawData, AgentRawDataSection]):
             encoding_fallback=self.encoding_fallback,
             logger=self._logger,
         )
-        for line in raw_data.split(b"\n"):
-            parser = parser(line.rstrip(b"\r"))
+        position = 0
+        for match in _MARKER_LINE.finditer(raw_data):
+            parser = parser.do_bulk_action(raw_data[position : match.start()], selection)
+            parser = parser(match.group().rstrip(b"\r"))
+            position = match.end()
+        parser = parser.do_bulk_action(raw_data[position:], selection)
 
         return parser.sections, parser.piggyback_sections
@@ -5,7 +5,8 @@
 
 from __future__ import annotations
 
-from collections.abc import Callable, Container, Iterable, Mapping, Sequence, Set
+from collections import OrderedDict
+from collections.abc import Callable, Container, Hashable, Iterable, Mapping, Sequence, Set
 from dataclasses import dataclass
 from typing import Any, Final, Generic, NamedTuple, TypeVar
 
@@ -50,6 +51,66 @@ class ResolvedResult(NamedTuple):
     cache_info: _CacheInfo | None
 
 
+class ParsedSectionsCache:
+    """Bounded LRU cache of the results of the parse functions
+
+    The parse results are keyed by host, section, parse function and a
+    fingerprint of the raw data, so that they can be shared by all passes
+    over the same data in one process (checking, inventory, discovery).
+
+    Note:
+        This relies on the parse functions being pure.  The cached results
+        are shared just like they are shared among the plugins of one pass.
+
+    """
+
+    def __init__(self, *, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self._results: OrderedDict[Hashable, ParsedSectionContent] = OrderedDict()
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(maxsize={self.maxsize!r})"
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+    def configure(self, *, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self.clear()
+
+    def clear(self) -> None:
+        self._results.clear()
+
+    @staticmethod
+    def make_key(
+        host_name: HostName,
+        section_name: SectionName,
+        parse_function: Callable[..., object],
+        raw_data: Sequence[object],
+    ) -> Hashable:
+        return host_name, section_name, parse_function, len(raw_data), hash(repr(raw_data))
+
+    def get(self, key: Hashable) -> ParsedSectionContent | None:
+        try:
+            self._results.move_to_end(key)
+        except KeyError:
+            return None
+        return self._results[key]
+
+    def set(self, key: Hashable, parsed: ParsedSectionContent) -> None:
+        if self.maxsize <= 0:
+            return
+        self._results[key] = parsed
+        self._results.move_to_end(key)
+        while len(self._results) > self.maxsize:
+            self._results.popitem(last=False)
+
+
+# Shared by all passes of a process, e.g. a keepalive helper.
+# Disabled unless configured, see `ParsedSectionsCache.configure()`.
+parsed_sections_cache = ParsedSectionsCache(maxsize=0)
+
+
 class SectionsParser(Generic[_TSeq]):
     """Call the sections parse function and return the parsing result."""
 
@@ -65,6 +126,7 @@ class SectionsParser(Generic[_TSeq]):
         #       See `cmk.base.checkers.CheckPluginMapper.__getitem__`.
         #
         error_handling: Callable[[SectionName, _TSeq], str],
+        cache: ParsedSectionsCache | None = None,
     ) -> None:
         super().__init__()
         self._host_sections: HostSections[SectionMap[_TSeq]] = host_sections
@@ -72,6 +134,7 @@ class SectionsParser(Generic[_TSeq]):
         self._memoized_results: dict[SectionName, _ParsingResult | None] = {}
         self._host_name = host_name
         self.error_handling: Final = error_handling
+        self._cache: Final = cache
 
     def __repr__(self) -> str:
         return "{}(host_sections={!r}, host_name={!r})".format(
@@ -108,14 +171,26 @@ class SectionsParser(Generic[_TSeq]):
         except KeyError:
             return None
 
+        if self._cache is not None and self._cache.maxsize > 0:
+            key = self._cache.make_key(self._host_name, section_name, parse_function, raw_data)
+            if (cached := self._cache.get(key)) is not None:
+                return cached
+        else:
+            key = None
+
         try:
-            return parse_function(list(raw_data))
+            parsed = parse_function(list(raw_data))
         except Exception:
             if cmk.utils.debug.enabled():
                 raise
             self.parsing_errors.append(self.error_handling(section_name, raw_data))
             return None
 
+        if key is not None and parsed is not None:
+            assert self._cache is not None
+            self._cache.set(key, parsed)
+        return parsed
+
 
 class ParsedSectionsResolver:
     """Find the desired parsed data by ParsedSectionName
@@ -212,6 +287,7 @@ def make_providers(
     section_plugins: SectionMap[SectionPlugin],
     *,
     error_handling: Callable[[SectionName, _TSeq], str],
+    cache: ParsedSectionsCache | None = parsed_sections_cache,
 ) -> Mapping[HostKey, Provider]:
     return {
         host_key: ParsedSectionsResolver(
@@ -219,6 +295,7 @@ def make_providers(
                 host_sections=host_sections,
                 host_name=host_key.hostname,
                 error_handling=error_handling,
+                cache=cache,
             ),
             section_plugins={
                 section_name: section_plugins[section_name]
@@ -160,9 +160,11 @@ class Rule(TypedDict, total=False):
     comment: str
     contact_groups: ContactGroups
     count: Count
+    delay: float
     description: str
     docu_url: str
     disabled: bool
+    drop: bool | Literal["skip_pack"]
     expect: Expect
     event_limit: EventLimit
     hits: int
@@ -319,10 +321,11 @@ class SNMPCredential(SNMPCredentialBase, total=False):
 # This is what we get from the outside.
 class ConfigFromWATO(TypedDict):
     actions: Sequence[Action]
-    archive_mode: Literal["file", "mongodb"]
+    archive_mode: Literal["file", "mongodb", "sqlite"]
     archive_orphans: bool
     debug_rules: bool
     event_limit: EventLimits
+    event_queue_len: int
     eventsocket_queue_len: int
     history_lifetime: int
     history_rotation: Literal["daily", "weekly"]
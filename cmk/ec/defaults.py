@@ -54,6 +54,7 @@ def default_config() -> ConfigFromWATO:
         "remote_status": None,
         "socket_queue_len": 10,
         "eventsocket_queue_len": 10,
+        "event_queue_len": 0,  # process events synchronously
         "hostname_translation": TranslationOptions(),
         "archive_orphans": False,
         "archive_mode": "file",
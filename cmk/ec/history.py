@@ -7,10 +7,11 @@ import contextlib
 import datetime
 import os
 import shlex
+import sqlite3
 import subprocess
 import threading
 import time
-from collections.abc import Callable, Iterable, Sequence
+from collections.abc import Callable, Iterable, Iterator, Sequence
 from logging import Logger
 from pathlib import Path
 from typing import Any, assert_never, Literal
@@ -61,7 +62,9 @@ class History:
         self._event_columns = event_columns
         self._history_columns = history_columns
         self._lock = threading.Lock()
+        self._batch = threading.local()
         self._mongodb = MongoDB()
+        self._sqlite = SQLiteDB()
         self._active_history_period = ActiveHistoryPeriod()
         self.reload_configuration(config)
 
@@ -69,29 +72,55 @@ class History:
         self._config = config
         if self._config["archive_mode"] == "mongodb":
             _reload_configuration_mongodb(self)
+        elif self._config["archive_mode"] == "sqlite":
+            _reload_configuration_sqlite(self)
         else:
             _reload_configuration_files(self)
 
     def flush(self) -> None:
         if self._config["archive_mode"] == "mongodb":
             _flush_mongodb(self)
+        elif self._config["archive_mode"] == "sqlite":
+            _flush_sqlite(self)
         else:
             _flush_files(self)
 
     def add(self, event: Event, what: HistoryWhat, who: str = "", addinfo: str = "") -> None:
         if self._config["archive_mode"] == "mongodb":
             _add_mongodb(self, event, what, who, addinfo)
+        elif self._config["archive_mode"] == "sqlite":
+            _add_sqlite(self, event, what, who, addinfo)
         else:
             _add_files(self, event, what, who, addinfo)
 
+    @contextlib.contextmanager
+    def batched(self) -> Iterator[None]:
+        """Collect the entries added by the current thread and write them at once on exit"""
+        if self._config["archive_mode"] == "mongodb" or _batched_lines(self) is not None:
+            yield
+            return
+        self._batch.lines = []
+        try:
+            yield
+        finally:
+            lines, self._batch.lines = self._batch.lines, None
+            if lines and self._config["archive_mode"] == "sqlite":
+                _write_sqlite(self, lines)
+            elif lines:
+                _write_files(self, lines)
+
     def get(self, query: QueryGET) -> Iterable[Any]:
         if self._config["archive_mode"] == "mongodb":
             return _get_mongodb(self, query)
+        if self._config["archive_mode"] == "sqlite":
+            return _get_sqlite(self, query)
         return _get_files(self, self._logger, query)
 
     def housekeeping(self) -> None:
         if self._config["archive_mode"] == "mongodb":
             _housekeeping_mongodb(self)
+        elif self._config["archive_mode"] == "sqlite":
+            _housekeeping_sqlite(self)
         else:
             _housekeeping_files(self)
 
@@ -303,6 +332,189 @@ def _get_mongodb(  # pylint: disable=too-many-branches
     return history_entries
 
 
+# .
+#   .--SQLite--------------------------------------------------------------.
+#   |                 ____   ___  _     _ _                                |
+#   |                / ___| / _ \| |   (_) |_ ___                         |
+#   |                \___ \| | | | |   | | __/ _ \                        |
+#   |                 ___) | |_| | |___| | ||  __/                         |
+#   |                |____/ \__\_\_____|_|\__\___|                         |
+#   |                                                                      |
+#   +----------------------------------------------------------------------+
+#   | The Event Log Archive can be stored in a local SQLite database with  |
+#   | indexes on the frequently filtered columns instead of plain files.   |
+#   '----------------------------------------------------------------------'
+
+# Columns holding sequences, they are stored like in the history files
+_SQLITE_SEQUENCE_COLUMNS = {
+    "event_match_groups",
+    "event_contact_groups",
+    "event_match_groups_syslog_application",
+}
+
+_SQLITE_INDEXED_COLUMNS = [
+    "history_time",
+    "event_id",
+    "event_host",
+    "event_rule_id",
+    "event_state",
+]
+
+
+class SQLiteDB:
+    def __init__(self) -> None:
+        self.connection: sqlite3.Connection | None = None
+        self.path: Path | None = None
+
+
+def _sqlite_path(settings: Settings) -> Path:
+    return settings.paths.history_dir.value / "history.sqlite"
+
+
+def _sqlite_column_type(default: object) -> str:
+    if isinstance(default, (bool, int)):
+        return "INTEGER"
+    if isinstance(default, float):
+        return "REAL"
+    return "TEXT"
+
+
+def _connect_sqlite(history: History) -> sqlite3.Connection:
+    """Return the connection used for writing, creating the database if needed"""
+    path = _sqlite_path(history._settings)
+    if history._sqlite.connection is not None and history._sqlite.path == path:
+        return history._sqlite.connection
+    path.parent.mkdir(parents=True, exist_ok=True)
+    connection = sqlite3.connect(str(path), check_same_thread=False)
+    # WAL: readers are not blocked by the writer, no fsync for every added entry
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    columns = ", ".join(
+        "history_line INTEGER PRIMARY KEY AUTOINCREMENT"
+        if name == "history_line"
+        else f"{name} {_sqlite_column_type(default)}"
+        for name, default in history._history_columns
+    )
+    with connection:
+        connection.execute(f"CREATE TABLE IF NOT EXISTS history ({columns})")
+        for name in _SQLITE_INDEXED_COLUMNS:
+            connection.execute(f"CREATE INDEX IF NOT EXISTS history_{name} ON history ({name})")
+    history._sqlite.connection = connection
+    history._sqlite.path = path
+    return connection
+
+
+def _reload_configuration_sqlite(history: History) -> None:
+    with history._lock:
+        _connect_sqlite(history)
+
+
+def _flush_sqlite(history: History) -> None:
+    with history._lock, _connect_sqlite(history) as connection:
+        connection.execute("DELETE FROM history")
+
+
+def _housekeeping_sqlite(history: History) -> None:
+    days = history._config["history_lifetime"]
+    with history._lock, _connect_sqlite(history) as connection:
+        deleted = connection.execute(
+            "DELETE FROM history WHERE history_time < ?", (time.time() - days * 86400,)
+        ).rowcount
+    history._logger.log(VERBOSE, "Expired %d history entries (Horizon: %d days)", deleted, days)
+
+
+def _sqlite_value(value: Any) -> str | float:
+    if isinstance(value, (tuple, list)):
+        return "\1" + "\1".join(str(e) for e in value)
+    return value
+
+
+def _add_sqlite(history: History, event: Event, what: HistoryWhat, who: str, addinfo: str) -> None:
+    _log_event(history._config, history._logger, event, what, who, addinfo)
+    row = [time.time(), what, who, addinfo]
+    row += [
+        _sqlite_value(event.get(colname[6:], defval))  # drop "event_"
+        for colname, defval in history._event_columns
+    ]
+    if (rows := _batched_lines(history)) is not None:
+        rows.append(row)
+        return
+    _write_sqlite(history, [row])
+
+
+def _write_sqlite(history: History, rows: Iterable[Sequence[object]]) -> None:
+    column_names = [name for name, _default in history._history_columns[1:]]
+    with history._lock, _connect_sqlite(history) as connection:
+        connection.executemany(
+            f"INSERT INTO history ({', '.join(column_names)})"
+            f" VALUES ({', '.join('?' * len(column_names))})",
+            rows,
+        )
+
+
+def _sqlite_condition(
+    column_types: dict[str, type], column_name: str, operator_name: OperatorName, argument: Any
+) -> str | None:
+    """Translate a filter into an equivalent SQL condition, if possible
+
+    Only operators which have the same semantics in SQLite as in Python are
+    handled, all other filters are applied to the fetched rows only.
+    """
+    if (
+        column_name not in column_types
+        or column_name in _SQLITE_SEQUENCE_COLUMNS
+        or operator_name not in ("=", "<", ">", "<=", ">=")
+        or not isinstance(argument, column_types[column_name])
+    ):
+        return None
+    return f"{column_name} {operator_name} ?"
+
+
+def _get_sqlite(history: History, query: QueryGET) -> Iterator[list[Any]]:
+    """Stream the matching history entries, newest first"""
+    path = _sqlite_path(history._settings)
+    if not path.exists():
+        return
+
+    column_types = {name: type(default) for name, default in history._history_columns}
+    conditions: list[str] = []
+    arguments: list[Any] = []
+    for column_name, operator_name, _predicate, argument in query.filters:
+        if (
+            condition := _sqlite_condition(column_types, column_name, operator_name, argument)
+        ) is None:
+            continue
+        conditions.append(condition)
+        arguments.append(argument)
+    all_filters_in_sql = len(conditions) == len(query.filters)
+
+    sql = f"SELECT {', '.join(name for name, _default in history._history_columns)} FROM history"
+    if conditions:
+        sql += " WHERE " + " AND ".join(conditions)
+    sql += " ORDER BY history_line DESC"
+    if query.limit is not None and all_filters_in_sql:
+        sql += f" LIMIT {int(query.limit)}"
+
+    conversions: list[tuple[int, Callable[[Any], Any]]] = []
+    for index, (name, default) in enumerate(history._history_columns):
+        if isinstance(default, bool):
+            conversions.append((index, bool))
+        elif name in _SQLITE_SEQUENCE_COLUMNS:
+            conversions.append((index, _unsplit))
+    num_entries = 0
+    # Use a connection of our own: The writing one must not be blocked by a slow reader
+    with contextlib.closing(sqlite3.connect(str(path))) as connection:
+        for entry in connection.execute(sql, arguments):
+            if query.limit is not None and num_entries >= query.limit:
+                return
+            row = list(entry)
+            for index, convert in conversions:
+                row[index] = convert(row[index])
+            if all_filters_in_sql or query.filter_row(row):
+                num_entries += 1
+                yield row
+
+
 # .
 #   .--History-------------------------------------------------------------.
 #   |                   _   _ _     _                                      |
@@ -339,24 +551,35 @@ def _add_files(history: History, event: Event, what: HistoryWhat, who: str, addi
     4-oo: StatusTableEvents.columns
     """
     _log_event(history._config, history._logger, event, what, who, addinfo)
-    with history._lock:
-        columns = [
-            quote_tab(str(time.time())),
-            quote_tab(scrub_string(what)),
-            quote_tab(scrub_string(who)),
-            quote_tab(scrub_string(addinfo)),
-        ]
-        columns += [
-            quote_tab(event.get(colname[6:], defval))  # drop "event_"
-            for colname, defval in history._event_columns
-        ]
+    columns = [
+        quote_tab(str(time.time())),
+        quote_tab(scrub_string(what)),
+        quote_tab(scrub_string(who)),
+        quote_tab(scrub_string(addinfo)),
+    ]
+    columns += [
+        quote_tab(event.get(colname[6:], defval))  # drop "event_"
+        for colname, defval in history._event_columns
+    ]
+    line = b"\t".join(columns) + b"\n"
+
+    if (lines := _batched_lines(history)) is not None:
+        lines.append(line)
+        return
+    _write_files(history, [line])
+
+
+def _batched_lines(history: History) -> list[Any] | None:
+    return getattr(history._batch, "lines", None)
+
 
-        with get_logfile(
-            history._config,
-            history._settings.paths.history_dir.value,
-            history._active_history_period,
-        ).open(mode="ab") as f:
-            f.write(b"\t".join(columns) + b"\n")
+def _write_files(history: History, lines: Iterable[bytes]) -> None:
+    with history._lock, get_logfile(
+        history._config,
+        history._settings.paths.history_dir.value,
+        history._active_history_period,
+    ).open(mode="ab") as f:
+        f.writelines(lines)
 
 
 def quote_tab(col: Any) -> bytes:
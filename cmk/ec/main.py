@@ -14,6 +14,7 @@ from __future__ import annotations
 
 import abc
 import ast
+import bisect
 import contextlib
 import errno
 import ipaddress
@@ -21,6 +22,7 @@ import itertools
 import json
 import os
 import pprint
+import queue
 import select
 import signal
 import socket
@@ -60,7 +62,15 @@ from .history import ActiveHistoryPeriod, Columns, get_logfile, History, History
 from .host_config import HostConfig
 from .perfcounters import Perfcounters
 from .query import filter_operator_in, MKClientError, Query, QueryCOMMAND, QueryGET, QueryREPLICATE
-from .rule_matcher import compile_rule, match, MatchFailure, MatchResult, MatchSuccess, RuleMatcher
+from .rule_matcher import (
+    compile_rule,
+    match,
+    MatchFailure,
+    MatchResult,
+    MatchSuccess,
+    RuleMatcher,
+    RulePrefilter,
+)
 from .rule_packs import load_config as load_config_using
 from .settings import FileDescriptor, PortNumber, Settings
 from .settings import settings as create_settings
@@ -87,6 +97,13 @@ Response = Iterable[list[object]] | dict[str, object] | None
 
 LimitKind = Literal["overall", "by_rule", "by_host"]
 
+# Number of messages and the (lazily created) events from them
+_QueuedEvents = tuple[int, Iterable[Event]]
+
+# Upper bounds for the work done in one go by the receiving and processing stages
+_MAX_DATAGRAMS = 100
+_MAX_EVENT_BATCH_SIZE = 100
+
 
 class SyslogPriority:
     NAMES: Mapping[int, str] = {
@@ -277,6 +294,17 @@ def parse_address(what: str, address: object) -> tuple[str, int]:
     return unmap_ipv4_address(address[0]), address[1]
 
 
+def receive_datagrams(sock: socket.socket, bufsize: int) -> list[tuple[bytes, object]]:
+    """Receive the datagrams waiting on a readable socket, up to a limit"""
+    datagrams = [sock.recvfrom(bufsize)]
+    while len(datagrams) < _MAX_DATAGRAMS:
+        try:
+            datagrams.append(sock.recvfrom(bufsize, socket.MSG_DONTWAIT))
+        except BlockingIOError:
+            break
+    return datagrams
+
+
 def terminate(
     terminate_main_event: threading.Event,
     event_server: EventServer,
@@ -435,6 +463,7 @@ class EventServer(ECServerThread):
         self._rules: list[Rule] = []
         self._rule_by_id: dict[str | None, Rule] = {}
         self._rule_hash: dict[int, dict[int, Any]] = {}
+        self._rule_prefilter = RulePrefilter([])
         self._hash_stats: list[list[int]] = []  # facility/priority
         for _unused_facility in range(32):
             self._hash_stats.append([0] * 8)
@@ -699,7 +728,18 @@ class EventServer(ECServerThread):
         # http://www.outflux.net/blog/archives/2008/03/09/using-select-on-a-fifo/
         return os.open(str(self.settings.paths.event_pipe.value), os.O_RDWR | os.O_NONBLOCK)
 
-    def serve(self) -> None:  # pylint: disable=too-many-branches
+    def serve(self) -> None:
+        event_queue, stop_processing, event_processor = self._start_event_processor()
+        try:
+            self._receive(event_queue)
+        finally:
+            if event_processor is not None:
+                stop_processing.set()
+                event_processor.join()
+
+    def _receive(  # pylint: disable=too-many-branches
+        self, event_queue: queue.Queue[_QueuedEvents] | None
+    ) -> None:
         pipe = self.open_pipe()
         listen_list = [
             f
@@ -761,7 +801,9 @@ class EventServer(ECServerThread):
                         del client_sockets[fd]
 
                     messages, unprocessed = parse_bytes_into_syslog_messages(data)
-                    self.process_syslog_messages(messages, address)
+                    self._submit_events(
+                        event_queue, len(messages), self._syslog_events(messages, address)
+                    )
                     if unprocessed:
                         client_sockets[fd] = (cs, address, unprocessed)
 
@@ -779,33 +821,116 @@ class EventServer(ECServerThread):
                     listen_list.append(self.open_pipe())
 
                 messages, unprocessed = parse_bytes_into_syslog_messages(data)
-                self.process_syslog_messages(messages, None)
+                self._submit_events(event_queue, len(messages), self._syslog_events(messages, None))
                 if unprocessed:
                     self._logger.warning("Ignoring incomplete message '%r' from pipe", data)
 
             # Read events from builtin syslog server
             if self._syslog_udp is not None and self._syslog_udp in readable:
-                message, address = self._syslog_udp.recvfrom(4096)
-                self.process_syslog_messages(
-                    [message], parse_address("syslog socket (UDP)", address)
+                datagrams = [
+                    (message, parse_address("syslog socket (UDP)", address))
+                    for message, address in receive_datagrams(self._syslog_udp, 4096)
+                ]
+                self._submit_events(
+                    event_queue,
+                    len(datagrams),
+                    itertools.chain.from_iterable(
+                        self._syslog_events([message], address) for message, address in datagrams
+                    ),
+                    may_drop=True,
                 )
 
             # Read events from builtin snmptrap server
             if self._snmp_trap_socket is not None and self._snmp_trap_socket in readable:
-                message, address = self._snmp_trap_socket.recvfrom(65535)
-                self.process_potential_event_instrumented(
-                    self.create_events_from_trap(message, parse_address("SNMP trap", address))
+                traps = [
+                    (message, parse_address("SNMP trap", address))
+                    for message, address in receive_datagrams(self._snmp_trap_socket, 65535)
+                ]
+                self._submit_events(
+                    event_queue,
+                    len(traps),
+                    itertools.chain.from_iterable(
+                        self.create_events_from_trap(message, address) for message, address in traps
+                    ),
+                    may_drop=True,
                 )
 
             if spool_files := sorted(
                 self.settings.paths.spool_dir.value.glob("[!.]*"), key=lambda x: x.stat().st_mtime
             ):
-                self.process_syslog_messages(spool_files[0].read_bytes().splitlines(), None)
+                messages = spool_files[0].read_bytes().splitlines()
+                self._submit_events(event_queue, len(messages), self._syslog_events(messages, None))
                 spool_files[0].unlink()
                 select_timeout = 0  # enable fast processing to process further files
             else:
                 select_timeout = 1  # restore default select timeout
 
+    def _start_event_processor(
+        self,
+    ) -> tuple[queue.Queue[_QueuedEvents] | None, threading.Event, threading.Thread | None]:
+        """Decouple receiving messages from processing them, if configured
+
+        The receiving loop then only drains the sockets and puts the messages into
+        a bounded queue. A single processing thread parses them and matches them
+        against the rules in the order of their arrival.
+        """
+        stop_processing = threading.Event()
+        if (queue_len := self._config["event_queue_len"]) <= 0:
+            return None, stop_processing, None
+        event_queue: queue.Queue[_QueuedEvents] = queue.Queue(maxsize=queue_len)
+        event_processor = threading.Thread(
+            target=self._process_event_queue,
+            args=(event_queue, stop_processing),
+            name="EventProcessor",
+            daemon=True,
+        )
+        event_processor.start()
+        return event_queue, stop_processing, event_processor
+
+    def _submit_events(
+        self,
+        event_queue: queue.Queue[_QueuedEvents] | None,
+        num_messages: int,
+        events: Iterable[Event],
+        may_drop: bool = False,
+    ) -> None:
+        """Hand over events to the processing stage
+
+        Datagrams are dropped if the queue is full. Messages from streams are not,
+        waiting for the queue lets the senders feel the back-pressure instead.
+        """
+        if event_queue is None:
+            self.process_potential_event_instrumented(events)
+            return
+        try:
+            event_queue.put((num_messages, events), block=not may_drop)
+        except queue.Full:
+            self._perfcounters.count_many("queue_drops", num_messages)
+        self._perfcounters.set_gauge("event_queue_length", event_queue.qsize())
+
+    def _process_event_queue(
+        self, event_queue: queue.Queue[_QueuedEvents], stop_processing: threading.Event
+    ) -> None:
+        """Process the queued events until stopped and the queue is empty"""
+        while True:
+            try:
+                batch = [event_queue.get(timeout=1)]
+            except queue.Empty:
+                if stop_processing.is_set():
+                    return
+                continue
+            with contextlib.suppress(queue.Empty):
+                while len(batch) < _MAX_EVENT_BATCH_SIZE:
+                    batch.append(event_queue.get_nowait())
+            self._perfcounters.set_gauge("event_queue_length", event_queue.qsize())
+            try:
+                # Write the history entries of the whole batch at once
+                with self._history.batched():
+                    for _num_messages, events in batch:
+                        self.process_potential_event_instrumented(events)
+            except Exception:
+                self._logger.exception("Exception while processing queued events")
+
     def create_events_from_trap(self, data: bytes, address: tuple[str, int]) -> Iterator[Event]:
         try:
             if varbinds_and_ipaddress := self._snmp_trap_parser(data, address):
@@ -832,10 +957,13 @@ class EventServer(ECServerThread):
     def process_syslog_messages(
         self, messages: Iterable[bytes], address: tuple[str, int] | None
     ) -> None:
-        self.process_potential_event_instrumented(
-            create_events_from_syslog_messages(
-                messages, address, self._logger if self._config["debug_rules"] else None
-            )
+        self.process_potential_event_instrumented(self._syslog_events(messages, address))
+
+    def _syslog_events(
+        self, messages: Iterable[bytes], address: tuple[str, int] | None
+    ) -> Iterable[Event]:
+        return create_events_from_syslog_messages(
+            messages, address, self._logger if self._config["debug_rules"] else None
         )
 
     def do_housekeeping(self) -> None:
@@ -1044,9 +1172,8 @@ class EventServer(ECServerThread):
                 # First look for case 1: rule that already have at least one hit
                 # and this events in the state "counting" exist.
                 events_to_delete: list[tuple[Event, HistoryWhat]] = []
-                events = self._event_status.events()
-                for event in events:
-                    if event["rule_id"] == rule["id"] and event["phase"] == "counting":
+                for event in self._event_status.events_of_rule(rule["id"]):
+                    if event["phase"] == "counting":
                         # time has elapsed. Now lets see if we have reached
                         # the necessary count:
                         if event["count"] < expected_count:  # no -> trigger alarm
@@ -1099,10 +1226,8 @@ class EventServer(ECServerThread):
             merge, reset_ack = merge
 
         if merge != "never":
-            for event in self._event_status.events():
-                if event["rule_id"] == rule["id"] and (
-                    event["phase"] == "open" or (event["phase"] == "ack" and merge == "acked")
-                ):
+            for event in self._event_status.events_of_rule(rule["id"]):
+                if event["phase"] == "open" or (event["phase"] == "ack" and merge == "acked"):
                     merge_event = event
                     break
 
@@ -1229,6 +1354,9 @@ class EventServer(ECServerThread):
                         ):
                             count_unspecific += 1
 
+        if self._config["rule_optimizer"]:
+            self._rule_prefilter = RulePrefilter(self._rules)
+
         self._logger.info(
             "Compiled %d active rules (ignoring %d disabled rules)", count_rules, count_disabled
         )
@@ -1310,9 +1438,12 @@ class EventServer(ECServerThread):
             self.log_message(event)
 
         # Rule optimizer
+        rule_candidates: Iterable[Rule]
         if self._config["rule_optimizer"]:
             self._hash_stats[event["facility"]][event["priority"]] += 1
-            rule_candidates = self._rule_hash.get(event["facility"], {}).get(event["priority"], [])
+            rule_candidates = self._rule_prefilter.filter(
+                self._rule_hash.get(event["facility"], {}).get(event["priority"], []), event
+            )
         else:
             rule_candidates = self._rules
 
@@ -2671,6 +2802,7 @@ class EventStatus:
         self._rule_stats: dict[str, int] = {}
         # needed for expecting rules
         self._interval_starts: dict[str, int] = {}
+        self._initialize_event_index()
         self._initialize_event_limit_status()
 
         # TODO: might introduce some performance counters, like:
@@ -2688,6 +2820,54 @@ class EventStatus:
                 return event
         return None
 
+    def events_of_rule(self, rule_id: str | None) -> Sequence[Event]:
+        """All current events of a rule, oldest first"""
+        return self._events_by_rule.get(rule_id, ())
+
+    def events_of_rule_and_host(self, rule_id: str | None, host: HostName) -> Sequence[Event]:
+        """All current events of a rule and a host, oldest first"""
+        return self._events_by_rule_and_host.get((rule_id, host), ())
+
+    def _initialize_event_index(self) -> None:
+        """
+        Index the events by rule and by rule and host, so the lookups for
+        cancelling and counting don't have to scan all events. The index
+        has to be updated whenever an event is added, removed or gets a
+        new host, see _index_event() and _unindex_event().
+        """
+        self._events_by_rule: dict[str | None, list[Event]] = {}
+        self._events_by_rule_and_host: dict[tuple[str | None, HostName], list[Event]] = {}
+        for event in self._events:
+            self._index_event(event)
+
+    def _index_event(self, event: Event) -> None:
+        # Events are kept ordered by their ID, i.e. by age, just like self._events.
+        rule_id = event.get("rule_id")
+        bisect.insort(self._events_by_rule.setdefault(rule_id, []), event, key=lambda e: e["id"])
+        bisect.insort(
+            self._events_by_rule_and_host.setdefault((rule_id, event["host"]), []),
+            event,
+            key=lambda e: e["id"],
+        )
+
+    def _unindex_event(self, event: Event) -> None:
+        rule_id = event.get("rule_id")
+        self._remove_event(self._events_by_rule.get(rule_id, []), event)
+        if not self._events_by_rule.get(rule_id):
+            self._events_by_rule.pop(rule_id, None)
+
+        rule_and_host = rule_id, event["host"]
+        self._remove_event(self._events_by_rule_and_host.get(rule_and_host, []), event)
+        if not self._events_by_rule_and_host.get(rule_and_host):
+            self._events_by_rule_and_host.pop(rule_and_host, None)
+
+    @staticmethod
+    def _remove_event(events: list[Event], event: Event) -> None:
+        for nr, indexed in enumerate(events):
+            if indexed is event:
+                del events[nr]
+                return
+
     def interval_start(self, rule_id: str, interval: int) -> int:
         """
         Return beginning of current expectation interval. For new rules
@@ -2745,6 +2925,7 @@ class EventStatus:
         self._events = status["events"]
         self._rule_stats = status["rule_stats"]
         self._interval_starts = status["interval_starts"]
+        self._initialize_event_index()
 
     def save_status(self) -> None:
         now = time.time()
@@ -2794,6 +2975,7 @@ class EventStatus:
                 event["host_in_downtime"] = False
 
         # core_host is needed to initialize the status
+        self._initialize_event_index()
         self._initialize_event_limit_status()
 
     def _initialize_event_limit_status(self) -> None:
@@ -2833,6 +3015,7 @@ class EventStatus:
         event["id"] = self._next_event_id
         self._next_event_id += 1
         self._events.append(event)
+        self._index_event(event)
         self.num_existing_events += 1
         self._count_event_add(event)
         self._history.add(event, "NEW")
@@ -2847,6 +3030,7 @@ class EventStatus:
     def remove_event(self, event: Event, delete_reason: HistoryWhat, user: str = "") -> None:
         try:
             self._events.remove(event)
+            self._unindex_event(event)
             self._history.add(event, delete_reason, user)
             self._count_event_remove(event)
         except ValueError:
@@ -2867,10 +3051,9 @@ class EventStatus:
 
     # protected by self.lock
     def _remove_oldest_event_of_rule(self, rule_id: str) -> None:
-        for event in self._events:
-            if event["rule_id"] == rule_id:
-                self.remove_event(event, "AUTODELETE")
-                return
+        for event in self.events_of_rule(rule_id):
+            self.remove_event(event, "AUTODELETE")
+            return
 
     # protected by self.lock
     def _remove_oldest_event_of_host(self, hostname: str) -> None:
@@ -2905,10 +3088,17 @@ class EventStatus:
         """
         with self.lock:
             to_delete = []
-            for event in self._events:
-                if event["rule_id"] == rule["id"] and self.cancelling_match(
-                    match_groups, new_event, event, rule
-                ):
+            # With debug_rules we look at all events of the rule, so the reason
+            # for not cancelling an event of another host is logged, too.
+            candidates = (
+                self.events_of_rule(rule["id"])
+                if self._config["debug_rules"]
+                else self.events_of_rule_and_host(
+                    rule["id"], self._cancelling_host(match_groups, new_event, rule)
+                )
+            )
+            for event in candidates:
+                if self.cancelling_match(match_groups, new_event, event, rule):
                     # Fill a few fields of the cancelled event with data from
                     # the cancelling event so that action scripts have useful
                     # values and the logfile entry if more relevant.
@@ -2960,21 +3150,7 @@ class EventStatus:
     ) -> bool:
         debug = self._config["debug_rules"]
 
-        # The match_groups of the canceling match only contain the *_ok match groups
-        # Since the rewrite definitions are based on the positive match, we need to
-        # create some missing keys. O.o
-        match_groups["match_groups_message"] = match_groups.get("match_groups_message_ok", ())
-        match_groups["match_groups_syslog_application"] = match_groups.get(
-            "match_groups_syslog_application_ok", ()
-        )
-
-        # Note: before we compare host and application we need to
-        # apply the rewrite rules to the event. Because if in the previous
-        # the hostname was rewritten, it wouldn't match anymore here.
-        host = new_event["host"]
-        if "set_host" in rule:
-            host = HostName(replace_groups(rule["set_host"], host, match_groups))
-
+        host = self._cancelling_host(match_groups, new_event, rule)
         if event["host"] != host:
             if debug:
                 self._logger.info(
@@ -3060,6 +3236,24 @@ class EventStatus:
 
         return True
 
+    @staticmethod
+    def _cancelling_host(match_groups: MatchGroups, new_event: Event, rule: Rule) -> HostName:
+        # The match_groups of the canceling match only contain the *_ok match groups
+        # Since the rewrite definitions are based on the positive match, we need to
+        # create some missing keys. O.o
+        match_groups["match_groups_message"] = match_groups.get("match_groups_message_ok", ())
+        match_groups["match_groups_syslog_application"] = match_groups.get(
+            "match_groups_syslog_application_ok", ()
+        )
+
+        # Note: before we compare host and application we need to
+        # apply the rewrite rules to the event. Because if in the previous
+        # the hostname was rewritten, it wouldn't match anymore here.
+        host = new_event["host"]
+        if "set_host" in rule:
+            host = HostName(replace_groups(rule["set_host"], host, match_groups))
+        return host
+
     def count_rule_match(self, rule_id: str) -> None:
         with self.lock:
             self._rule_stats.setdefault(rule_id, 0)
@@ -3082,12 +3276,15 @@ class EventStatus:
                 preserve["comment"] = found["comment"]
             if "contact" in found:
                 preserve["contact"] = found["contact"]
+        # The host may change, keep the index up to date.
+        self._unindex_event(found)
         found.update(event)
         found.update(preserve)
+        self._index_event(found)
 
     def count_expected_event(self, event_server: EventServer, event: Event) -> None:
-        for ev in self._events:
-            if ev["rule_id"] == event["rule_id"] and ev["phase"] == "counting":
+        for ev in self.events_of_rule(event["rule_id"]):
+            if ev["phase"] == "counting":
                 self.count_event_up(ev, event)
                 return
 
@@ -3097,7 +3294,7 @@ class EventStatus:
         event_server.new_event_respecting_limits(event)
 
     def count_event(
-        self, event_server: EventServer, event: Event, rule: str, count: Count
+        self, event_server: EventServer, event: Event, rule: Rule, count: Count
     ) -> Event | None:
         """
         Find previous occurrence of this event and account for
@@ -3106,31 +3303,31 @@ class EventStatus:
         since the event has been created because the count was too
         low in the specified period of time.
         """
-        for ev in self._events:
-            if ev["rule_id"] == event["rule_id"]:
-                if ev["phase"] == "ack" and not count["count_ack"]:
-                    continue  # skip acknowledged events
-
-                if count["separate_host"] and ev["host"] != event["host"]:
-                    continue  # treat events with separated hosts separately
+        for ev in (
+            self.events_of_rule_and_host(event["rule_id"], event["host"])
+            if count["separate_host"]
+            else self.events_of_rule(event["rule_id"])
+        ):
+            if ev["phase"] == "ack" and not count["count_ack"]:
+                continue  # skip acknowledged events
 
-                if count["separate_application"] and ev["application"] != event["application"]:
-                    continue  # same for application
+            if count["separate_application"] and ev["application"] != event["application"]:
+                continue  # same for application
 
-                if count["separate_match_groups"] and ev["match_groups"] != event["match_groups"]:
-                    continue
+            if count["separate_match_groups"] and ev["match_groups"] != event["match_groups"]:
+                continue
 
-                count_duration = count.get("count_duration")
-                if count_duration is not None and ev["first"] + count_duration < event["time"]:
-                    # Counting has been discontinued on this event after a certain time
-                    continue
+            count_duration = count.get("count_duration")
+            if count_duration is not None and ev["first"] + count_duration < event["time"]:
+                # Counting has been discontinued on this event after a certain time
+                continue
 
-                if ev["host_in_downtime"] != event["host_in_downtime"]:
-                    continue  # treat events with different downtime states separately
+            if ev["host_in_downtime"] != event["host_in_downtime"]:
+                continue  # treat events with different downtime states separately
 
-                found = ev
-                self.count_event_up(found, event)
-                break
+            found = ev
+            self.count_event_up(found, event)
+            break
         else:
             event["count"] = 1
             event["phase"] = "counting"
@@ -27,6 +27,12 @@ class Perfcounters:
         "overflows",
         "events",
         "connects",
+        "queue_drops",  # messages dropped because the event queue was full
+    ]
+
+    # Current values, no rates are computed for them
+    _gauge_names = [
+        "event_queue_length",
     ]
 
     # Average processing times
@@ -42,6 +48,7 @@ class Perfcounters:
 
         # Initialize counters
         self._counters = {n: 0 for n in self._counter_names}
+        self._gauges = {n: 0 for n in self._gauge_names}
         self._old_counters: dict[str, int] = {}
         self._rates: dict[str, float] = {}
         self._average_rates: dict[str, float] = {}
@@ -54,6 +61,14 @@ class Perfcounters:
         with self._lock:
             self._counters[counter] += 1
 
+    def count_many(self, counter: str, value: int) -> None:
+        with self._lock:
+            self._counters[counter] += value
+
+    def set_gauge(self, gauge: str, value: int) -> None:
+        with self._lock:
+            self._gauges[gauge] = value
+
     def count_time(self, counter: str, ptime: float) -> None:
         with self._lock:
             if counter in self._times:
@@ -98,6 +113,9 @@ class Perfcounters:
         for name in cls._weights:
             columns.append((f"status_average_{name}_time", 0.0))
 
+        for name in cls._gauge_names:
+            columns.append((f"status_{name}", 0))
+
         return columns
 
     def get_status(self) -> list[float]:
@@ -116,4 +134,7 @@ class Perfcounters:
             for name in self._weights:
                 row.append(self._times.get(name, 0.0))
 
+            for name in self._gauge_names:
+                row.append(self._gauges[name])
+
             return row
@@ -7,7 +7,7 @@ from __future__ import annotations
 
 import ipaddress
 import re
-from collections.abc import Callable
+from collections.abc import Callable, Iterable, Iterator
 from dataclasses import dataclass
 from logging import Logger
 from typing import Literal, NamedTuple
@@ -143,6 +143,204 @@ def match_ip_network(pattern: str, ipaddress_text: str) -> bool:
     return ipaddress_ in network
 
 
+def _skip_character_class(regex: str, start: int) -> int:
+    """Return the index right after the character class starting at start"""
+    i = start + 1
+    if regex[i : i + 1] == "^":
+        i += 1
+    if regex[i : i + 1] == "]":  # a leading "]" is a literal
+        i += 1
+    while i < len(regex) and regex[i] != "]":
+        i += 2 if regex[i] == "\\" else 1
+    return i + 1
+
+
+# Number of characters following these escapes which belong to the escape
+_ESCAPE_ARGUMENT_LENGTHS = {"x": 2, "u": 4, "U": 8}
+
+
+def _skip_escape(regex: str, start: int) -> int:
+    """Return the index right after the escape sequence starting at start
+
+    Consuming too much is harmless, it only shortens the literal. Consuming
+    too little would turn the arguments of an escape into wrong literals.
+    """
+    escaped = regex[start + 1 : start + 2]
+    i = start + 2
+    if escaped in _ESCAPE_ARGUMENT_LENGTHS:
+        return i + _ESCAPE_ARGUMENT_LENGTHS[escaped]
+    if escaped == "N" and regex[i : i + 1] == "{":
+        end = regex.find("}", i)
+        return len(regex) if end == -1 else end + 1
+    if escaped.isdigit():
+        # Octal escapes have up to three digits, group references up to two
+        while i < start + 4 and regex[i : i + 1].isdigit():
+            i += 1
+    return i
+
+
+def required_regex_literal(regex: str) -> str:
+    """Return the longest ASCII string which is contained in every match of regex
+
+    This is deliberately conservative: Only plain characters on the top level of
+    the pattern are considered, anything we do not understand breaks the current
+    run of characters. Top level alternatives make the result empty.
+    """
+    runs: list[str] = []
+    current: list[str] = []
+    depth = 0
+    i = 0
+    while i < len(regex):
+        char = regex[i]
+        atom: str | None = None
+        if char == "\\":
+            escaped = regex[i + 1 : i + 2]
+            if escaped and not escaped.isalnum():
+                atom = escaped
+                i += 2
+            else:
+                # Character classes, anchors, backreferences and encoded characters
+                i = _skip_escape(regex, i)
+        elif char == "[":
+            i = _skip_character_class(regex, i)
+        elif char == "(":
+            depth += 1
+            i += 1
+        elif char == ")":
+            depth -= 1
+            i += 1
+        elif char == "|":
+            if depth == 0:
+                return ""
+            i += 1
+        elif char in "*?{":
+            # The preceding atom is optional, so it can not be part of the literal
+            if depth == 0 and current:
+                current.pop()
+            if char == "{":
+                end = regex.find("}", i)
+                if end == -1:
+                    return ""
+                i = end
+            i += 1
+        elif char not in ".^$+":
+            atom = char
+            i += 1
+        else:
+            i += 1
+
+        if depth:
+            continue
+        if atom is not None and atom.isascii():
+            current.append(atom)
+        else:
+            runs.append("".join(current))
+            current = []
+    runs.append("".join(current))
+    return max(runs, key=len).lower()
+
+
+def required_literal(pattern: TextPattern) -> tuple[str, bool]:
+    """Return a lower case string contained in every text matching pattern
+
+    The second element tells whether the literal has been derived from a regex.
+    In that case it is only reliable for ASCII texts: with re.IGNORECASE, some
+    ASCII letters also match non ASCII characters (e.g. "s" matches "ſ").
+    """
+    if isinstance(pattern, str):
+        return pattern, False
+    if pattern.flags & re.VERBOSE:
+        return "", True
+    return required_regex_literal(pattern.pattern), True
+
+
+class _Condition(NamedTuple):
+    field: str
+    literals: frozenset[str]
+    from_regex: bool
+
+
+class RulePrefilter:
+    """Cheaply sort out rules which can not match an event
+
+    At construction time we determine for each rule the literals which must occur
+    in the message text, the syslog application and the host name of an event in
+    order to let the rule match. All literals of all rules are searched in an
+    event at once, only rules whose literals have been found are then handed over
+    to the (expensive) RuleMatcher.
+    """
+
+    def __init__(self, rules: Iterable[Rule]) -> None:
+        self._conditions: dict[str, tuple[_Condition, ...]] = {}
+        literals: dict[str, set[str]] = {"text": set(), "application": set(), "host": set()}
+        for rule in rules:
+            conditions = self._rule_conditions(rule)
+            if conditions:
+                self._conditions[rule["id"]] = conditions
+            for condition in conditions:
+                literals[condition.field].update(condition.literals)
+        self._literals = {field: tuple(lits) for field, lits in literals.items()}
+
+    @staticmethod
+    def _rule_conditions(rule: Rule) -> tuple[_Condition, ...]:
+        if rule.get("disabled") or rule.get("invert_matching"):
+            return ()
+        # Without a message pattern every text matches, see event_rule_matches_message()
+        text_patterns = []
+        if "match" in rule:
+            text_patterns.append(rule["match"])
+            if "match_ok" in rule:
+                text_patterns.append(rule["match_ok"])
+        # Either of both application patterns has to match, see
+        # event_rule_matches_syslog_application()
+        application_patterns = []
+        if "match_application" in rule:
+            application_patterns.append(rule["match_application"])
+        if "cancel_application" in rule:
+            application_patterns.append(rule["cancel_application"])
+        host_patterns = [rule["match_host"]] if "match_host" in rule else []
+
+        conditions = []
+        for field, patterns in (
+            ("text", text_patterns),
+            ("application", application_patterns),
+            ("host", host_patterns),
+        ):
+            literals = [required_literal(p) for p in patterns]
+            if literals and all(literal for literal, _is_regex in literals):
+                conditions.append(
+                    _Condition(
+                        field=field,
+                        literals=frozenset(literal for literal, _is_regex in literals),
+                        from_regex=any(is_regex for _literal, is_regex in literals),
+                    )
+                )
+        return tuple(conditions)
+
+    def filter(self, rules: Iterable[Rule], event: Event) -> Iterator[Rule]:
+        """Yield the rules which may match the event, keeping their order"""
+        found: dict[str, frozenset[str]] = {}
+        is_ascii: dict[str, bool] = {}
+        for field, value in (
+            ("text", event.get("text", "")),
+            ("application", event.get("application", "")),
+            ("host", event.get("host", "")),
+        ):
+            value = value.lower()
+            found[field] = frozenset(
+                literal for literal in self._literals[field] if literal in value
+            )
+            is_ascii[field] = value.isascii()
+
+        for rule in rules:
+            if all(
+                not condition.literals.isdisjoint(found[condition.field])
+                or (condition.from_regex and not is_ascii[condition.field])
+                for condition in self._conditions.get(rule["id"], ())
+            ):
+                yield rule
+
+
 class RuleMatcher:
     def __init__(
         self,
@@ -75,30 +75,57 @@ class SectionStore(Generic[_T]):
         now: int,
         keep_outdated: bool,
     ) -> MutableSectionMap[tuple[int, int, _T]]:
-        # TODO: This is not race condition free when modifying the data. Either remove
-        # the possible write here and simply ignore the outdated sections or lock when
-        # reading and unlock after writing
         persisted_sections = self.load()
-
         new_sections = {
             section_name: persist_info + (section_content,)
             for section_name, section_content in sections.items()
             if (persist_info := lookup_persist(section_name)) is not None
         }
-        store_sections = bool(new_sections)
-        persisted_sections.update(new_sections)
-
-        if not keep_outdated:
-            for section_name in tuple(persisted_sections):
-                (_created_at, valid_until, _section_content) = persisted_sections[section_name]
-                if valid_until < now:
-                    store_sections = True
-                    del persisted_sections[section_name]
-
-        if store_sections:
+        if not self._needs_update(persisted_sections, new_sections, now, keep_outdated):
+            # Nothing new and nothing expired: Spare us the rewrite of the file.
+            return persisted_sections
+
+        # Reload under the lock, a concurrent writer may have changed the file since.
+        with _store.locked(self.path):
+            persisted_sections = self.load()
+            persisted_sections.update(self._changed_sections(persisted_sections, new_sections))
+            if not keep_outdated:
+                for section_name in tuple(persisted_sections):
+                    (_created_at, valid_until, _section_content) = persisted_sections[section_name]
+                    if valid_until < now:
+                        del persisted_sections[section_name]
             self.store(persisted_sections)
         return persisted_sections
 
+    @staticmethod
+    def _changed_sections(
+        persisted_sections: SectionMap[tuple[int, int, _T]],
+        new_sections: SectionMap[tuple[int, int, _T]],
+    ) -> SectionMap[tuple[int, int, _T]]:
+        # The creation time of a received section always differs from the persisted one.
+        # As long as the validity and the content did not change (eg. cached agent output
+        # sent again), we keep the persisted timestamps and don't need to rewrite anything.
+        return {
+            section_name: entry
+            for section_name, entry in new_sections.items()
+            if (persisted := persisted_sections.get(section_name)) is None
+            or persisted[1:] != entry[1:]
+        }
+
+    @classmethod
+    def _needs_update(
+        cls,
+        persisted_sections: SectionMap[tuple[int, int, _T]],
+        new_sections: SectionMap[tuple[int, int, _T]],
+        now: int,
+        keep_outdated: bool,
+    ) -> bool:
+        if cls._changed_sections(persisted_sections, new_sections):
+            return True
+        return not keep_outdated and any(
+            valid_until < now for _created_at, valid_until, *_rest in persisted_sections.values()
+        )
+
     def _add_persisted_sections(
         self,
         sections: SectionMap[_T],
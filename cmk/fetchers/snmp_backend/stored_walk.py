@@ -4,6 +4,7 @@
 # conditions defined in the file COPYING, which is part of this source code package.
 """Abstract classes and types."""
 
+import bisect
 import logging
 from collections.abc import Sequence
 from pathlib import Path
@@ -33,6 +34,7 @@ class StoredWalkSNMPBackend(SNMPBackend):
         )
         if not self.path.exists():
             raise MKSNMPError(f"No snmpwalk file {self.path}")
+        self._index: tuple[Sequence[tuple[int, ...]], Sequence[str]] | None = None
 
     def get(self, /, oid: OID, *, context: SNMPContext) -> SNMPRawValue | None:
         walk = self.walk(oid, context=context)
@@ -64,35 +66,34 @@ class StoredWalkSNMPBackend(SNMPBackend):
             dot_star = False
 
         console.vverbose(f"  Loading {oid}")
-        lines = self.read_walk_data()
-
-        begin = 0
-        end = len(lines)
-        hit = None
-        while end - begin > 0:
-            current = (begin + end) // 2
-            parts = lines[current].split(None, 1)
-            comp = parts[0]
-            hit = StoredWalkSNMPBackend._compare_oids(oid_prefix, comp)
-            if hit == 0:
-                break
-            if hit == 1:  # we are too low
-                begin = current + 1
-            else:
-                end = current
-
-        if hit != 0:
-            return []  # not found
-
-        rowinfo = StoredWalkSNMPBackend._collect_until(oid, oid_prefix, lines, current, -1)
-        rowinfo.reverse()
-        rowinfo += StoredWalkSNMPBackend._collect_until(oid, oid_prefix, lines, current + 1, 1)
+        keys, lines = self._get_index()
+        prefix = StoredWalkSNMPBackend._to_bin_string(oid_prefix)
 
-        if dot_star:
-            return [rowinfo[0]]
+        rowinfo = []
+        for index in range(bisect.bisect_left(keys, prefix), len(keys)):
+            if keys[index][: len(prefix)] != prefix:
+                break
+            rowinfo.append(StoredWalkSNMPBackend._parse_line(lines[index]))
+            if dot_star:
+                break
 
         return rowinfo
 
+    def _get_index(self) -> tuple[Sequence[tuple[int, ...]], Sequence[str]]:
+        """Read and index the walk file once per backend instance
+
+        The walk is expected to be sorted by OID, just like `snmpwalk` and
+        `cmk --snmpwalk` write it.  The index holds the numeric OIDs of all
+        lines, so lookups are a binary search without re-reading the file.
+        """
+        if self._index is None:
+            lines = self.read_walk_data()
+            self._index = (
+                [StoredWalkSNMPBackend._to_bin_string(line.split(None, 1)[0]) for line in lines],
+                lines,
+            )
+        return self._index
+
     @staticmethod
     def read_walk_from_path(path: Path) -> Sequence[str]:
         console.vverbose(f"  Opening {path}\n")
@@ -113,16 +114,6 @@ class StoredWalkSNMPBackend(SNMPBackend):
         except OSError:
             raise MKSNMPError("No snmpwalk file %s" % self.path)
 
-    @staticmethod
-    def _compare_oids(a: OID, b: OID) -> int:
-        aa = StoredWalkSNMPBackend._to_bin_string(a)
-        bb = StoredWalkSNMPBackend._to_bin_string(b)
-        if len(aa) <= len(bb) and bb[: len(aa)] == aa:
-            result = 0
-        else:
-            result = (aa > bb) - (aa < bb)
-        return result
-
     @staticmethod
     def _to_bin_string(oid: OID) -> tuple[int, ...]:
         try:
@@ -133,36 +124,19 @@ class StoredWalkSNMPBackend(SNMPBackend):
             raise MKGeneralException("Invalid OID %s" % oid)
 
     @staticmethod
-    def _collect_until(
-        oid: OID, oid_prefix: OID, lines: Sequence[str], index: int, direction: int
-    ) -> SNMPRowInfo:
-        rows = []
-        # Handle case, where we run after the end of the lines list
-        if index >= len(lines):
-            if direction > 0:
-                return []
-            index -= 1
-        while True:
-            line = lines[index]
-            parts = line.split(None, 1)
-            o = parts[0]
-            if o.startswith("."):
-                o = o[1:]
-            if o == oid or o.startswith(oid_prefix + "."):
-                if len(parts) > 1:
-                    # FIXME: This encoding ping-pong is horrible...
-                    value = agent_simulator.process(
-                        AgentRawData(
-                            parts[1].encode(),
-                        ),
-                    ).decode()
-                else:
-                    value = ""
-                # Fix for missing starting oids
-                rows.append(("." + o, strip_snmp_value(value)))
-                index += direction
-                if index < 0 or index >= len(lines):
-                    break
-            else:
-                break
-        return rows
+    def _parse_line(line: str) -> tuple[OID, SNMPRawValue]:
+        parts = line.split(None, 1)
+        o = parts[0]
+        if o.startswith("."):
+            o = o[1:]
+        if len(parts) > 1:
+            # FIXME: This encoding ping-pong is horrible...
+            value = agent_simulator.process(
+                AgentRawData(
+                    parts[1].encode(),
+                ),
+            ).decode()
+        else:
+            value = ""
+        # Fix for missing starting oids
+        return "." + o, strip_snmp_value(value)
@@ -10,9 +10,10 @@ import itertools
 import os
 import time
 from collections.abc import Callable, Iterator
+from pathlib import Path
 from typing import Any, Literal, NamedTuple
 
-from livestatus import LivestatusOutputFormat, lq_logic, OnlySites, SiteId
+from livestatus import LivestatusOutputFormat, LivestatusRow, lq_logic, OnlySites, SiteId
 
 import cmk.utils.dateutils as dateutils
 import cmk.utils.paths
@@ -172,6 +173,8 @@ AVBIPhases = list[tuple[int, AVBIPhaseData]]
 AVBITimelineState = tuple[int, str, bool, bool]  # state, output, in_downtime, in_service_period
 AVBITimelineStates = dict[tuple[SiteId, HostName, ServiceName], AVBITimelineState]
 AVLevels = tuple[float, float]
+AVRollupKey = tuple[HostName, ServiceName, int, int, int, int, int, int, int]
+AVRollup = dict[AVRollupKey, int]
 
 ColumnSpec = tuple[str, str, str, str | None]
 
@@ -730,6 +733,23 @@ def get_av_computation_options() -> AVOptionValueSpecs:
                 label=_("Do not merge consecutive phases with equal state"),
             ),
         ),
+        (
+            "use_rollups",
+            "single",
+            True,
+            Checkbox(
+                title=_("Daily Rollups"),
+                label=_("Use precomputed rollups for complete days"),
+                help=_(
+                    "Long time ranges can be computed much faster by using the summed up "
+                    "durations of complete days in the past. These are computed once per day "
+                    "and site and reused by all later reports. Days with annotations, the last "
+                    "day of the time range, outage statistics, short interval melting and the "
+                    "timeline are always computed from the raw data. Objects which have not been "
+                    "monitored during the last day of the time range are not shown."
+                ),
+            ),
+        ),
         (
             "timelimit",
             "single",
@@ -850,6 +870,7 @@ def get_default_avoptions(range_spec: tuple[float, float] | None = None) -> AVOp
         "timeformat": ("perc", "percentage_2", None),
         "short_intervals": 0,
         "dont_merge": False,
+        "use_rollups": False,
         "summary": "sum",
         "show_timeline": False,
         "timelimit": 30,
@@ -964,8 +985,14 @@ def get_availability_rawdata(
         )
 
     time_range: AVTimeRange = avoptions["range"][0]
+    raw_time_ranges = [time_range]
+    rollup_days: list[AVTimeRange] = []
+    if _use_availability_rollups(what, av_object, include_output, include_long_output, avoptions):
+        raw_time_ranges, rollup_days = split_time_range_for_rollups(
+            time_range, time.time(), load_annotations()
+        )
 
-    av_filter = "Filter: time >= %d\nFilter: time < %d\n" % time_range
+    av_filter = ""
     if av_object:
         tl_site, tl_host, tl_service = av_object
         av_filter += "Filter: host_name = {}\nFilter: service_description = {}\n".format(
@@ -979,7 +1006,7 @@ def get_availability_rawdata(
     else:
         av_filter += "Filter: service_description =\n"
 
-    query = "GET statehist\n" + av_filter
+    query = av_filter
     query += "Timelimit: %d\n" % avoptions["timelimit"]
 
     # Add Columns needed for object identification
@@ -1015,39 +1042,246 @@ def get_availability_rawdata(
     query += filterheaders
     logrow_limit = avoptions["logrow_limit"]
 
+    # Now we find out if the log row limit was exceeded or
+    # if the log's length is the limit by accident.
+    # If this limit was exceeded then we cut off the last element
+    # because it might be incomplete.
+    exceeded_log_row_limit: bool = False
+    amount_unfiltered_rows = 0
+    data: list[LivestatusRow] = []
     with sites.only_sites(only_sites), sites.prepend_site(), sites.set_limit(
         logrow_limit or None
     ), CPUTracker() as fetch_rows_tracker:
-        data = sites.live().query(query)
+        for raw_time_range in raw_time_ranges:
+            rows = sites.live().query(
+                "GET statehist\nFilter: time >= %d\nFilter: time < %d\n" % raw_time_range + query
+            )
+            amount_unfiltered_rows += len(rows)
+            if logrow_limit and len(rows) > logrow_limit:
+                exceeded_log_row_limit = True
+                data += rows[:-1]
+            else:
+                data += rows
 
     columns = ["site"] + columns
     spans: list[AVSpan] = [dict(zip(columns, span)) for span in data]
-    amount_filtered_rows = len(spans)
 
     # When a group filter is set, only care about these groups in the group fields
     with CPUTracker() as filter_rows_tracker:
         if avoptions["grouping"] not in [None, "host"]:
             filter_groups_of_entries(context, avoptions, spans)
 
-    # Now we find out if the log row limit was exceeded or
-    # if the log's length is the limit by accident.
-    # If this limit was exceeded then we cut off the last element
-    # because it might be incomplete.
-    exceeded_log_row_limit: bool = False
-    if logrow_limit and len(data) > logrow_limit:
-        exceeded_log_row_limit = True
-        spans = spans[:-1]
+    if rollup_days:
+        spans += get_availability_rollup_spans(what, spans, rollup_days, avoptions["timelimit"])
+        spans.sort(key=lambda span: span["from"])
 
     if view_process_tracking:
-        view_process_tracking.amount_unfiltered_rows = len(data)
-        view_process_tracking.amount_filtered_rows = amount_filtered_rows
-        view_process_tracking.amount_rows_after_limit = len(spans)
+        view_process_tracking.amount_unfiltered_rows = amount_unfiltered_rows
+        view_process_tracking.amount_filtered_rows = amount_unfiltered_rows
+        view_process_tracking.amount_rows_after_limit = len(data)
         view_process_tracking.duration_fetch_rows = fetch_rows_tracker.duration
         view_process_tracking.duration_filter_rows = filter_rows_tracker.duration
 
     return spans_by_object(spans), exceeded_log_row_limit
 
 
+# Availability of complete days in the past does not change anymore. Instead of
+# fetching and processing all raw spans of these days for every report, the
+# durations of each object are summed up per day and combination of state and
+# flags once ("rollups"). These rollups are persisted per site and day, so that
+# long time ranges only need raw spans for the days at the edges of the range.
+_ROLLUP_FLAG_COLUMNS = [
+    "state",
+    "host_down",
+    "in_downtime",
+    "in_host_downtime",
+    "in_notification_period",
+    "in_service_period",
+    "is_flapping",
+]
+
+
+def _use_availability_rollups(
+    what: AVObjectType,
+    av_object: AVObjectSpec,
+    include_output: bool,
+    include_long_output: bool,
+    avoptions: AVOptions,
+) -> bool:
+    # Rollups only keep the summed up durations. Everything that needs to know
+    # about the individual spans of an object has to be computed from raw spans.
+    os_aggrs, os_states = get_outage_statistic_options(avoptions)
+    return bool(
+        avoptions.get("use_rollups")
+        and what in ["host", "service"]
+        and not av_object
+        and not include_output
+        and not include_long_output
+        and not (os_aggrs and os_states)
+        and not avoptions["short_intervals"]
+        and not avoptions["show_timeline"]
+    )
+
+
+def split_time_range_for_rollups(
+    time_range: AVTimeRange, now: float, annotations: AVAnnotations
+) -> tuple[list[AVTimeRange], list[AVTimeRange]]:
+    """Split the time range into the ranges to be queried raw and the days to be rolled up
+
+    Only complete days in the past which are not affected by annotations are rolled up.
+    The last day of the time range is always queried raw: The raw spans determine the
+    objects of the report and provide their labelling columns.
+    """
+    from_time, until_time = time_range
+    annotation_ranges = [
+        (annotation["from"], annotation["until"])
+        for annotation_entries in annotations.values()
+        for annotation in annotation_entries
+    ]
+
+    rollup_days: list[AVTimeRange] = []
+    tst = time.localtime(from_time)
+    day = _make_struct(tst.tm_year, tst.tm_mon, tst.tm_mday, 0, offset=0)
+    while True:
+        day_start, day = time.mktime(day), _increment_day(day)
+        day_end = time.mktime(day)
+        if day_end >= until_time or day_end > now:
+            break
+        if day_start >= from_time and not any(
+            anno_from < day_end and anno_until > day_start
+            for anno_from, anno_until in annotation_ranges
+        ):
+            rollup_days.append((day_start, day_end))
+
+    raw_time_ranges: list[AVTimeRange] = []
+    raw_from = from_time
+    for day_start, day_end in rollup_days:
+        if raw_from < day_start:
+            raw_time_ranges.append((raw_from, day_start))
+        raw_from = day_end
+    raw_time_ranges.append((raw_from, until_time))
+
+    return raw_time_ranges, rollup_days
+
+
+def get_availability_rollup_spans(
+    what: AVObjectType, spans: list[AVSpan], rollup_days: list[AVTimeRange], timelimit: int
+) -> list[AVSpan]:
+    """Create one span per object and combination of state and flags of the rolled up days
+
+    The spans of each run of consecutive days are combined. They must not cover the days in
+    between, which are queried raw as they are affected by annotations.
+    """
+    templates: dict[tuple[SiteId, HostName, ServiceName], AVSpan] = {}
+    for span in spans:
+        templates.setdefault((span["site"], span["host_name"], span["service_description"]), span)
+
+    consecutive_days: list[list[AVTimeRange]] = []
+    for rollup_day in rollup_days:
+        if consecutive_days and consecutive_days[-1][-1][1] == rollup_day[0]:
+            consecutive_days[-1].append(rollup_day)
+        else:
+            consecutive_days.append([rollup_day])
+
+    site_ids = sorted({site_id for site_id, _host_name, _service_description in templates})
+    rollup_spans: list[AVSpan] = []
+    for days in consecutive_days:
+        durations: dict[tuple[SiteId, AVRollupKey], int] = {}
+        for rollup_day in days:
+            for site_id, rollup in load_availability_rollups(
+                what, site_ids, rollup_day, timelimit
+            ).items():
+                for key, duration in rollup.items():
+                    durations[(site_id, key)] = durations.get((site_id, key), 0) + duration
+
+        for (site_id, (host_name, service_description, *flags)), duration in durations.items():
+            if (template := templates.get((site_id, host_name, service_description))) is None:
+                continue  # Not part of the report
+            rollup_span = template.copy()
+            rollup_span.update(zip(_ROLLUP_FLAG_COLUMNS, flags))
+            rollup_span["from"] = days[0][0]
+            rollup_span["until"] = days[-1][1]
+            rollup_span["duration"] = duration
+            rollup_spans.append(rollup_span)
+    return rollup_spans
+
+
+def _rollup_path(site_id: SiteId, what: AVObjectType, rollup_day: AVTimeRange) -> Path:
+    return (
+        Path(cmk.utils.paths.var_dir)
+        / "availability_rollups"
+        / site_id
+        / what
+        / ("%d-%d.pkl" % rollup_day)
+    )
+
+
+def load_availability_rollups(
+    what: AVObjectType, site_ids: list[SiteId], rollup_day: AVTimeRange, timelimit: int
+) -> dict[SiteId, AVRollup]:
+    """Load the rollups of the given day, computing the missing ones"""
+    rollups: dict[SiteId, AVRollup] = {}
+    missing_site_ids: list[SiteId] = []
+    for site_id in site_ids:
+        rollup = store.load_object_from_pickle_file(
+            _rollup_path(site_id, what, rollup_day), default=None
+        )
+        if rollup is None:
+            missing_site_ids.append(site_id)
+        else:
+            rollups[site_id] = rollup
+
+    if not missing_site_ids:
+        return rollups
+
+    started = time.time()
+    computed_rollups = compute_availability_rollups(what, missing_site_ids, rollup_day, timelimit)
+    rollups.update(computed_rollups)
+
+    # The query may have been cut off by the time limit. Never persist incomplete rollups.
+    if time.time() - started >= timelimit:
+        return rollups
+
+    for site_id, rollup in computed_rollups.items():
+        path = _rollup_path(site_id, what, rollup_day)
+        store.makedirs(path.parent)
+        store.save_object_to_pickle_file(path, rollup)
+    return rollups
+
+
+def compute_availability_rollups(
+    what: AVObjectType, site_ids: list[SiteId], rollup_day: AVTimeRange, timelimit: int
+) -> dict[SiteId, AVRollup]:
+    query = "GET statehist\nFilter: time >= %d\nFilter: time < %d\n" % rollup_day
+    if what == "service":
+        query += "Filter: service_description !=\n"
+    else:
+        query += "Filter: service_description =\n"
+    query += "Timelimit: %d\n" % timelimit
+    query += "Columns: %s\n" % " ".join(["host_name", "service_description"] + _ROLLUP_FLAG_COLUMNS)
+    query += "Stats: sum duration\n"
+
+    with sites.only_sites(site_ids), sites.prepend_site():
+        try:
+            # The rollups are shared by all users. They must not be restricted to the
+            # objects of the current user. Each report only uses the rollups of the
+            # objects found in its own (authorized) raw spans.
+            sites.live().set_auth_domain("availability_rollups")
+            rows = sites.live().query(query)
+        finally:
+            sites.live().set_auth_domain("read")
+        dead_site_ids = set(sites.live().dead_sites())
+
+    rollups: dict[SiteId, AVRollup] = {
+        site_id: {} for site_id in site_ids if site_id not in dead_site_ids
+    }
+    for site_id, host_name, service_description, *flags, duration in rows:
+        if site_id in rollups:
+            key: AVRollupKey = (host_name, service_description, *flags)  # type: ignore[assignment]
+            rollups[site_id][key] = int(duration)
+    return rollups
+
+
 def filter_groups_of_entries(
     context: VisualContext, avoptions: AVOptions, spans: list[AVSpan]
 ) -> None:
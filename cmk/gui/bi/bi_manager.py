@@ -10,6 +10,7 @@ from cmk.utils.paths import default_config_dir
 
 from cmk.gui import sites
 from cmk.gui.i18n import _
+from cmk.gui.logged_in import user
 
 from cmk.bi.compiler import BICompiler
 from cmk.bi.computer import BIComputer
@@ -19,7 +20,12 @@ from cmk.bi.lib import SitesCallback
 
 class BIManager:
     def __init__(self) -> None:
-        sites_callback = SitesCallback(all_sites_with_id_and_online, bi_livestatus_query, _)
+        sites_callback = SitesCallback(
+            all_sites_with_id_and_online,
+            bi_livestatus_query,
+            _,
+            status_cache_scope=lambda: str(user.id),
+        )
         self.compiler = BICompiler(self.bi_configuration_file(), sites_callback)
         self.compiler.load_compiled_aggregations()
         self.status_fetcher = BIStatusFetcher(sites_callback)
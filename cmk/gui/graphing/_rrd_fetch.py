@@ -6,12 +6,10 @@
 
 
 import collections
-import contextlib
 import time
 from collections.abc import Callable, Iterable, Iterator, Mapping, Sequence
 
-import livestatus
-from livestatus import livestatus_lql, SiteId
+from livestatus import lq_logic, lqencode, SiteId
 
 from cmk.utils.exceptions import MKGeneralException
 from cmk.utils.hostaddress import HostName
@@ -24,7 +22,7 @@ from cmk.gui.time_series import TimeSeries, TimeSeriesValues
 from cmk.gui.type_defs import ColumnName
 
 from ._graph_specification import CombinedSingleMetricSpec, GraphMetric, NeededElementForRRDDataKey
-from ._timeseries import op_func_wrapper, time_series_operators
+from ._timeseries import apply_time_series_operator
 from ._type_defs import GraphConsoldiationFunction
 from ._unit_info import unit_info
 from ._utils import (
@@ -64,20 +62,16 @@ def fetch_rrd_data_for_graph(
         if isinstance(element, NeededElementForRRDDataKey)
     )
     rrd_data: RRDData = {}
-    for (site, host_name, service_description), metrics in by_service.items():
-        with contextlib.suppress(livestatus.MKLivestatusNotFoundError):
-            for (perfvar, cf, scale), data in fetch_rrd_data(
-                site,
-                host_name,
-                service_description,
-                metrics,
-                graph_recipe.consolidation_function,
-                graph_data_range,
-            ):
-                rrd_data[(site, host_name, service_description, perfvar, cf, scale)] = TimeSeries(
-                    data,
-                    conversion=unit_conversion,
-                )
+    for (site, host_name, service_description), metrics_data in _fetch_rrd_data_of_services(
+        by_service,
+        graph_recipe.consolidation_function,
+        graph_data_range,
+    ).items():
+        for (perfvar, cf, scale), data in metrics_data:
+            rrd_data[(site, host_name, service_description, perfvar, cf, scale)] = TimeSeries(
+                data,
+                conversion=unit_conversion,
+            )
     _align_and_resample_rrds(rrd_data, graph_recipe.consolidation_function)
     _chop_last_empty_step(graph_data_range, rrd_data)
 
@@ -156,14 +150,75 @@ def _group_needed_rrd_data_by_service(
     return by_service
 
 
-def fetch_rrd_data(
-    site: SiteId,
-    host_name: HostName,
-    service_description: ServiceName,
-    metrics: set[MetricProperties],
+def _fetch_rrd_data_of_services(
+    by_service: Mapping[tuple[SiteId, HostName, ServiceName], set[MetricProperties]],
     consolidation_func_name: GraphConsoldiationFunction | None,
     graph_data_range: GraphDataRange,
-) -> list[tuple[MetricProperties, TimeSeriesValues]]:
+) -> dict[tuple[SiteId, HostName, ServiceName], list[tuple[MetricProperties, TimeSeriesValues]]]:
+    """Fetch the RRD data of many services at once
+
+    The services needing the same metrics are fetched with a single query, which is
+    sent to all of their sites in parallel. Services without data are omitted.
+    """
+    by_metrics: dict[
+        tuple[bool, frozenset[MetricProperties]],
+        list[tuple[SiteId, HostName, ServiceName]],
+    ] = collections.defaultdict(list)
+    for service, metrics in by_service.items():
+        by_metrics[(service[2] == "_HOST_", frozenset(metrics))].append(service)
+
+    point_range = _point_range(graph_data_range)
+    fetched = {}
+    for (is_host, needed_metrics), services in by_metrics.items():
+        ordered_metrics = list(needed_metrics)
+        query = _rrd_data_query(
+            services,
+            is_host,
+            list(rrd_columns(ordered_metrics, consolidation_func_name, point_range)),
+        )
+        with sites.only_sites(sorted({site for site, _host_name, _service in services})):
+            with sites.prepend_site():
+                rows = sites.live().query(query)
+
+        requested = set(services)
+        for site, host_name, *values in rows:
+            service = (
+                SiteId(site),
+                HostName(host_name),
+                "_HOST_" if is_host else values.pop(0),
+            )
+            if service in requested:
+                fetched[service] = list(zip(ordered_metrics, values))
+
+    # Keep the order of the services, the first one is the reference for the alignment.
+    return {service: fetched[service] for service in by_service if service in fetched}
+
+
+def _rrd_data_query(
+    services: Sequence[tuple[SiteId, HostName, ServiceName]],
+    is_host: bool,
+    columns: Sequence[ColumnName],
+) -> str:
+    if is_host:
+        return "GET hosts\nColumns: host_name %s\n%s" % (
+            " ".join(columns),
+            lq_logic("Filter: host_name =", sorted({h for _s, h, _d in services}), "Or"),
+        )
+
+    service_filters = [
+        "Filter: host_name = %s\nFilter: service_description = %s\n"
+        % (lqencode(host_name), lqencode(service_description))
+        for host_name, service_description in sorted({(h, d) for _s, h, d in services})
+    ]
+    return "GET services\nColumns: host_name service_description %s\n%s" % (
+        " ".join(columns),
+        service_filters[0]
+        if len(service_filters) == 1
+        else "".join(f"{f}And: 2\n" for f in service_filters) + f"Or: {len(service_filters)}\n",
+    )
+
+
+def _point_range(graph_data_range: GraphDataRange) -> str:
     start_time, end_time = graph_data_range["time_range"]
 
     step = graph_data_range["step"]
@@ -171,12 +226,7 @@ def fetch_rrd_data(
     if not isinstance(step, str):
         step = max(1, step)
 
-    point_range = ":".join(map(str, (start_time, end_time, step)))
-    lql_columns = list(rrd_columns(metrics, consolidation_func_name, point_range))
-    query = livestatus_lql([host_name], lql_columns, service_description)
-
-    with sites.only_sites(site):
-        return list(zip(metrics, sites.live().query_row(query)))
+    return ":".join(map(str, (start_time, end_time, step)))
 
 
 def rrd_columns(
@@ -247,12 +297,11 @@ def translate_and_merge_rrd_columns(
     if not relevant_ts:
         return TimeSeries([0, 0, 0])
 
-    _op_title, op_func = time_series_operators()["MERGE"]
-    single_value_series = [op_func_wrapper(op_func, list(tsp)) for tsp in zip(*relevant_ts)]
+    merged = apply_time_series_operator("MERGE", relevant_ts)
 
     return TimeSeries(
-        single_value_series,
-        time_window=relevant_ts[0].twindow,
+        merged.values,
+        time_window=merged.twindow,
         conversion=_retrieve_unit_conversion_function(target_metric),
     )
 
@@ -89,7 +89,7 @@ class Curve(TypedDict):
 
 class GraphDataRange(TypedDict):
     time_range: tuple[int, int]
-    # Forecast graphs represent step as str (see forecasts.py and fetch_rrd_data)
+    # Forecast graphs represent step as str (see forecasts.py and _point_range)
     # colon separated [step length]:[rrd point count]
     step: int | str
     vertical_range: NotRequired[tuple[float, float]]
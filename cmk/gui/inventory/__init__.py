@@ -35,6 +35,7 @@ from cmk.utils.structured_data import (
     SDKey,
     SDPath,
     SDRawTree,
+    TreeOrArchiveStore,
 )
 
 import cmk.gui.sites as sites
@@ -117,11 +118,12 @@ def _make_filter_choices_from_permitted_paths(
     ]
 
 
-def load_filtered_and_merged_tree(row: Row) -> ImmutableTree:
+def load_filtered_and_merged_tree(row: Row, path: SDPath = ()) -> ImmutableTree:
     """Load inventory tree from file, status data tree from row,
-    merge these trees and returns the filtered tree"""
+    merge these trees and returns the filtered tree.
+    If a path is given, only the inventory subtree below this path is loaded."""
     host_name = row.get("host_name")
-    inventory_tree = _load_tree_from_file(tree_type="inventory", host_name=host_name)
+    inventory_tree = _load_tree_from_file(tree_type="inventory", host_name=host_name, path=path)
     if raw_status_data_tree := row.get("host_structured_status"):
         status_data_tree = ImmutableTree.deserialize(
             ast.literal_eval(raw_status_data_tree.decode("utf-8"))
@@ -295,6 +297,15 @@ def _get_history(
     except FilterInventoryHistoryPathsError:
         return [], []
 
+    recorded_delta_trees = {
+        (history_delta.previous_timestamp, history_delta.timestamp): history_delta.delta_tree
+        for history_delta in _make_tree_or_archive_store().load_history_deltas(
+            host_name=hostname,
+            from_timestamp=filtered_tree_paths.tree_paths[0].timestamp,
+            until_timestamp=filtered_tree_paths.tree_paths[-1].timestamp,
+        )
+    }
+
     cached_tree_loader = _CachedTreeLoader()
     corrupted_history_files: set[Path] = set()
     history: list[HistoryEntry] = []
@@ -315,6 +326,15 @@ def _get_history(
             filters,
         )
 
+        if (
+            recorded_delta_tree := recorded_delta_trees.get((previous.timestamp, current.timestamp))
+        ) is not None:
+            if (
+                history_entry := cached_delta_tree_loader.get_recorded_entry(recorded_delta_tree)
+            ) is not None:
+                history.append(history_entry)
+            continue
+
         if (cached_history_entry := cached_delta_tree_loader.get_cached_entry()) is not None:
             history.append(cached_history_entry)
             continue
@@ -336,21 +356,29 @@ def _get_history(
     return history, sorted([str(path) for path in corrupted_history_files])
 
 
+def _make_tree_or_archive_store() -> TreeOrArchiveStore:
+    return TreeOrArchiveStore(
+        cmk.utils.paths.inventory_output_dir,
+        cmk.utils.paths.inventory_archive_dir,
+    )
+
+
 def _get_inventory_history_paths(hostname: HostName) -> Sequence[InventoryHistoryPath]:
     inventory_path = Path(cmk.utils.paths.inventory_output_dir, hostname)
     inventory_archive_dir = Path(cmk.utils.paths.inventory_archive_dir, hostname)
 
-    try:
-        archived_tree_paths = [
-            InventoryHistoryPath(
-                path=filepath,
-                timestamp=int(filepath.name),
-            )
-            for filepath in sorted(inventory_archive_dir.iterdir())
-        ]
-    except FileNotFoundError:
+    if not inventory_archive_dir.exists():
         return []
 
+    # Archived trees which are only recorded as deltas do not have a full copy at their path
+    archived_tree_paths = [
+        InventoryHistoryPath(
+            path=inventory_archive_dir / str(timestamp),
+            timestamp=timestamp,
+        )
+        for timestamp in _make_tree_or_archive_store().get_history_timestamps(host_name=hostname)
+    ]
+
     try:
         archived_tree_paths.append(
             InventoryHistoryPath(
@@ -436,6 +464,15 @@ class _CachedDeltaTreeLoader:
             ImmutableDeltaTree.deserialize(raw_delta_tree),
         )
 
+    def get_recorded_entry(self, delta_tree: ImmutableDeltaTree) -> HistoryEntry | None:
+        delta_stats = delta_tree.get_stats()
+        new = delta_stats["new"]
+        changed = delta_stats["changed"]
+        removed = delta_stats["removed"]
+        if new or changed or removed:
+            return self._make_history_entry(new, changed, removed, delta_tree)
+        return None
+
     def get_calculated_or_store_entry(
         self,
         previous_tree: ImmutableTree,
@@ -490,7 +527,10 @@ class LoadStructuredDataError(MKException):
 
 @request_memoize(maxsize=None)
 def _load_tree_from_file(
-    *, tree_type: Literal["inventory", "status_data"], host_name: HostName | None
+    *,
+    tree_type: Literal["inventory", "status_data"],
+    host_name: HostName | None,
+    path: SDPath = (),
 ) -> ImmutableTree:
     """Load data of a host, cache it in the current HTTP request"""
     if not host_name:
@@ -507,7 +547,8 @@ def _load_tree_from_file(
                 if tree_type == "inventory"
                 else cmk.utils.paths.status_data_dir
             )
-            / host_name
+            / host_name,
+            path,
         )
     except Exception as e:
         if active_config.debug:
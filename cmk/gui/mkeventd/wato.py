@@ -237,6 +237,7 @@ def register(
     config_var_registry.register(ConfigVariableEventConsoleHistoryLifetime)
     config_var_registry.register(ConfigVariableEventConsoleSocketQueueLength)
     config_var_registry.register(ConfigVariableEventConsoleEventSocketQueueLength)
+    config_var_registry.register(ConfigVariableEventConsoleEventQueueLength)
     config_var_registry.register(ConfigVariableEventConsoleTranslateSNMPTraps)
     config_var_registry.register(ConfigVariableEventConsoleSNMPCredentials)
     config_var_registry.register(ConfigVariableEventConsoleDebugRules)
@@ -4446,6 +4447,35 @@ class ConfigVariableEventConsoleEventSocketQueueLength(ConfigVariable):
         )
 
 
+class ConfigVariableEventConsoleEventQueueLength(ConfigVariable):
+    def group(self) -> type[ConfigVariableGroup]:
+        return ConfigVariableGroupEventConsoleGeneric
+
+    def domain(self) -> type[ABCConfigDomain]:
+        return ConfigDomainEventConsole
+
+    def ident(self) -> str:
+        return "event_queue_len"
+
+    def valuespec(self) -> ValueSpec:
+        return Integer(
+            title=_("Max. number of queued incoming messages"),
+            help=_(
+                "Per default the Event Console processes each incoming message right "
+                "after receiving it. When you set this to a value larger than zero, "
+                "receiving and processing the messages is done by separate threads, "
+                "which are connected by a queue of this size. This way the Event Console "
+                "keeps on reading from its sockets during load peaks. Messages "
+                "received via UDP (syslog and SNMP traps) are dropped when the queue is "
+                "full, while senders using streams have to wait. A restart of the Event "
+                "Console is needed for changes of this setting to take effect."
+            ),
+            minvalue=0,
+            label="max.",
+            unit=_("message batches"),
+        )
+
+
 class ConfigVariableEventConsoleTranslateSNMPTraps(ConfigVariable):
     def group(self) -> type[ConfigVariableGroup]:
         return ConfigVariableGroupEventConsoleSNMP
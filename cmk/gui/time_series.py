@@ -4,13 +4,16 @@
 # conditions defined in the file COPYING, which is part of this source code package.
 
 from collections.abc import Callable, Iterator, Sequence
-from statistics import fmean
+
+import numpy as np
+import numpy.typing as npt
 
 Timestamp = int
 
 TimeWindow = tuple[Timestamp, Timestamp, int]
 TimeSeriesValue = float | None
 TimeSeriesValues = Sequence[TimeSeriesValue]
+TimeSeriesArray = npt.NDArray[np.float64]
 
 
 def rrd_timestamps(time_window: TimeWindow) -> list[Timestamp]:
@@ -18,26 +21,6 @@ def rrd_timestamps(time_window: TimeWindow) -> list[Timestamp]:
     return [] if step == 0 else [t + step for t in range(start, end, step)]
 
 
-def aggregation_functions(series: TimeSeriesValues, aggr: str | None) -> TimeSeriesValue:
-    """Aggregate data in series list according to aggr
-
-    If series has None values they are dropped before aggregation"""
-    cleaned_series = [x for x in series if x is not None]
-    if not cleaned_series:
-        return None
-
-    aggr = "max" if aggr is None else aggr.lower()
-    match aggr:
-        case "average":
-            return fmean(cleaned_series)
-        case "max":
-            return max(cleaned_series)
-        case "min":
-            return min(cleaned_series)
-        case _:
-            raise ValueError(f"Invalid Aggregation function {aggr}, only max, min, average allowed")
-
-
 class TimeSeries:
     """Describes the returned time series returned by livestatus
 
@@ -80,6 +63,17 @@ class TimeSeries:
     def twindow(self) -> TimeWindow:
         return self.start, self.end, self.step
 
+    @classmethod
+    def from_array(cls, array: TimeSeriesArray, time_window: TimeWindow) -> "TimeSeries":
+        """Create a time series from an array, NaN values are gaps"""
+        values = array.astype(object)
+        values[np.isnan(array)] = None
+        return cls(values.tolist(), time_window)
+
+    def to_array(self) -> TimeSeriesArray:
+        """The values as array, gaps (None) are represented by NaN"""
+        return np.array(self.values, dtype=np.float64)
+
     def forward_fill_resample(self, twindow: TimeWindow) -> TimeSeriesValues:
         """Upsample by forward filling values
 
@@ -89,12 +83,12 @@ class TimeSeries:
         if twindow == self.twindow:
             return self.values
 
-        idx_max = len(self.values) - 1
-
-        return [
-            self.values[max(0, min(int((t - self.start) / self.step), idx_max))]
-            for t in range(*twindow)
-        ]
+        indices = np.clip(
+            ((np.arange(*twindow) - self.start) / self.step).astype(np.int64),
+            0,
+            len(self.values) - 1,
+        )
+        return [self.values[i] for i in indices.tolist()]
 
     def downsample(self, twindow: TimeWindow, cf: str | None = "max") -> TimeSeriesValues:
         """Downsample time series by consolidation function
@@ -107,23 +101,40 @@ class TimeSeries:
         if twindow == self.twindow:
             return self.values
 
-        dwsa = []
-        co: list[TimeSeriesValue] = []
-        desired_times = rrd_timestamps(twindow)
-        i = 0
-        for t, val in self.time_data_pairs():
-            if t > desired_times[i]:
-                dwsa.append(aggregation_functions(co, cf))
-                co = []
-                i += 1
-            co.append(val)
-
-        diff_len = len(desired_times) - len(dwsa)
-        if diff_len > 0:
-            dwsa.append(aggregation_functions(co, cf))
-            dwsa += [None] * (diff_len - 1)
-
-        return dwsa
+        aggr = "max" if cf is None else cf.lower()
+        if aggr not in ("average", "max", "min"):
+            raise ValueError(f"Invalid Aggregation function {aggr}, only max, min, average allowed")
+
+        desired_times = np.array(rrd_timestamps(twindow), dtype=np.int64)
+        downsampled = np.full(len(desired_times), np.nan)
+        if not len(self.values) or not len(desired_times):
+            return self.from_array(downsampled, twindow).values
+
+        # Every value belongs to the first desired time not before its own time.
+        buckets = np.searchsorted(
+            desired_times, np.array(rrd_timestamps(self.twindow), dtype=np.int64), side="left"
+        )
+        values = self.to_array()[: len(buckets)]
+        in_window = buckets < len(desired_times)
+        buckets, values = buckets[in_window], values[in_window]
+        if not len(values):
+            return self.from_array(downsampled, twindow).values
+
+        # The buckets are sorted, so each one is a contiguous slice of the values.
+        used_buckets, bucket_starts = np.unique(buckets, return_index=True)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            match aggr:
+                case "average":
+                    gaps = np.isnan(values)
+                    downsampled[used_buckets] = np.add.reduceat(
+                        np.where(gaps, 0.0, values), bucket_starts
+                    ) / np.add.reduceat((~gaps).astype(np.int64), bucket_starts)
+                case "max":
+                    downsampled[used_buckets] = np.fmax.reduceat(values, bucket_starts)
+                case "min":
+                    downsampled[used_buckets] = np.fmin.reduceat(values, bucket_starts)
+
+        return self.from_array(downsampled, twindow).values
 
     def time_data_pairs(self) -> list[tuple[Timestamp, TimeSeriesValue]]:
         return list(zip(rrd_timestamps(self.twindow), self.values))
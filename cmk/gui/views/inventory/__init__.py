@@ -1424,9 +1424,9 @@ class RowTableInventory(ABCRowTable):
 
     def _get_inv_data(self, hostrow: Row) -> Sequence[Mapping[SDKey, SDValue]]:
         try:
-            return inventory.load_filtered_and_merged_tree(hostrow).get_rows(
-                self._inventory_path.path
-            )
+            return inventory.load_filtered_and_merged_tree(
+                hostrow, self._inventory_path.path
+            ).get_rows(self._inventory_path.path)
         except inventory.LoadStructuredDataError:
             user_errors.add(
                 MKUserError(
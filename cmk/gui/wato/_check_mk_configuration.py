@@ -275,6 +275,7 @@ def register(
     rulespec_registry.register(BulkwalkHosts)
     rulespec_registry.register(ManagementBulkwalkHosts)
     rulespec_registry.register(SnmpBulkSize)
+    rulespec_registry.register(SnmpBatchTableWalks)
     rulespec_registry.register(SnmpWithoutSysDescr)
     rulespec_registry.register(Snmpv2CHosts)
     rulespec_registry.register(SnmpTiming)
@@ -5197,6 +5198,26 @@ SnmpBulkSize = HostRulespec(
 )
 
 
+def _help_snmp_batch_table_walks():
+    return _(
+        "By default Checkmk walks every column of an SNMP table separately. For the "
+        "classic SNMP backend this means one <tt>snmpbulkwalk</tt> process per column. "
+        "If this rule applies, all needed columns of a table are fetched with a single "
+        "walk over the table and are split up into columns by Checkmk. Columns missing "
+        "in the result and tables for which the combined walk fails are walked column "
+        "by column as before. Note that the combined walk also transfers the columns of "
+        "the table that are not needed."
+    )
+
+
+SnmpBatchTableWalks = BinaryHostRulespec(
+    group=RulespecGroupAgentSNMP,
+    help_func=_help_snmp_batch_table_walks,
+    name="snmp_batch_table_walks",
+    title=lambda: _("Walk SNMP tables with a single walk"),
+)
+
+
 def _help_snmp_without_sys_descr():
     return _(
         "Devices which do not publish the system description OID .1.3.6.1.2.1.1.1.0 are "
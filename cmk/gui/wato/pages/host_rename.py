@@ -559,6 +559,7 @@ def render_renaming_actions(action_counts: Mapping[str, int]) -> list[str]:
         "agent_deployment": _("Agent deployment status"),
         "piggyback-load": _("Piggyback information from other host"),
         "piggyback-pig": _("Piggyback information for other hosts"),
+        "piggyback-index": _("Piggyback source index entry"),
         "autochecks": _("Disovered services of the host"),
         "host-labels": _("Disovered host labels of the host"),
         "logwatch": _("Logfile information of logwatch plugin"),
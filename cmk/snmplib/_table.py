@@ -57,6 +57,9 @@ def get_snmp_table(
     max_len = 0
     max_len_col = -1
 
+    if backend.config.batch_table_walks:
+        _prefetch_table_columns(section_name, tree, walk_cache=walk_cache, backend=backend)
+
     for oid in tree.oids:
         fetchoid: OID = f"{tree.base}.{oid.column}"
         # column may be integer or string like "1.5.4.2.3"
@@ -126,6 +129,54 @@ def get_snmp_table(
     return new_info
 
 
+def _prefetch_table_columns(
+    section_name: SectionName | None,
+    tree: BackendSNMPTree,
+    *,
+    walk_cache: MutableMapping[str, tuple[bool, SNMPRowInfo]],
+    backend: SNMPBackend,
+) -> None:
+    """Walk the base OID of a table once and put the columns into the walk cache
+
+    This saves one walk per column.  It is only done if all columns are direct
+    children of the base OID, otherwise we might walk huge unrelated subtrees.
+    Columns that are missing in the result of the batched walk are left to
+    `get_snmpwalk`, i.e. they are walked one by one, as are all columns if
+    the batched walk fails.
+    """
+    columns = {
+        str(oid.column): oid.save_to_cache
+        for oid in tree.oids
+        if not isinstance(oid.column, SpecialColumn)
+        and f"{tree.base}.{oid.column}" not in walk_cache
+    }
+    if len(columns) < 2 or not all(column.isdigit() for column in columns):
+        return
+
+    console.vverbose(f"Walking all columns of {tree.base} at once\n")
+    try:
+        rows = get_snmpwalk(
+            section_name,
+            tree.base,
+            tree.base,
+            walk_cache={},
+            save_walk_cache=False,
+            backend=backend,
+        )
+    except MKSNMPError as exc:
+        console.vverbose(f"Batched walk of {tree.base} failed ({exc}), walking columns\n")
+        return
+
+    rows_by_column: dict[str, list[tuple[OID, SNMPRawValue]]] = {}
+    for row_oid, value in rows:
+        column = _extract_end_oid(tree.base, row_oid).split(".", 1)[0]
+        if column in columns:
+            rows_by_column.setdefault(column, []).append((row_oid, value))
+
+    for column, column_rows in rows_by_column.items():
+        walk_cache[f"{tree.base}.{column}"] = (columns[column], column_rows)
+
+
 def _make_index_rows(
     max_column: SNMPRowInfo,
     index_format: SpecialColumn,
@@ -88,6 +88,7 @@ class SNMPHostConfig(NamedTuple):
     snmpv3_contexts_skip_on_timeout: bool
     character_encoding: str | None
     snmp_backend: SNMPBackendEnum
+    batch_table_walks: bool = False
 
     @property
     def is_snmpv3_host(self) -> bool:
@@ -36,3 +36,13 @@ class AutoQueue(Iterable[HostName]):
 
     def oldest(self) -> float | None:
         return min((f.stat().st_mtime for f in self._ls()), default=None)
+
+    def oldest_first(self) -> Sequence[HostName]:
+        """The queued hosts, sorted by the time they have been queued"""
+        queued = []
+        for f in self._ls():
+            try:
+                queued.append((f.stat().st_mtime, HostName(f.name)))
+            except FileNotFoundError:
+                pass  # processed in the meantime
+        return [host_name for _mtime, host_name in sorted(queued)]
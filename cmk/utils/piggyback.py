@@ -5,8 +5,11 @@
 
 import errno
 import logging
+import marshal
 import os
+import struct
 import tempfile
+import time
 from collections.abc import Container, Iterable, Iterator, Mapping, Sequence
 from contextlib import suppress
 from dataclasses import dataclass
@@ -65,6 +68,31 @@ _PiggybackTimeSettingsMap = Mapping[tuple[str | None, str], int]
 # "source_hostname":
 # - Path(tmp/check_mk/piggyback/HOST/SOURCE).name
 # - Path(tmp/check_mk/piggyback_sources/SOURCE).name
+#
+# "source_index_file":
+# - tmp/check_mk/piggyback_sources/.index/SOURCE
+# - Maps the piggybacked hostnames of the source to the mtimes of their piggybacked host source
+#   files. It is maintained by store_piggyback_raw_data() and cleanup_piggyback_files(), thus
+#   the files of all hosts do not have to be searched and stat'ed.
+
+
+# "segment":
+# - The piggybacked raw data of all piggybacked hosts of one source run, written at once:
+#   MAGIC | size of index | index: \nHOST\tOFFSET\tSIZE...\n | data | ...
+#   The index is searched as is, which is a lot cheaper than decoding it.
+# - It is hard linked as piggybacked host source file of every piggybacked host, thus the usual
+#   layout is kept and readers only read the index and their own slice.
+_SEGMENT_MAGIC: Final = b"\x00mk-piggyback-segment\n"
+_SEGMENT_INDEX_SIZE: Final = struct.Struct("!I")
+# Sources with fewer piggybacked hosts store one file per host
+_SEGMENT_MIN_HOSTS: Final = 10
+
+
+class _PiggybackedFile(NamedTuple):
+    source_hostname: HostName
+    piggybacked_hostname: HostName
+    # None if the source is not indexed (yet)
+    mtime: float | None
 
 
 def get_piggyback_raw_data(
@@ -95,9 +123,9 @@ def get_piggyback_raw_data(
             # Raw data is always stored as bytes. Later the content is
             # converted to unicode in abstact.py:_parse_info which respects
             # 'encoding' in section options.
-            raw_data = AgentRawData(store.load_bytes_from_file(file_info.file_path))
+            raw_data = _load_piggyback_raw_data(file_info.file_path, piggybacked_hostname)
 
-        except OSError as e:
+        except (OSError, ValueError, KeyError, struct.error) as e:
             reason = f"Cannot read piggyback raw data from source '{file_info.source_hostname}'"
             piggyback_raw_data = PiggybackRawDataInfo(
                 PiggybackFileInfo(
@@ -140,19 +168,37 @@ def get_piggyback_raw_data(
     return piggyback_data
 
 
+def _load_piggyback_raw_data(
+    piggyback_file_path: Path, piggybacked_hostname: HostName | HostAddress
+) -> AgentRawData:
+    with piggyback_file_path.open("rb") as f:
+        if f.read(len(_SEGMENT_MAGIC)) != _SEGMENT_MAGIC:
+            return AgentRawData(store.load_bytes_from_file(piggyback_file_path))
+
+        (index_size,) = _SEGMENT_INDEX_SIZE.unpack(f.read(_SEGMENT_INDEX_SIZE.size))
+        index = f.read(index_size)
+        if (start := index.find(b"\n%s\t" % str(piggybacked_hostname).encode())) == -1:
+            raise KeyError(piggybacked_hostname)
+        _hostname, offset, size = index[start + 1 : index.index(b"\n", start + 1)].split(b"\t")
+        f.seek(int(offset), os.SEEK_CUR)
+        return AgentRawData(f.read(int(size)))
+
+
 def get_source_and_piggyback_hosts(
     time_settings: PiggybackTimeSettings,
 ) -> Iterator[tuple[HostName, HostName]]:
     """Generates all piggyback pig/piggybacked host pairs that have up-to-date data"""
+    piggybacked_files = _get_piggybacked_files(search_unindexed=_has_unindexed_sources())
+    time_settings_maps = _get_time_settings_maps(piggybacked_files, time_settings)
+    status_file_mtimes = _get_status_file_mtimes(piggybacked_files)
 
-    for piggybacked_host_folder in _get_piggybacked_host_folders():
-        for file_info in _get_piggyback_processed_file_infos(
-            HostName(piggybacked_host_folder.name),
-            time_settings,
-        ):
-            if not file_info.successfully_processed:
-                continue
-            yield HostName(file_info.source_hostname), HostName(piggybacked_host_folder.name)
+    for piggybacked_file in piggybacked_files:
+        if _get_piggybacked_file_info(
+            piggybacked_file,
+            time_settings_maps[piggybacked_file.piggybacked_hostname],
+            status_file_mtimes,
+        ).successfully_processed:
+            yield piggybacked_file.source_hostname, piggybacked_file.piggybacked_hostname
 
 
 def has_piggyback_raw_data(
@@ -258,12 +304,59 @@ def _get_piggyback_processed_file_info(
     settings: _TimeSettingsMap,
 ) -> PiggybackFileInfo:
     try:
-        file_age = cmk.utils.cachefile_age(piggyback_file_path)
+        file_mtime = piggyback_file_path.stat().st_mtime
     except FileNotFoundError:
         return PiggybackFileInfo(
             source_hostname, piggyback_file_path, False, "Piggyback file is missing", 0
         )
 
+    return _make_piggyback_file_info(
+        source_hostname,
+        piggybacked_hostname=piggybacked_hostname,
+        piggyback_file_path=piggyback_file_path,
+        settings=settings,
+        file_mtime=file_mtime,
+        status_file_mtime=_get_mtime(_get_source_status_file_path(source_hostname)),
+    )
+
+
+def _get_piggybacked_file_info(
+    piggybacked_file: _PiggybackedFile,
+    settings: _TimeSettingsMap,
+    status_file_mtimes: Mapping[HostName, float | None],
+) -> PiggybackFileInfo:
+    piggyback_file_path = _get_piggybacked_file_path(
+        piggybacked_file.source_hostname, piggybacked_file.piggybacked_hostname
+    )
+    if piggybacked_file.mtime is None:
+        return _get_piggyback_processed_file_info(
+            piggybacked_file.source_hostname,
+            piggybacked_hostname=piggybacked_file.piggybacked_hostname,
+            piggyback_file_path=piggyback_file_path,
+            settings=settings,
+        )
+
+    return _make_piggyback_file_info(
+        piggybacked_file.source_hostname,
+        piggybacked_hostname=piggybacked_file.piggybacked_hostname,
+        piggyback_file_path=piggyback_file_path,
+        settings=settings,
+        file_mtime=piggybacked_file.mtime,
+        status_file_mtime=status_file_mtimes[piggybacked_file.source_hostname],
+    )
+
+
+def _make_piggyback_file_info(
+    source_hostname: HostName,
+    *,
+    piggybacked_hostname: HostName | HostAddress,
+    piggyback_file_path: Path,
+    settings: _TimeSettingsMap,
+    file_mtime: float,
+    status_file_mtime: float | None,
+) -> PiggybackFileInfo:
+    file_age = time.time() - file_mtime
+
     if (outdated := file_age - settings.max_cache_age(source_hostname, piggybacked_hostname)) > 0:
         return PiggybackFileInfo(
             source_hostname,
@@ -276,8 +369,7 @@ def _get_piggyback_processed_file_info(
     validity_period = settings.validity_period(source_hostname, piggybacked_hostname)
     validity_state = settings.validity_state(source_hostname, piggybacked_hostname)
 
-    status_file_path = _get_source_status_file_path(source_hostname)
-    if not status_file_path.exists():
+    if status_file_mtime is None:
         valid_msg = _validity_period_message(file_age, validity_period)
         return PiggybackFileInfo(
             source_hostname,
@@ -287,7 +379,10 @@ def _get_piggyback_processed_file_info(
             validity_state if valid_msg else 0,
         )
 
-    if _is_piggyback_file_outdated(status_file_path, piggyback_file_path):
+    # On POSIX platforms Python reads atime and mtime at nanosecond resolution
+    # but only writes them at microsecond resolution.
+    # (We're using os.utime() in _store_status_file_of())
+    if int(status_file_mtime) > int(file_mtime):
         valid_msg = _validity_period_message(file_age, validity_period)
         return PiggybackFileInfo(
             source_hostname,
@@ -315,18 +410,20 @@ def _validity_period_message(
     return f" (still valid, {Age(time_left)} left)"
 
 
-def _is_piggyback_file_outdated(
-    status_file_path: Path,
-    piggyback_file_path: Path,
-) -> bool:
+def _get_mtime(path: Path) -> float | None:
     try:
-        # TODO use Path.stat() but be aware of:
-        # On POSIX platforms Python reads atime and mtime at nanosecond resolution
-        # but only writes them at microsecond resolution.
-        # (We're using os.utime() in _store_status_file_of())
-        return os.stat(str(status_file_path))[8] > os.stat(str(piggyback_file_path))[8]
+        return path.stat().st_mtime
     except FileNotFoundError:
-        return True
+        return None
+
+
+def _get_status_file_mtimes(
+    piggybacked_files: Iterable[_PiggybackedFile],
+) -> Mapping[HostName, float | None]:
+    return {
+        source_hostname: _get_mtime(_get_source_status_file_path(source_hostname))
+        for source_hostname in {pf.source_hostname for pf in piggybacked_files}
+    }
 
 
 def _remove_piggyback_file(piggyback_file_path: Path) -> bool:
@@ -348,19 +445,22 @@ def store_piggyback_raw_data(
     source_hostname: HostName,
     piggybacked_raw_data: Mapping[HostName, Sequence[bytes]],
 ) -> None:
-    piggyback_file_paths = []
-    for piggybacked_hostname, lines in piggybacked_raw_data.items():
-        piggyback_file_path = _get_piggybacked_file_path(source_hostname, piggybacked_hostname)
-        logger.log(
-            VERBOSE,
-            "Storing piggyback data for: %r",
-            piggybacked_hostname,
-        )
-        # Raw data is always stored as bytes. Later the content is
-        # converted to unicode in abstact.py:_parse_info which respects
-        # 'encoding' in section options.
-        store.save_bytes_to_file(piggyback_file_path, b"%s\n" % b"\n".join(lines))
-        piggyback_file_paths.append(piggyback_file_path)
+    if len(piggybacked_raw_data) >= _SEGMENT_MIN_HOSTS:
+        piggyback_file_paths = _store_segment(source_hostname, piggybacked_raw_data)
+    else:
+        piggyback_file_paths = {}
+        for piggybacked_hostname, lines in piggybacked_raw_data.items():
+            piggyback_file_path = _get_piggybacked_file_path(source_hostname, piggybacked_hostname)
+            logger.log(
+                VERBOSE,
+                "Storing piggyback data for: %r",
+                piggybacked_hostname,
+            )
+            # Raw data is always stored as bytes. Later the content is
+            # converted to unicode in abstact.py:_parse_info which respects
+            # 'encoding' in section options.
+            store.save_bytes_to_file(piggyback_file_path, b"%s\n" % b"\n".join(lines))
+            piggyback_file_paths[piggybacked_hostname] = piggyback_file_path
 
     # Store the last contact with this piggyback source to be able to filter outdated data later
     # We use the mtime of this file later for comparison.
@@ -368,18 +468,67 @@ def store_piggyback_raw_data(
     # piggyback data was sent this turn.
     if piggybacked_raw_data:
         logger.log(VERBOSE, "Received piggyback data for %d hosts", len(piggybacked_raw_data))
-
-        status_file_path = _get_source_status_file_path(source_hostname)
-        _store_status_file_of(status_file_path, piggyback_file_paths)
+        _store_status_file_of(source_hostname, piggyback_file_paths)
     else:
         logger.debug("Received no piggyback data")
         remove_source_status_file(source_hostname)
 
 
+def _store_segment(
+    source_hostname: HostName,
+    piggybacked_raw_data: Mapping[HostName, Sequence[bytes]],
+) -> Mapping[HostName, Path]:
+    logger.log(
+        VERBOSE,
+        "Storing piggyback data for %d hosts as one segment",
+        len(piggybacked_raw_data),
+    )
+    index_lines = []
+    chunks = []
+    offset = 0
+    for piggybacked_hostname, lines in piggybacked_raw_data.items():
+        chunk = b"%s\n" % b"\n".join(lines)
+        index_lines.append(
+            b"\n%s\t%d\t%d" % (str(piggybacked_hostname).encode(), offset, len(chunk))
+        )
+        chunks.append(chunk)
+        offset += len(chunk)
+    raw_index = b"".join(index_lines) + b"\n"
+
+    store.makedirs(cmk.utils.paths.piggyback_dir)
+    with tempfile.NamedTemporaryFile(
+        "wb",
+        dir=str(cmk.utils.paths.piggyback_dir),
+        prefix=f".{source_hostname}.segment.new",
+        delete=False,
+    ) as tmp:
+        segment_path = Path(tmp.name)
+        segment_path.chmod(0o660)
+        tmp.write(
+            b"".join([_SEGMENT_MAGIC, _SEGMENT_INDEX_SIZE.pack(len(raw_index)), raw_index] + chunks)
+        )
+
+    piggyback_file_paths = {}
+    try:
+        for piggybacked_hostname in piggybacked_raw_data:
+            piggyback_file_path = _get_piggybacked_file_path(source_hostname, piggybacked_hostname)
+            store.makedirs(piggyback_file_path.parent)
+            tmp_path = piggyback_file_path.with_name(f".{source_hostname}.new{os.getpid()}")
+            tmp_path.unlink(missing_ok=True)
+            os.link(segment_path, tmp_path)
+            tmp_path.rename(piggyback_file_path)
+            piggyback_file_paths[piggybacked_hostname] = piggyback_file_path
+    finally:
+        segment_path.unlink(missing_ok=True)
+
+    return piggyback_file_paths
+
+
 def _store_status_file_of(
-    status_file_path: Path,
-    piggyback_file_paths: Iterable[Path],
+    source_hostname: HostName,
+    piggyback_file_paths: Mapping[HostName, Path],
 ) -> None:
+    status_file_path = _get_source_status_file_path(source_hostname)
     store.makedirs(status_file_path.parent)
 
     # Cannot use store.save_bytes_to_file like:
@@ -389,6 +538,7 @@ def _store_status_file_of(
     # - the piggybacked host may check its files
     # - status file is newer (before utime of piggybacked host files is set)
     # => piggybacked host file is outdated
+    # The same applies to the source index file, which is updated before 2.
     with tempfile.NamedTemporaryFile(
         "wb", dir=str(status_file_path.parent), prefix=f".{status_file_path.name}.new", delete=False
     ) as tmp:
@@ -397,7 +547,8 @@ def _store_status_file_of(
 
         tmp_stats = os.stat(tmp_path)
         status_file_times = (tmp_stats.st_atime, tmp_stats.st_mtime)
-        for piggyback_file_path in piggyback_file_paths:
+        mtimes = {}
+        for piggybacked_hostname, piggyback_file_path in piggyback_file_paths.items():
             try:
                 # TODO use Path.stat() but be aware of:
                 # On POSIX platforms Python reads atime and mtime at nanosecond resolution
@@ -406,9 +557,110 @@ def _store_status_file_of(
                 os.utime(str(piggyback_file_path), status_file_times)
             except FileNotFoundError:
                 continue
+            mtimes[piggybacked_hostname] = tmp_stats.st_mtime
+        _update_source_index(source_hostname, mtimes)
     os.rename(tmp_path, str(status_file_path))
 
 
+def _update_source_index(source_hostname: HostName, mtimes: Mapping[HostName, float]) -> None:
+    source_index_file_path = _get_source_index_file_path(source_hostname)
+    with store.locked(source_index_file_path):
+        if (source_index := _load_source_index(source_index_file_path)) is None:
+            # Files may have been stored before the source has been indexed
+            previous_hostnames: Iterable[HostName] = [
+                HostName(piggybacked_host_folder.name)
+                for piggybacked_host_folder in _get_piggybacked_host_folders()
+                if (piggybacked_host_folder / source_hostname).exists()
+            ]
+        else:
+            previous_hostnames = source_index
+
+        # Hosts without data in this turn keep their (outdated) files
+        updated_source_index = {
+            piggybacked_hostname: mtime
+            for piggybacked_hostname in previous_hostnames
+            if piggybacked_hostname not in mtimes
+            and (
+                mtime := _get_mtime(
+                    _get_piggybacked_file_path(source_hostname, piggybacked_hostname)
+                )
+            )
+            is not None
+        }
+        updated_source_index.update(mtimes)
+        store.save_bytes_to_file(source_index_file_path, marshal.dumps(updated_source_index))
+
+
+def _load_source_index(source_index_file_path: Path) -> dict[HostName, float] | None:
+    try:
+        return {
+            HostName(piggybacked_hostname): mtime
+            for piggybacked_hostname, mtime in marshal.loads(
+                source_index_file_path.read_bytes()
+            ).items()
+        }
+    except (FileNotFoundError, EOFError, ValueError, TypeError, AttributeError):
+        # Missing, just created for locking or corrupted
+        return None
+
+
+def _load_source_indexes() -> Mapping[HostName, Mapping[HostName, float]]:
+    return {
+        HostName(source_index_file_path.name): source_index
+        for source_index_file_path in _files_in(_get_source_index_dir())
+        if (source_index := _load_source_index(source_index_file_path)) is not None
+    }
+
+
+def _has_unindexed_sources() -> bool:
+    indexed_source_hostnames = {p.name for p in _files_in(_get_source_index_dir())}
+    return any(p.name not in indexed_source_hostnames for p in _get_source_state_files())
+
+
+def _get_piggybacked_files(*, search_unindexed: bool) -> Sequence[_PiggybackedFile]:
+    """Collect the piggybacked host source files from the source indexes
+
+    Files which are not indexed, eg. stored by older versions, are only found if the piggyback
+    folders are searched."""
+    piggybacked_files = [
+        _PiggybackedFile(source_hostname, piggybacked_hostname, mtime)
+        for source_hostname, source_index in _load_source_indexes().items()
+        for piggybacked_hostname, mtime in source_index.items()
+    ]
+    if not search_unindexed:
+        return piggybacked_files
+
+    indexed = {(pf.source_hostname, pf.piggybacked_hostname) for pf in piggybacked_files}
+    return piggybacked_files + [
+        _PiggybackedFile(source_hostname, piggybacked_hostname, None)
+        for piggybacked_host_folder in _get_piggybacked_host_folders()
+        for source_host in _files_in(piggybacked_host_folder)
+        if (
+            (source_hostname := HostName(source_host.name)),
+            (piggybacked_hostname := HostName(piggybacked_host_folder.name)),
+        )
+        not in indexed
+    ]
+
+
+def _get_time_settings_maps(
+    piggybacked_files: Iterable[_PiggybackedFile],
+    time_settings: PiggybackTimeSettings,
+) -> Mapping[HostName, _TimeSettingsMap]:
+    source_hostnames_by_piggybacked_hostname: dict[HostName, set[HostName]] = {}
+    for piggybacked_file in piggybacked_files:
+        source_hostnames_by_piggybacked_hostname.setdefault(
+            piggybacked_file.piggybacked_hostname, set()
+        ).add(piggybacked_file.source_hostname)
+
+    return {
+        piggybacked_hostname: _TimeSettingsMap(
+            source_hostnames, piggybacked_hostname, time_settings
+        )
+        for piggybacked_hostname, source_hostnames in source_hostnames_by_piggybacked_hostname.items()
+    }
+
+
 #   .--folders/files-------------------------------------------------------.
 #   |         __       _     _                  ____ _ _                   |
 #   |        / _| ___ | | __| | ___ _ __ ___   / / _(_) | ___  ___         |
@@ -452,6 +704,14 @@ def _get_source_status_file_path(source_hostname: HostName) -> Path:
     return cmk.utils.paths.piggyback_source_dir / str(source_hostname)
 
 
+def _get_source_index_dir() -> Path:
+    return cmk.utils.paths.piggyback_source_dir / ".index"
+
+
+def _get_source_index_file_path(source_hostname: HostName) -> Path:
+    return _get_source_index_dir() / str(source_hostname)
+
+
 def _get_piggybacked_file_path(
     source_hostname: HostName,
     piggybacked_hostname: HostName | HostAddress,
@@ -459,6 +719,55 @@ def _get_piggybacked_file_path(
     return cmk.utils.paths.piggyback_dir / piggybacked_hostname / source_hostname
 
 
+def rename_host_in_piggyback_indexes(oldname: HostName, newname: HostName) -> bool:
+    """Update the source indexes after the piggyback files of a host have been renamed
+
+    Segments which are now stored for the renamed piggybacked host are unpacked, because
+    their index still refers to the old name."""
+    changed = False
+    for piggyback_file_path in _files_in(cmk.utils.paths.piggyback_dir / newname):
+        try:
+            with piggyback_file_path.open("rb") as f:
+                if f.read(len(_SEGMENT_MAGIC)) != _SEGMENT_MAGIC:
+                    continue
+            raw_data = _load_piggyback_raw_data(piggyback_file_path, oldname)
+            stats = piggyback_file_path.stat()
+        except (OSError, ValueError, KeyError, struct.error):
+            continue
+        store.save_bytes_to_file(piggyback_file_path, raw_data)
+        os.utime(piggyback_file_path, (stats.st_atime, stats.st_mtime))
+        changed = True
+
+    # The status file and the index of a renamed source
+    old_status_file_path = _get_source_status_file_path(oldname)
+    if old_status_file_path.exists():
+        old_status_file_path.rename(_get_source_status_file_path(newname))
+        changed = True
+
+    old_source_index_file_path = _get_source_index_file_path(oldname)
+    if old_source_index_file_path.exists():
+        new_source_index_file_path = _get_source_index_file_path(newname)
+        with store.locked(old_source_index_file_path), store.locked(new_source_index_file_path):
+            merged_index = _load_source_index(new_source_index_file_path) or {}
+            merged_index.update(_load_source_index(old_source_index_file_path) or {})
+            store.save_bytes_to_file(new_source_index_file_path, marshal.dumps(merged_index))
+            old_source_index_file_path.unlink()
+        changed = True
+
+    # The renamed piggybacked host
+    for source_index_file_path in _files_in(_get_source_index_dir()):
+        with store.locked(source_index_file_path):
+            if (
+                source_index := _load_source_index(source_index_file_path)
+            ) is None or oldname not in source_index:
+                continue
+            source_index[newname] = source_index.pop(oldname)
+            store.save_bytes_to_file(source_index_file_path, marshal.dumps(source_index))
+        changed = True
+
+    return changed
+
+
 # .
 #   .--clean up------------------------------------------------------------.
 #   |                     _                                                |
@@ -484,47 +793,31 @@ def cleanup_piggyback_files(time_settings: PiggybackTimeSettings) -> None:
         time_settings,
     )
 
-    piggybacked_hosts_settings = _get_piggybacked_hosts_settings(time_settings)
-
-    _cleanup_old_source_status_files(piggybacked_hosts_settings)
-    _cleanup_old_piggybacked_files(piggybacked_hosts_settings)
+    piggybacked_files = _get_piggybacked_files(search_unindexed=True)
+    time_settings_maps = _get_time_settings_maps(piggybacked_files, time_settings)
 
-
-def _get_piggybacked_hosts_settings(
-    time_settings: PiggybackTimeSettings,
-) -> Sequence[tuple[Path, Sequence[Path], _TimeSettingsMap]]:
-    piggybacked_hosts_settings = []
-    for piggybacked_host_folder in _get_piggybacked_host_folders():
-        source_hosts = _files_in(piggybacked_host_folder)
-        time_settings_map = _TimeSettingsMap(
-            [HostName(source_host.name) for source_host in source_hosts],
-            HostName(piggybacked_host_folder.name),
-            time_settings,
-        )
-        piggybacked_hosts_settings.append(
-            (piggybacked_host_folder, source_hosts, time_settings_map)
-        )
-    return piggybacked_hosts_settings
+    _cleanup_old_source_status_files(piggybacked_files, time_settings_maps)
+    _cleanup_old_piggybacked_files(piggybacked_files, time_settings_maps)
 
 
 def _cleanup_old_source_status_files(
-    piggybacked_hosts_settings: Iterable[tuple[Path, Iterable[Path], _TimeSettingsMap]]
+    piggybacked_files: Iterable[_PiggybackedFile],
+    time_settings_maps: Mapping[HostName, _TimeSettingsMap],
 ) -> None:
     """Remove source status files which exceed configured maximum cache age.
     There may be several 'Piggybacked Host Files' rules where the max age is configured.
     We simply use the greatest one per source."""
 
     max_cache_age_by_sources: dict[str, int] = {}
-    for piggybacked_host_folder, source_hosts, time_settings in piggybacked_hosts_settings:
-        for source_host in source_hosts:
-            max_cache_age = time_settings.max_cache_age(
-                HostName(source_host.name),
-                HostName(piggybacked_host_folder.name),
-            )
+    for piggybacked_file in piggybacked_files:
+        max_cache_age = time_settings_maps[piggybacked_file.piggybacked_hostname].max_cache_age(
+            piggybacked_file.source_hostname,
+            piggybacked_file.piggybacked_hostname,
+        )
 
-            max_cache_age_of_source = max_cache_age_by_sources.get(source_host.name)
-            if max_cache_age_of_source is None or max_cache_age_of_source <= max_cache_age:
-                max_cache_age_by_sources[source_host.name] = max_cache_age
+        max_cache_age_of_source = max_cache_age_by_sources.get(piggybacked_file.source_hostname)
+        if max_cache_age_of_source is None or max_cache_age_of_source <= max_cache_age:
+            max_cache_age_by_sources[piggybacked_file.source_hostname] = max_cache_age
 
     for source_state_file in _get_source_state_files():
         try:
@@ -553,28 +846,36 @@ def _cleanup_old_source_status_files(
 
 
 def _cleanup_old_piggybacked_files(
-    piggybacked_hosts_settings: Iterable[tuple[Path, Iterable[Path], _TimeSettingsMap]]
+    piggybacked_files: Iterable[_PiggybackedFile],
+    time_settings_maps: Mapping[HostName, _TimeSettingsMap],
 ) -> None:
     """Remove piggybacked data files which exceed configured maximum cache age."""
 
-    for piggybacked_host_folder, source_hosts, time_settings in piggybacked_hosts_settings:
-        for piggybacked_host_source in source_hosts:
-            file_info = _get_piggyback_processed_file_info(
-                HostName(piggybacked_host_source.name),
-                piggybacked_hostname=HostName(piggybacked_host_folder.name),
-                piggyback_file_path=piggybacked_host_source,
-                settings=time_settings,
+    status_file_mtimes = _get_status_file_mtimes(piggybacked_files)
+    removed_files_by_source: dict[HostName, list[_PiggybackedFile]] = {}
+    for piggybacked_file in piggybacked_files:
+        file_info = _get_piggybacked_file_info(
+            piggybacked_file,
+            time_settings_maps[piggybacked_file.piggybacked_hostname],
+            status_file_mtimes,
+        )
+
+        if not file_info.successfully_processed:
+            logger.log(
+                VERBOSE,
+                "Piggyback file '%s' is outdated (%s). Remove it.",
+                file_info.file_path,
+                file_info.message,
+            )
+            _remove_piggyback_file(file_info.file_path)
+            removed_files_by_source.setdefault(piggybacked_file.source_hostname, []).append(
+                piggybacked_file
             )
 
-            if not file_info.successfully_processed:
-                logger.log(
-                    VERBOSE,
-                    "Piggyback file '%s' is outdated (%s). Remove it.",
-                    piggybacked_host_source,
-                    file_info.message,
-                )
-                _remove_piggyback_file(piggybacked_host_source)
+    for source_hostname, removed_files in removed_files_by_source.items():
+        _remove_from_source_index(source_hostname, removed_files)
 
+    for piggybacked_host_folder in _get_piggybacked_host_folders():
         # Remove empty backed host directory
         try:
             piggybacked_host_folder.rmdir()
@@ -587,3 +888,23 @@ def _cleanup_old_piggybacked_files(
             "Piggyback folder '%s' is empty. Removed it.",
             piggybacked_host_folder,
         )
+
+
+def _remove_from_source_index(
+    source_hostname: HostName, removed_files: Iterable[_PiggybackedFile]
+) -> None:
+    source_index_file_path = _get_source_index_file_path(source_hostname)
+    with store.locked(source_index_file_path):
+        if (source_index := _load_source_index(source_index_file_path)) is None:
+            return
+
+        for removed_file in removed_files:
+            # The source may have stored new data in the meantime
+            if source_index.get(removed_file.piggybacked_hostname) == removed_file.mtime:
+                del source_index[removed_file.piggybacked_hostname]
+
+        if not source_index and not _get_source_status_file_path(source_hostname).exists():
+            source_index_file_path.unlink(missing_ok=True)
+            return
+
+        store.save_bytes_to_file(source_index_file_path, marshal.dumps(source_index))
@@ -72,18 +72,18 @@ def get_rrd_data_with_mk_general_exception(
     host_name: HostName,
     service_description: str,
     metric_name: str,
-    fromtime: int,
-    untiltime: int,
-) -> livestatus.RRDResponse:
-    """Wrapper to raise MKGeneralException."""
+    time_ranges: Sequence[tuple[int, int]],
+) -> Sequence[livestatus.RRDResponse]:
+    """Wrapper to raise MKGeneralException.
+
+    All time ranges are fetched with a single Livestatus query."""
     try:
-        response = livestatus.get_rrd_data(
+        response = livestatus.get_rrd_data_of_time_ranges(
             livestatus.LocalConnection(),
             host_name,
             service_description,
             f"{metric_name}.max",
-            fromtime,
-            untiltime,
+            time_ranges,
         )
     except livestatus.MKLivestatusNotFoundError as e:
         if cmk.utils.debug.enabled():
@@ -167,15 +167,14 @@ def compute_prediction(
             response.values,
             from_time - start,
         )
-        for start, end in time_windows
-        if (
-            response := get_rrd_data_with_mk_general_exception(
+        for (start, _end), response in zip(
+            time_windows,
+            get_rrd_data_with_mk_general_exception(
                 host_name,
                 service_description,
                 info.dsname,
-                start,
-                end,
-            )
+                time_windows,
+            ),
         )
     ]
 
@@ -214,10 +213,11 @@ def _forward_fill_resample(
     if current_range == new_range:
         return values
 
+    start, step = current_range.start, current_range.step
     idx_max = len(values) - 1
     return [
-        values[max(0, min(int((t - current_range.start) / current_range.step), idx_max))]
-        for t in new_range
+        values[0 if idx < 0 else idx if idx < idx_max else idx_max]
+        for idx in ((t - start) // step for t in new_range)
     ]
 
 
@@ -11,7 +11,9 @@ from __future__ import annotations
 
 import gzip
 import io
+import marshal
 import pprint
+import struct
 from collections import Counter
 from collections.abc import Callable, Iterable, Mapping, Sequence
 from dataclasses import dataclass, field
@@ -38,8 +40,8 @@ from cmk.utils.hostaddress import HostName
 #   - MISSING (see mk/base/agent_based/inventory.py::_get_intervals_from_config) -> _use_nothing
 #   - 'all' -> _use_all
 # TODO Centralize different stores and loaders of tree files:
-#   - inventory/HOSTNAME, inventory/HOSTNAME.gz, inventory/.last
-#   - inventory_archive/HOSTNAME/TIMESTAMP,
+#   - inventory/HOSTNAME, inventory/HOSTNAME.gz, inventory/HOSTNAME.indexed, inventory/.last
+#   - inventory_archive/HOSTNAME/TIMESTAMP, inventory_archive/HOSTNAME/deltas
 #   - inventory_delta_cache/HOSTNAME/TIMESTAMP_{TIMESTAMP,None}
 #   - status_data/HOSTNAME, status_data/HOSTNAME.gz
 
@@ -1595,9 +1597,93 @@ class ImmutableDeltaTree:
 #   '----------------------------------------------------------------------'
 
 
-def load_tree(filepath: Path) -> ImmutableTree:
-    if raw_tree := store.load_object_from_file(filepath, default=None):
+# The indexed tree file is written next to the tree file. It contains the marshalled attributes
+# and table of every node and an index of the node paths, thus single subtrees can be loaded
+# without reading and evaluating the whole tree:
+#   MAGIC | size of index | index: {path: (offset, size), ...} | chunk | chunk | ...
+# The chunks are stored in depth-first order, thus the nodes of a subtree form one block.
+_INDEXED_TREE_MAGIC = b"\x00mk-sd-indexed-tree\n"
+_INDEX_SIZE = struct.Struct("!Q")
+
+
+def _make_indexed_tree_filepath(filepath: Path) -> Path:
+    return filepath.with_name(f"{filepath.name}.indexed")
+
+
+def _serialize_indexed_tree(raw_tree: SDRawTree) -> bytes:
+    index: dict[SDPath, tuple[int, int]] = {}
+    chunks: list[bytes] = []
+    offset = 0
+    raw_nodes: list[tuple[SDPath, SDRawTree]] = [((), raw_tree)]
+    while raw_nodes:
+        path, raw_node = raw_nodes.pop()
+        chunk = marshal.dumps((dict(raw_node["Attributes"]), dict(raw_node["Table"])))
+        index[path] = (offset, len(chunk))
+        chunks.append(chunk)
+        offset += len(chunk)
+        raw_nodes.extend(
+            (path + (name,), raw_child) for name, raw_child in reversed(raw_node["Nodes"].items())
+        )
+
+    raw_index = marshal.dumps(index)
+    return b"".join([_INDEXED_TREE_MAGIC, _INDEX_SIZE.pack(len(raw_index)), raw_index] + chunks)
+
+
+def _setdefault_raw_node(raw_tree: dict, path: SDPath) -> dict:
+    raw_node = raw_tree
+    for name in path:
+        raw_node = raw_node["Nodes"].setdefault(name, {"Attributes": {}, "Table": {}, "Nodes": {}})
+    return raw_node
+
+
+def _load_raw_tree_from_index(filepath: Path, path: SDPath) -> Mapping | None:
+    indexed_filepath = _make_indexed_tree_filepath(filepath)
+    try:
+        if indexed_filepath.stat().st_mtime_ns < filepath.stat().st_mtime_ns:
+            # The tree file has been written without index, eg. by an older version
+            return None
+
+        with indexed_filepath.open("rb") as f:
+            if f.read(len(_INDEXED_TREE_MAGIC)) != _INDEXED_TREE_MAGIC:
+                return None
+            (index_size,) = _INDEX_SIZE.unpack(f.read(_INDEX_SIZE.size))
+            index: Mapping[SDPath, tuple[int, int]] = marshal.loads(f.read(index_size))
+            locations = [
+                (node_path, offset, size)
+                for node_path, (offset, size) in index.items()
+                if node_path[: len(path)] == path
+            ]
+            if not locations:
+                return {"Attributes": {}, "Table": {}, "Nodes": {}}
+
+            start = locations[0][1]
+            f.seek(f.tell() + start)
+            block = f.read(locations[-1][1] + locations[-1][2] - start)
+    except (OSError, EOFError, ValueError, TypeError, struct.error):
+        return None
+
+    raw_tree: dict = {"Attributes": {}, "Table": {}, "Nodes": {}}
+    for node_path, offset, size in locations:
+        raw_node = _setdefault_raw_node(raw_tree, node_path)
+        raw_node["Attributes"], raw_node["Table"] = marshal.loads(
+            block[offset - start : offset - start + size]
+        )
+    return raw_tree
+
+
+def _make_subtree(tree: ImmutableTree, path: SDPath) -> ImmutableTree:
+    node = tree.get_tree(path)
+    for idx in range(len(path) - 1, -1, -1):
+        node = ImmutableTree(path=path[:idx], nodes_by_name={path[idx]: node} if node else {})
+    return node
+
+
+def load_tree(filepath: Path, path: SDPath = ()) -> ImmutableTree:
+    """Load the tree or only the subtree below 'path' (and the empty nodes leading to it)"""
+    if (raw_tree := _load_raw_tree_from_index(filepath, path)) is not None:
         return ImmutableTree.deserialize(raw_tree)
+    if raw_tree := store.load_object_from_file(filepath, default=None):
+        return _make_subtree(ImmutableTree.deserialize(raw_tree), path)
     return ImmutableTree()
 
 
@@ -1606,21 +1692,31 @@ class TreeStore:
         self._tree_dir = Path(tree_dir)
         self._last_filepath = Path(tree_dir) / ".last"
 
-    def load(self, *, host_name: HostName) -> ImmutableTree:
-        return load_tree(self._tree_file(host_name))
+    def load(self, *, host_name: HostName, path: SDPath = ()) -> ImmutableTree:
+        return load_tree(self._tree_file(host_name), path)
 
     def save(self, *, host_name: HostName, tree: MutableTree, pretty: bool = False) -> None:
         self._tree_dir.mkdir(parents=True, exist_ok=True)
 
-        tree_file = self._tree_file(host_name)
-
         output = tree.serialize()
-        store.save_object_to_file(tree_file, output, pretty=pretty)
 
-        buf = io.BytesIO()
-        with gzip.GzipFile(fileobj=buf, mode="wb") as f:
-            f.write((repr(output) + "\n").encode("utf-8"))
-        store.save_bytes_to_file(self._gz_file(host_name), buf.getvalue())
+        # The tree file and the gzipped tree file are provided by Livestatus (columns
+        # mk_inventory and mk_inventory_gz), thus these keep the format of python literals.
+        raw_output = (repr(output) + "\n").encode("utf-8")
+        store.save_bytes_to_file(
+            self._tree_file(host_name),
+            (pprint.pformat(output) + "\n").encode("utf-8") if pretty else raw_output,
+        )
+        store.save_bytes_to_file(self._gz_file(host_name), gzip.compress(raw_output))
+
+        # The indexed tree file must be written after the tree file, see load_tree
+        try:
+            store.save_bytes_to_file(
+                self._indexed_tree_file(host_name), _serialize_indexed_tree(output)
+            )
+        except ValueError:
+            # Values which cannot be marshalled; loading falls back to the tree file
+            self._indexed_tree_file(host_name).unlink(missing_ok=True)
 
         # Inform Livestatus about the latest inventory update
         self._last_filepath.touch()
@@ -1628,6 +1724,7 @@ class TreeStore:
     def remove(self, *, host_name: HostName) -> None:
         self._tree_file(host_name).unlink(missing_ok=True)
         self._gz_file(host_name).unlink(missing_ok=True)
+        self._indexed_tree_file(host_name).unlink(missing_ok=True)
 
     def _tree_file(self, host_name: HostName) -> Path:
         return self._tree_dir / str(host_name)
@@ -1635,6 +1732,36 @@ class TreeStore:
     def _gz_file(self, host_name: HostName) -> Path:
         return self._tree_dir / f"{host_name}.gz"
 
+    def _indexed_tree_file(self, host_name: HostName) -> Path:
+        return _make_indexed_tree_filepath(self._tree_file(host_name))
+
+
+class HistoryDelta(NamedTuple):
+    previous_timestamp: int | None
+    timestamp: int
+    delta_tree: ImmutableDeltaTree
+
+
+# Every archived tree is recorded as delta to the previously archived tree in the deltas file
+# of the host archive:
+#   timestamp | size of record | record: (previous timestamp, delta tree) | timestamp | ...
+# The latest archived tree and every _HISTORY_KEYFRAME_INTERVAL-th tree (keyframes) are kept as
+# full copies, all other full copies are removed.
+_HISTORY_DELTAS_FILENAME = "deltas"
+_HISTORY_RECORD_HEADER = struct.Struct("!qI")
+_HISTORY_KEYFRAME_INTERVAL = 20
+
+
+def _complete_history_records(raw: bytes) -> bytes:
+    """Cut off an incomplete record at the end of the recorded deltas"""
+    offset = 0
+    while offset + _HISTORY_RECORD_HEADER.size <= len(raw):
+        _timestamp, size = _HISTORY_RECORD_HEADER.unpack_from(raw, offset)
+        if offset + _HISTORY_RECORD_HEADER.size + size > len(raw):
+            break
+        offset += _HISTORY_RECORD_HEADER.size + size
+    return raw[:offset]
+
 
 class TreeOrArchiveStore(TreeStore):
     def __init__(self, tree_dir: Path | str, archive: Path | str) -> None:
@@ -1645,25 +1772,166 @@ class TreeOrArchiveStore(TreeStore):
         if (tree_file := self._tree_file(host_name=host_name)).exists():
             return load_tree(tree_file)
 
-        try:
-            latest_archive_tree_file = max(
-                self._archive_host_dir(host_name).iterdir(), key=lambda tp: int(tp.name)
-            )
-        except (FileNotFoundError, ValueError):
+        if not (archived_timestamps := self._get_archived_tree_timestamps(host_name)):
             return ImmutableTree()
 
-        return load_tree(latest_archive_tree_file)
+        return load_tree(self._archive_host_dir(host_name) / str(archived_timestamps[-1]))
 
     def _archive_host_dir(self, host_name: HostName) -> Path:
         return self._archive_dir / str(host_name)
 
+    def _history_deltas_file(self, host_name: HostName) -> Path:
+        return self._archive_host_dir(host_name) / _HISTORY_DELTAS_FILENAME
+
+    def _get_archived_tree_timestamps(self, host_name: HostName) -> Sequence[int]:
+        try:
+            return sorted(
+                int(filepath.name)
+                for filepath in self._archive_host_dir(host_name).iterdir()
+                if filepath.name.isdigit()
+            )
+        except FileNotFoundError:
+            return []
+
     def archive(self, *, host_name: HostName) -> None:
         if not (tree_file := self._tree_file(host_name)).exists():
             return
         target_dir = self._archive_host_dir(host_name)
         target_dir.mkdir(parents=True, exist_ok=True)
-        tree_file.rename(target_dir / str(int(tree_file.stat().st_mtime)))
+
+        timestamp = int(tree_file.stat().st_mtime)
+        archived_timestamps = self._get_archived_tree_timestamps(host_name)
+        previous_timestamp = archived_timestamps[-1] if archived_timestamps else None
+        self._record_history_delta(
+            host_name,
+            HistoryDelta(
+                previous_timestamp=previous_timestamp,
+                timestamp=timestamp,
+                delta_tree=load_tree(tree_file).difference(
+                    ImmutableTree()
+                    if previous_timestamp is None
+                    else load_tree(target_dir / str(previous_timestamp))
+                ),
+            ),
+        )
+
+        tree_file.rename(target_dir / str(timestamp))
         self._gz_file(host_name).unlink(missing_ok=True)
+        self._indexed_tree_file(host_name).unlink(missing_ok=True)
+
+        if previous_timestamp is not None and previous_timestamp != timestamp:
+            self._remove_redundant_tree(host_name, archived_timestamps)
+
+    def _record_history_delta(self, host_name: HostName, history_delta: HistoryDelta) -> None:
+        try:
+            record = marshal.dumps(
+                (history_delta.previous_timestamp, dict(history_delta.delta_tree.serialize()))
+            )
+        except ValueError:
+            # Values which cannot be marshalled; the full copy of the tree will be kept
+            return
+
+        # The file is rewritten atomically: An interrupted append would leave a partial record
+        # behind and all records appended later would be read at wrong offsets.
+        deltas_file = self._history_deltas_file(host_name)
+        with store.locked(deltas_file):
+            store.save_bytes_to_file(
+                deltas_file,
+                _complete_history_records(store.load_bytes_from_file(deltas_file))
+                + _HISTORY_RECORD_HEADER.pack(history_delta.timestamp, len(record))
+                + record,
+            )
+
+    def _remove_redundant_tree(
+        self, host_name: HostName, archived_timestamps: Sequence[int]
+    ) -> None:
+        # The full copy of the previously archived tree is not needed anymore if the tree is
+        # recorded as delta and is not a keyframe.
+        *keyframe_timestamps, previous_timestamp = archived_timestamps
+        if not keyframe_timestamps:
+            return
+
+        recorded_timestamps = [t for t, _record in self._iter_history_records(host_name)]
+        if previous_timestamp not in recorded_timestamps:
+            return
+
+        if (
+            len(
+                [
+                    t
+                    for t in recorded_timestamps
+                    if keyframe_timestamps[-1] < t <= previous_timestamp
+                ]
+            )
+            >= _HISTORY_KEYFRAME_INTERVAL
+        ):
+            return
+
+        (self._archive_host_dir(host_name) / str(previous_timestamp)).unlink(missing_ok=True)
+
+    def _iter_history_records(
+        self,
+        host_name: HostName,
+        accept_timestamp: Callable[[int], bool] = lambda t: False,
+    ) -> Iterable[tuple[int, bytes | None]]:
+        # Only the records of accepted timestamps are read, all others are skipped.
+        # Reading stops at the first incomplete record.
+        try:
+            with self._history_deltas_file(host_name).open("rb") as f:
+                file_size = f.seek(0, io.SEEK_END)
+                f.seek(0)
+                while (
+                    len(header := f.read(_HISTORY_RECORD_HEADER.size))
+                    == _HISTORY_RECORD_HEADER.size
+                ):
+                    timestamp, size = _HISTORY_RECORD_HEADER.unpack(header)
+                    if f.tell() + size > file_size:
+                        return
+                    if accept_timestamp(timestamp):
+                        yield timestamp, f.read(size)
+                    else:
+                        f.seek(size, io.SEEK_CUR)
+                        yield timestamp, None
+        except FileNotFoundError:
+            return
+
+    def get_history_timestamps(self, *, host_name: HostName) -> Sequence[int]:
+        """Timestamps of all archived trees; these are stored as full copy or as delta"""
+        return sorted(
+            set(self._get_archived_tree_timestamps(host_name)).union(
+                t for t, _record in self._iter_history_records(host_name)
+            )
+        )
+
+    def load_history_deltas(
+        self,
+        *,
+        host_name: HostName,
+        from_timestamp: int | None = None,
+        until_timestamp: int | None = None,
+    ) -> Sequence[HistoryDelta]:
+        """Load the recorded deltas of the archived trees within the given time range without
+        loading any full tree"""
+        history_deltas: list[HistoryDelta] = []
+        for timestamp, record in self._iter_history_records(
+            host_name,
+            lambda t: (from_timestamp is None or from_timestamp <= t)
+            and (until_timestamp is None or t <= until_timestamp),
+        ):
+            if record is None:
+                continue
+            try:
+                previous_timestamp, raw_delta_tree = marshal.loads(record)
+            except (EOFError, ValueError, TypeError):
+                continue
+            history_deltas.append(
+                HistoryDelta(
+                    previous_timestamp=previous_timestamp,
+                    timestamp=timestamp,
+                    delta_tree=ImmutableDeltaTree.deserialize(raw_delta_tree),
+                )
+            )
+        return history_deltas
 
 
 # .
@@ -12,6 +12,7 @@ import json
 import os
 import re
 import select
+import selectors
 import socket
 import ssl
 import threading
@@ -154,6 +155,9 @@ remove_cache_regex = re.compile("\nCache:[^\n]*")
 # Pattern for allowed UserId values
 validate_user_id_regex = re.compile(r"^[\w$][-@.\w$]*$", re.UNICODE)
 
+# Timeout for receiving the body of a response once its header has arrived
+RESPONSE_BODY_TIMEOUT = 30
+
 
 class MKLivestatusException(Exception):
     pass
@@ -498,6 +502,46 @@ def _parse_socket_url(url: str) -> tuple[socket.AddressFamily, str | tuple[str,
     )
 
 
+def _response_data(code: str, data: bytes) -> bytes:
+    """Return the body of a successful response, raise the matching error otherwise"""
+    if code == "200":
+        return data
+
+    error_info = data.decode("utf-8")
+    if code == "404":
+        raise MKLivestatusTableNotFoundError(f"Not Found ({code}): {error_info!r}")
+
+    if code == "502":
+        raise MKLivestatusBadGatewayError(error_info)
+
+    raise MKLivestatusQueryError(f"{code}: {error_info}")
+
+
+def _decode_python3(data: str) -> LivestatusResponse:
+    """Decode a response in the "python3" output format
+
+    Apart from None and blobs, the core renders this format like JSON. Strings
+    never contain a raw quote, so everything outside of them can be found by
+    splitting at the quotes. That makes the fast JSON parser usable for nearly
+    all responses. Everything it rejects, like blobs or characters outside of
+    the BMP, is handed to the slow but complete literal_eval.
+
+    >>> _decode_python3('[["None",None,1.5],[[],{"x":0}]]')
+    [['None', None, 1.5], [[], {'x': 0}]]
+    >>> _decode_python3('[[b"x",None]]')
+    [[b'x', None]]
+    """
+    translated = data
+    if "None" in data:
+        parts = data.split('"')
+        parts[::2] = [part.replace("None", "null") for part in parts[::2]]
+        translated = '"'.join(parts)
+    try:
+        return json.loads(translated)
+    except ValueError:
+        return ast.literal_eval(data)
+
+
 class SingleSiteConnection(Helpers):
     # So we only collect in a specific thread, and not in all of them. We also use
     # a class-variable for this case, so we activate this across all sites at once.
@@ -739,61 +783,18 @@ class SingleSiteConnection(Helpers):
     ) -> bytes:
         try:
             # Headers are always ASCII encoded
-            resp = self.receive_data(16)
-            code = resp[0:3].decode("ascii")
-            try:
-                length = int(resp[4:15].lstrip())
-            except Exception:
-                self.disconnect()
-                raise MKLivestatusSocketError(
-                    f"Malformed response header {resp!r}. Livestatus TCP socket might be unreachable or wrong encryption settings are used."
-                )
+            code, length = self.parse_response_header(self.receive_data(16))
 
             # Apply a lower timeout for the content because the data is already available
             # in the socket. The liveproxyd (same system) has the complete data available
             # while the data from a standard connection can still take some time.
             # 30 seconds should be more than enough for the maximum telegram size of 100MB
-            data = self.receive_data(length, 30)
-
-            if code == "200":
-                return data
-
-            error_info = data.decode("utf-8")
-            if code == "404":
-                raise MKLivestatusTableNotFoundError(f"Not Found ({code}): {error_info!r}")
-
-            if code == "502":
-                raise MKLivestatusBadGatewayError(error_info)
-
-            raise MKLivestatusQueryError(f"{code}: {error_info}")
+            return _response_data(code, self.receive_data(length, RESPONSE_BODY_TIMEOUT))
 
         except (MKLivestatusSocketClosed, OSError) as e:
-            # In case of an IO error or the other side having
-            # closed the socket do a reconnect and try again
-            self.disconnect()
-
-            # In case of unix socket connections, do not start any reconnection attempts
-            # The other side (liveproxyd) might have had a good reason to disconnect
-            # Note: In most scenarios the liveproxyd still tries to send back a reasonable
-            # error response back to the client
-            if self.socket and self.socket.family == socket.AF_UNIX:
-                raise MKLivestatusSocketError("Unix socket was closed by peer")
-
-            now = time.time()
-            if not timeout_at or timeout_at > now:
-                if timeout_at is None:
-                    # Try until timeout reached in case there was a timeout configured.
-                    # Otherwise only retry once.
-                    timeout_at = now
-                    if self.timeout:
-                        timeout_at += self.timeout
-
-                time.sleep(0.1)
-                self.connect()
-                self.send_query(query)
-                # do not send query again -> danger of infinite loop
-                return self.receive_raw_response(query, suppress_exceptions, timeout_at)
-            raise MKLivestatusSocketError(str(e))
+            return self.reconnect_and_receive_raw_response(
+                query, suppress_exceptions, timeout_at, e
+            )
 
         except suppress_exceptions:
             raise
@@ -805,11 +806,55 @@ class SingleSiteConnection(Helpers):
             # FIXME: ? self.disconnect()
             raise MKLivestatusSocketError("Unhandled exception: %s" % e)
 
+    def parse_response_header(self, header: bytes) -> tuple[str, int]:
+        """Return the status code and the length of the body of a fixed16 response"""
+        try:
+            return header[0:3].decode("ascii"), int(header[4:15].lstrip())
+        except Exception:
+            self.disconnect()
+            raise MKLivestatusSocketError(
+                f"Malformed response header {header!r}. Livestatus TCP socket might be unreachable or wrong encryption settings are used."
+            )
+
+    def reconnect_and_receive_raw_response(
+        self,
+        query: str,
+        suppress_exceptions: tuple[type[Exception], ...],
+        timeout_at: float | None,
+        e: Exception,
+    ) -> bytes:
+        # In case of an IO error or the other side having
+        # closed the socket do a reconnect and try again
+        self.disconnect()
+
+        # In case of unix socket connections, do not start any reconnection attempts
+        # The other side (liveproxyd) might have had a good reason to disconnect
+        # Note: In most scenarios the liveproxyd still tries to send back a reasonable
+        # error response back to the client
+        if self.socket and self.socket.family == socket.AF_UNIX:
+            raise MKLivestatusSocketError("Unix socket was closed by peer")
+
+        now = time.time()
+        if not timeout_at or timeout_at > now:
+            if timeout_at is None:
+                # Try until timeout reached in case there was a timeout configured.
+                # Otherwise only retry once.
+                timeout_at = now
+                if self.timeout:
+                    timeout_at += self.timeout
+
+            time.sleep(0.1)
+            self.connect()
+            self.send_query(query)
+            # do not send query again -> danger of infinite loop
+            return self.receive_raw_response(query, suppress_exceptions, timeout_at)
+        raise MKLivestatusSocketError(str(e))
+
     def parse_raw_response(self, raw_response: bytes, query: Query) -> LivestatusResponse:
         data = raw_response.decode("utf-8")
         try:
             response: LivestatusResponse = (
-                json.loads(data) if query.supports_json_format() else ast.literal_eval(data)
+                json.loads(data) if query.supports_json_format() else _decode_python3(data)
             )
             return response
         except (ValueError, SyntaxError):
@@ -916,6 +961,60 @@ class ConnectedSite(NamedTuple):
 ConnectedSites = list[ConnectedSite]
 
 
+class _ResponseReader:
+    """Reads the fixed16 response of a site piece by piece, whenever data is available"""
+
+    def __init__(self, connected_site: ConnectedSite, query: str) -> None:
+        self.connected_site = connected_site
+        self.query = query
+        self.code: str | None = None
+        self.deadline: float | None = None
+        self._data = BytesIO()
+        self._remaining = 16  # first the header, then the body
+
+    @property
+    def socket(self) -> socket.socket:
+        if (sock := self.connected_site.connection.socket) is None:
+            raise MKLivestatusSocketError(
+                "Socket to '%s' is not connected" % self.connected_site.connection.socketurl
+            )
+        return sock
+
+    def read(self) -> bytes | None:
+        """Read the available data, return the raw response once it is complete"""
+        sock = self.socket
+        while True:
+            if self._remaining:
+                packet = sock.recv(min(self._remaining, 65536))
+                if not packet:
+                    raise MKLivestatusSocketClosed(
+                        "Read zero data from socket, remote peer closed connection."
+                    )
+                self._remaining -= len(packet)
+                self._data.write(packet)
+
+            if not self._remaining:
+                if self.code is not None:
+                    return _response_data(self.code, self._data.getvalue())
+                self.code, self._remaining = self.connected_site.connection.parse_response_header(
+                    self._data.getvalue()
+                )
+                self._data = BytesIO()
+                self.deadline = time.time() + RESPONSE_BODY_TIMEOUT
+                continue
+
+            # SSL sockets may have data pending which select() does not know about
+            if not (isinstance(sock, ssl.SSLSocket) and sock.pending()):
+                return None
+
+    def check_timeout(self) -> None:
+        if self.deadline is not None and time.time() > self.deadline:
+            raise MKLivestatusSocketError(
+                f"{RESPONSE_BODY_TIMEOUT}s while reading data from socket. "
+                f"Remaining data: {self._remaining} bytes"
+            )
+
+
 class MultiSiteConnection(Helpers):
     def __init__(  # pylint: disable=too-many-branches
         self, sites: SiteConfigurations, disabled_sites: SiteConfigurations | None = None
@@ -1178,11 +1277,34 @@ class MultiSiteConnection(Helpers):
     # New parallelized version of query(). The semantics differs in the handling
     # of Limit: since all sites are queried in parallel, the Limit: is simply
     # applied to all sites - resulting in possibly more results then Limit requests.
-    def query_parallel(  # pylint: disable=too-many-branches
+    def query_parallel(
         self,
         query: Query,
         add_headers: str = "",
     ) -> LivestatusResponse:
+        # Keep the order of the sites, independent of the order the responses arrive in
+        site_ids = [connected_site.id for connected_site in self.connections]
+        responses = dict(self._receive_parallel(query, add_headers))
+        result = LivestatusResponse([])
+        for site_id in site_ids:
+            result.extend(responses.get(site_id, []))
+        return result
+
+    def iter_query(self, query: QueryTypes, add_headers: str = "") -> Iterator[LivestatusRow]:
+        """Yield the rows of all sites, those of the fastest sites first
+
+        The response of a site is parsed as soon as it has been received completely,
+        so the caller does not have to wait for the slowest site before processing
+        the first rows.
+        """
+        normalized_query = Query(query) if not isinstance(query, Query) else query
+        with _livestatus_output_format_switcher(normalized_query, self):
+            for _site_id, rows in self._receive_parallel(normalized_query, add_headers):
+                yield from rows
+
+    def _receive_parallel(  # pylint: disable=too-many-branches
+        self, query: Query, add_headers: str
+    ) -> Iterator[tuple[SiteId, LivestatusResponse]]:
         stillalive = []
         if self.only_sites is not None:
             connect_to_sites = [c for c in self.connections if c[0] in self.only_sites]
@@ -1198,69 +1320,82 @@ class MultiSiteConnection(Helpers):
             limit_header = ""
 
         # First send all queries
-        retrieve_responses: list[tuple[str, ConnectedSite]] = []
+        readers: list[_ResponseReader] = []
         for connected_site in connect_to_sites:
             try:
                 str_query = connected_site.connection.build_query(query, add_headers + limit_header)
                 connected_site.connection.send_query(str_query)
-                retrieve_responses.append((str_query, connected_site))
-            except LivestatusTestingError:
-                raise
-            except Exception as e:
-                self.deadsites[connected_site.id] = {
-                    "exception": e,
-                    "site": connected_site.config,
-                }
-
-        # Then retrieve all raw responses. We will be as slow as the slowest of all connections.
-        site_responses: list[tuple[ConnectedSite, bytes]] = []
-        for str_query, connected_site in retrieve_responses:
-            try:
-                site_responses.append(
-                    (
-                        connected_site,
-                        connected_site.connection.receive_raw_response(
-                            str_query, query.suppress_exceptions
-                        ),
-                    )
-                )
-            except query.suppress_exceptions:
-                # Mostly handles exception types MKLivestatusTableNotFoundError
-                stillalive.append(connected_site)
-                continue
+                readers.append(_ResponseReader(connected_site, str_query))
             except LivestatusTestingError:
                 raise
             except Exception as e:
-                connected_site.connection.disconnect()
                 self.deadsites[connected_site.id] = {
                     "exception": e,
                     "site": connected_site.config,
                 }
 
-        # Convert responses to python format
-        result = LivestatusResponse([])
-        for connected_site, raw_response in site_responses:
-            try:
-                rows = connected_site.connection.parse_raw_response(raw_response, query)
-                stillalive.append(connected_site)
-                if self.prepend_site:
-                    for row in rows:
-                        row.insert(0, connected_site.id)
-                result.extend(rows)
-            except query.suppress_exceptions:
-                stillalive.append(connected_site)
-                continue
-            except LivestatusTestingError:
-                raise
-            except Exception as e:
-                connected_site.connection.disconnect()
-                self.deadsites[connected_site.id] = {
-                    "exception": e,
-                    "site": connected_site.config,
-                }
+        # Then read from all sites at once and convert each response as soon as it is complete
+        selector = selectors.DefaultSelector()
+        try:
+            for reader in readers:
+                selector.register(reader.socket, selectors.EVENT_READ, reader)
+
+            while selector.get_map():
+                ready = [key for key, _events in selector.select(timeout=1.0)]
+                for key in ready or list(selector.get_map().values()):
+                    reader = key.data
+                    connected_site = reader.connected_site
+                    try:
+                        if not ready:
+                            reader.check_timeout()
+                            continue
+                        try:
+                            raw_response = reader.read()
+                        except (MKLivestatusSocketClosed, OSError) as e:
+                            selector.unregister(key.fileobj)
+                            raw_response = (
+                                connected_site.connection.reconnect_and_receive_raw_response(
+                                    reader.query, query.suppress_exceptions, None, e
+                                )
+                            )
+                        else:
+                            if raw_response is None:
+                                reader.check_timeout()
+                                continue
+                            selector.unregister(key.fileobj)
+                        rows = connected_site.connection.parse_raw_response(raw_response, query)
+                    except query.suppress_exceptions:
+                        # Mostly handles exception types MKLivestatusTableNotFoundError
+                        with contextlib.suppress(KeyError):
+                            selector.unregister(key.fileobj)
+                        stillalive.append(connected_site)
+                        continue
+                    except LivestatusTestingError:
+                        raise
+                    except Exception as e:
+                        with contextlib.suppress(KeyError):
+                            selector.unregister(key.fileobj)
+                        connected_site.connection.disconnect()
+                        self.deadsites[connected_site.id] = {
+                            "exception": e,
+                            "site": connected_site.config,
+                        }
+                        continue
 
-        self.connections = stillalive
-        return result
+                    stillalive.append(connected_site)
+                    if self.prepend_site:
+                        for row in rows:
+                            row.insert(0, connected_site.id)
+                    yield connected_site.id, rows
+        finally:
+            # The caller may have stopped early: Responses which have not been read
+            # completely would garble the following queries on these connections.
+            for key in list(selector.get_map().values()):
+                selector.unregister(key.fileobj)
+                key.data.connected_site.connection.disconnect()
+                stillalive.append(key.data.connected_site)
+            selector.close()
+            self.connections = sorted(stillalive, key=self.connections.index)
 
     def command(self, command: str, sitename: SiteId | None = SiteId("local")) -> None:
         if sitename in self.deadsites:
@@ -1457,16 +1592,51 @@ def get_rrd_data(
 
     """
 
-    step = 1
-    point_range = ":".join(lqencode(str(x)) for x in (fromtime, untiltime, step, max_entries))
-    column = f"rrddata:m1:{rpn}:{point_range}"
-
+    column = _rrd_column("m1", rpn, fromtime, untiltime, max_entries)
     lql = livestatus_lql([host_name], [column], service_description) + "OutputFormat: python\n"
 
     if (response := connection.query_value(lql)) is None:
         # I think we should rather raise something here, but I am not sure what.
         return None
 
+    return _rrd_response(response)
+
+
+def get_rrd_data_of_time_ranges(
+    connection: SingleSiteConnection,
+    host_name: str,
+    service_description: str,
+    rpn: str,
+    time_ranges: Sequence[tuple[int, int]],
+    max_entries: int = 400,
+) -> Sequence[RRDResponse] | None:
+    """Fetch RRD historic metrics data of several time ranges with a single query
+
+    Every time range is fetched as a column of its own, so each of them gets the
+    resolution it would get from get_rrd_data.
+    """
+    if not time_ranges:
+        return []
+
+    columns = [
+        _rrd_column(f"m{index}", rpn, fromtime, untiltime, max_entries)
+        for index, (fromtime, untiltime) in enumerate(time_ranges, start=1)
+    ]
+    lql = livestatus_lql([host_name], columns, service_description) + "OutputFormat: python\n"
+
+    if None in (response := connection.query_row(lql)):
+        return None
+
+    return [_rrd_response(column) for column in response]
+
+
+def _rrd_column(name: str, rpn: str, fromtime: int, untiltime: int, max_entries: int) -> str:
+    step = 1
+    point_range = ":".join(lqencode(str(x)) for x in (fromtime, untiltime, step, max_entries))
+    return f"rrddata:{name}:{rpn}:{point_range}"
+
+
+def _rrd_response(response: Sequence[Any]) -> RRDResponse:
     raw_start, raw_end, raw_step, *values = response
 
     return (
@@ -3,7 +3,6 @@
 # This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
 # conditions defined in the file COPYING, which is part of this source code package.
 
-from ast import literal_eval
 from pathlib import Path
 from unittest.mock import Mock
 
@@ -15,8 +14,10 @@ from cmk.utils.hostaddress import HostName
 from cmk.checkengine.checking import CheckPluginName, ServiceID
 
 from cmk.base.api.agent_based.value_store._utils import (
+    _deserialize_value_store,
     _DiskSyncedMapping,
     _DynamicDiskSyncedMapping,
+    _serialize_value_store,
     _StaticDiskSyncedMapping,
     _ValueStore,
     ValueStoreManager,
@@ -80,20 +81,20 @@ class Test_DynamicDiskSyncedMapping:
 class Test_StaticDiskSyncedMapping:
     def _mock_load(self, mocker):
         stored_item_states = (
-            '{("check1", None, "stored-user-key-1"): 23,'
-            ' ("check2", "item", "stored-user-key-2"): 42}'
+            b'{("check1", None, "stored-user-key-1"): 23,'
+            b' ("check2", "item", "stored-user-key-2"): 42}'
         )
 
         mocker.patch.object(
             store,
-            "load_text_from_file",
+            "load_bytes_from_file",
             side_effect=lambda *a, **kw: stored_item_states,
         )
 
     def _mock_store(self, mocker):
         mocker.patch.object(
             store,
-            "save_text_to_file",
+            "save_bytes_to_file",
             autospec=True,
         )
 
@@ -104,8 +105,8 @@ class Test_StaticDiskSyncedMapping:
         return _StaticDiskSyncedMapping(
             path=tmp_path / "test-host",
             log_debug=lambda msg: None,
-            serializer=repr,
-            deserializer=literal_eval,
+            serializer=_serialize_value_store,
+            deserializer=_deserialize_value_store,
         )
 
     def test_mapping_features(self, mocker: Mock, tmp_path: Path) -> None:
@@ -139,10 +140,37 @@ class Test_StaticDiskSyncedMapping:
             ("check1", None, "stored-user-key-1"): 23,
             ("check3", "el Barto", "Ay caramba"): "ASDF",
         }
-        written = store.save_text_to_file.call_args.args[1]  # type: ignore[attr-defined]
-        assert written == repr(expected_values)
+        written = store.save_bytes_to_file.call_args.args[1]  # type: ignore[attr-defined]
+        assert _deserialize_value_store(written) == expected_values
         assert list(sdsm.items()) == list(expected_values.items())
 
+    def test_migrate_text_format(self, tmp_path: Path) -> None:
+        stored_item_states = {("check1", None, "stored-user-key-1"): (1.5, None, [23])}
+        (tmp_path / "test-host").write_text(repr(stored_item_states))
+
+        sdsm = self._get_sdsm(tmp_path)
+        assert dict(sdsm) == stored_item_states
+
+        sdsm.disksync(updated=[(("check2", "item", "stored-user-key-2"), 42)])
+        written = (tmp_path / "test-host").read_bytes()
+        assert not written.startswith(b"{")
+        assert _deserialize_value_store(written) == {
+            **stored_item_states,
+            ("check2", "item", "stored-user-key-2"): 42,
+        }
+
+    def test_store_unmarshallable_values(self, tmp_path: Path) -> None:
+        class Text(str):
+            pass
+
+        sdsm = self._get_sdsm(tmp_path)
+        sdsm.disksync(updated=[(("check1", None, "stored-user-key-1"), Text("text"))])
+
+        assert (
+            tmp_path / "test-host"
+        ).read_text() == "{('check1', None, 'stored-user-key-1'): 'text'}"
+        assert dict(self._get_sdsm(tmp_path)) == {("check1", None, "stored-user-key-1"): "text"}
+
 
 class Test_DiskSyncedMapping:
     @staticmethod
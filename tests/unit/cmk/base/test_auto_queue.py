@@ -3,6 +3,7 @@
 # This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
 # conditions defined in the file COPYING, which is part of this source code package.
 
+import os
 from collections.abc import Iterator
 from pathlib import Path
 
@@ -43,6 +44,12 @@ class TestAutoQueue:
     def test_queued_populated(self, auto_queue: AutoQueue) -> None:
         assert set(auto_queue) == {HostName("most"), HostName("lost")}
 
+    def test_oldest_first(self, auto_queue: AutoQueue) -> None:
+        os.utime(auto_queue.path / "most", (1000, 1000))
+        os.utime(auto_queue.path / "lost", (2000, 2000))
+        auto_queue.add(HostName("host"))
+        assert auto_queue.oldest_first() == [HostName("most"), HostName("lost"), HostName("host")]
+
     def test_add(self, tmpdir: Path, auto_queue: AutoQueue) -> None:
         auto_queue = AutoQueue(tmpdir / "dir2")
         auto_queue.add(HostName("most"))
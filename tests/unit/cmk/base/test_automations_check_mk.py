@@ -3,7 +3,9 @@
 # This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
 # conditions defined in the file COPYING, which is part of this source code package.
 
+import time
 from collections.abc import Mapping, Sequence
+from pathlib import Path
 
 import pytest
 
@@ -11,12 +13,15 @@ from tests.testlib.base import Scenario
 
 import cmk.utils.exceptions as exceptions
 import cmk.utils.resulttype as result
+from cmk.utils.hostaddress import HostName
 
 from cmk.automations import results as automation_results
 from cmk.automations.results import DiagHostResult
 
 from cmk.fetchers import PiggybackFetcher
 
+from cmk.checkengine.discovery import DiscoveryResult
+
 import cmk.base.automations.check_mk as check_mk
 import cmk.base.config as config
 import cmk.base.core_config as core_config
@@ -281,3 +286,58 @@ def test_automation_active_check_invalid_args(
     active_check = check_mk.AutomationActiveCheck()
     with pytest.raises(exceptions.MKGeneralException, match=error_message):
         active_check.execute(active_check_args)
+
+
+@pytest.mark.parametrize("max_processes", [1, 3])
+def test_discover_hosts(max_processes: int) -> None:
+    def discover(host_name: HostName) -> tuple[DiscoveryResult | None, bool]:
+        return DiscoveryResult(self_new=len(host_name)), host_name == "host"
+
+    host_names = [HostName("h"), HostName("host"), HostName("ho"), HostName("hos")]
+    assert sorted(
+        check_mk._discover_hosts(
+            discover,
+            host_names,
+            max_processes=max_processes,
+            deadline=time.monotonic() + 60,
+            message="timeout",
+        )
+    ) == sorted((hn, (DiscoveryResult(self_new=len(hn)), hn == "host")) for hn in host_names)
+
+
+@pytest.mark.parametrize("max_processes", [1, 3])
+def test_discover_hosts_deadline(max_processes: int) -> None:
+    def discover(host_name: HostName) -> tuple[DiscoveryResult | None, bool]:
+        return None, False
+
+    with pytest.raises(TimeoutError, match="timeout"):
+        list(
+            check_mk._discover_hosts(
+                discover,
+                [HostName("h1"), HostName("h2")],
+                max_processes=max_processes,
+                deadline=time.monotonic() - 1,
+                message="timeout",
+            )
+        )
+
+
+def test_discover_hosts_terminates_workers_when_interrupted(tmp_path: Path) -> None:
+    def discover(host_name: HostName) -> tuple[DiscoveryResult | None, bool]:
+        if host_name == "slow":
+            time.sleep(1)
+            (tmp_path / host_name).touch()
+        return None, False
+
+    discovered = check_mk._discover_hosts(
+        discover,
+        [HostName("fast"), HostName("slow")],
+        max_processes=2,
+        deadline=time.monotonic() + 60,
+        message="timeout",
+    )
+    assert next(discovered) == (HostName("fast"), (None, False))
+    discovered.close()
+
+    time.sleep(1.5)
+    assert not (tmp_path / "slow").exists()
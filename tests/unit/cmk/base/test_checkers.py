@@ -3,6 +3,7 @@
 # This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
 # conditions defined in the file COPYING, which is part of this source code package.
 
+import time
 from collections.abc import Iterable, Sequence
 
 import pytest
@@ -10,10 +11,14 @@ from pytest import MonkeyPatch
 
 from tests.testlib.base import Scenario
 
-from cmk.utils.hostaddress import HostName
+from cmk.utils.cpu_tracking import CPUTracker, Snapshot
+from cmk.utils.hostaddress import HostAddress, HostName
+
+from cmk.fetchers import _snmpcache, FetcherType, Mode
+from cmk.fetchers.filecache import FileCacheOptions
 
 from cmk.checkengine.checkresults import ServiceCheckResult
-from cmk.checkengine.fetcher import HostKey, SourceType
+from cmk.checkengine.fetcher import HostKey, SourceInfo, SourceType
 from cmk.checkengine.legacy import LegacyCheckParameters
 from cmk.checkengine.parameters import TimespecificParameters, TimespecificParameterSet
 
@@ -21,6 +26,7 @@ import cmk.base.checkers as checkers
 import cmk.base.config as config
 from cmk.base.api.agent_based.checking_classes import consume_check_results, Metric, Result, State
 from cmk.base.plugins.agent_based.agent_based_api.v1.type_defs import CheckResult
+from cmk.base.sources import Source
 
 
 def make_timespecific_params_list(
@@ -328,3 +334,106 @@ def test_config_cache_get_clustered_service_node_keys_clustered(monkeypatch: Mon
         cluster_nodes=[node1, node2],
         get_effective_host=lambda hn, *args, **kw: hn,
     )
+
+
+class _SlowSource:
+    def __init__(
+        self, ident: str, delay: float, fetcher_type: FetcherType = FetcherType.TCP
+    ) -> None:
+        self.ident = ident
+        self.delay = delay
+        self.fetcher_type = fetcher_type
+
+    def source_info(self) -> SourceInfo:
+        return SourceInfo(
+            HostName("host"),
+            HostAddress(f"127.0.0.{len(self.ident)}"),
+            self.ident,
+            self.fetcher_type,
+            SourceType.HOST,
+        )
+
+    def file_cache(self, *, simulation: bool, file_cache_options: object) -> float:
+        return self.delay
+
+    def fetcher(self) -> None:
+        return None
+
+
+def _sources(*sources: _SlowSource) -> Sequence[Source]:
+    return sources  # type: ignore[return-value]
+
+
+def _sleeping_do_fetch(source_info, file_cache, fetcher, *, mode):
+    with CPUTracker() as tracker:
+        time.sleep(file_cache)
+    return source_info, "data", tracker.duration
+
+
+@pytest.mark.parametrize("max_workers", [1, 4])
+def test_fetch_all_keeps_order_of_sources(monkeypatch: MonkeyPatch, max_workers: int) -> None:
+    monkeypatch.setattr(checkers, "_do_fetch", _sleeping_do_fetch)
+    fetched = checkers._fetch_all(
+        _sources(
+            _SlowSource("slow", 0.05),
+            _SlowSource("snmp", 0.02, FetcherType.SNMP),
+            _SlowSource("medium", 0.02),
+            _SlowSource("fast", 0.0),
+            _SlowSource("mgmt-snmp", 0.0, FetcherType.SNMP),
+        ),
+        simulation=False,
+        file_cache_options=FileCacheOptions(),
+        mode=Mode.CHECKING,
+        max_workers=max_workers,
+    )
+    assert [source_info.ident for source_info, _raw, _duration in fetched] == [
+        "slow",
+        "snmp",
+        "medium",
+        "fast",
+        "mgmt-snmp",
+    ]
+
+
+def test_fetch_all_concurrently_does_not_count_overlapping_times(monkeypatch: MonkeyPatch) -> None:
+    monkeypatch.setattr(checkers, "_do_fetch", _sleeping_do_fetch)
+    with CPUTracker() as tracker:
+        fetched = checkers._fetch_all(
+            _sources(*(_SlowSource(str(n), 0.1) for n in range(4))),
+            simulation=False,
+            file_cache_options=FileCacheOptions(),
+            mode=Mode.CHECKING,
+            max_workers=4,
+        )
+
+    total = sum((duration for _info, _raw, duration in fetched), Snapshot.null())
+    # Rounded by os.times()
+    assert 0.09 < total.process.elapsed <= tracker.duration.process.elapsed
+
+
+def test_fetch_all_runs_snmp_fetchers_one_after_another(monkeypatch: MonkeyPatch) -> None:
+    def scanning_do_fetch(source_info, file_cache, fetcher, *, mode):
+        # Just like the SNMP scan: Look up the OIDs in the global cache of the device
+        _snmpcache.initialize_single_oid_cache(source_info.hostname, source_info.ipaddress)
+        _snmpcache.single_oid_cache()[".1.3.6.1.2.1.1.1.0"] = source_info.ipaddress
+        time.sleep(file_cache)
+        sys_descr = _snmpcache.single_oid_cache()[".1.3.6.1.2.1.1.1.0"]
+        return source_info, sys_descr, Snapshot.null()
+
+    monkeypatch.setattr(checkers, "_do_fetch", scanning_do_fetch)
+    for name in ("_g_single_oid_hostname", "_g_single_oid_ipaddress", "_g_single_oid_cache"):
+        monkeypatch.setattr(_snmpcache, name, None)
+    fetched = checkers._fetch_all(
+        _sources(
+            _SlowSource("snmp", 0.05, FetcherType.SNMP),
+            _SlowSource("mgmt-snmp", 0.05, FetcherType.SNMP),
+        ),
+        simulation=False,
+        file_cache_options=FileCacheOptions(),
+        mode=Mode.CHECKING,
+        max_workers=4,
+    )
+    assert [(source_info.ipaddress, raw) for source_info, raw, _duration in fetched] == [  # type: ignore[comparison-overlap]
+        ("127.0.0.4", "127.0.0.4"),
+        ("127.0.0.9", "127.0.0.9"),
+    ]
@@ -4,6 +4,7 @@
 # conditions defined in the file COPYING, which is part of this source code package.
 
 import socket
+import threading
 from collections.abc import Mapping
 from pathlib import Path
 from typing import TypeAlias
@@ -555,3 +556,44 @@ def test_lookup_mgmt_board_ip_address_unresolvable_2(
     )
 
     assert config.lookup_mgmt_board_ip_address(config_cache, hostname) is None
+
+
+def test_update_dns_cache_lookup_timeout(monkeypatch: MonkeyPatch) -> None:
+    hanging = threading.Event()
+
+    def getaddrinfo(host, port, family=None, socktype=None, proto=None, flags=None):
+        if host == "slow":
+            hanging.wait(10)
+        return [(family, None, None, None, (HostAddress(f"127.0.0.{len(host)}"), 1337))]
+
+    monkeypatch.setattr(socket, "getaddrinfo", getaddrinfo)
+
+    ts = Scenario()
+    for host_name in ("a", "slow", "bb", "ccc"):
+        ts.add_host(HostName(host_name))
+    config_cache = ts.apply(monkeypatch)
+
+    try:
+        result = ip_lookup.update_dns_cache(
+            ip_lookup_configs=(
+                config_cache.ip_lookup_config(hn)
+                for hn in (HostName("ccc"), HostName("slow"), HostName("a"), HostName("bb"))
+            ),
+            configured_ipv4_addresses={},
+            configured_ipv6_addresses={},
+            simulation_mode=False,
+            override_dns=None,
+            max_workers=2,
+            lookup_timeout=0.1,
+        )
+    finally:
+        hanging.set()
+
+    assert result == (3, ["slow"])
+    cache = ip_lookup.IPLookupCache({})
+    cache.load_persisted()
+    assert cache == {
+        ("ccc", socket.AF_INET): HostAddress("127.0.0.3"),
+        ("a", socket.AF_INET): HostAddress("127.0.0.1"),
+        ("bb", socket.AF_INET): HostAddress("127.0.0.2"),
+    }
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# Copyright (C) 2023 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+
+from collections.abc import Sequence
+
+import pytest
+
+from livestatus import SiteId
+
+from cmk.bi.aggregation import BIAggregation
+from cmk.bi.compiler import BICompiler, ConfigStatus
+from cmk.bi.packs import BIAggregationPacks
+
+from .bi_test_data import sample_config
+from .conftest import DUMMY_SITES_CALLBACK
+
+
+def test_compile_only_outdated_aggregations(
+    monkeypatch: pytest.MonkeyPatch, bi_packs_sample_config: BIAggregationPacks
+) -> None:
+    compiler = BICompiler("bi_config.bi", DUMMY_SITES_CALLBACK)
+    compiler._bi_packs = bi_packs_sample_config
+    structure_states = dict(sample_config.bi_structure_states)
+
+    def prepare_for_compilation(_online_sites: object) -> None:
+        compiler._bi_structure_fetcher.cleanup()
+        compiler._bi_structure_fetcher.add_site_data(SiteId("heute"), structure_states)
+        compiler.bi_searcher.set_hosts(compiler._bi_structure_fetcher.hosts)
+
+    configstatus: ConfigStatus = {
+        "configfile_timestamp": 0.0,
+        "known_sites": {(SiteId("heute"), 1)},
+        "online_sites": {(SiteId("heute"), 1)},
+    }
+    monkeypatch.setattr(compiler, "prepare_for_compilation", prepare_for_compilation)
+    monkeypatch.setattr(compiler, "compute_current_configstatus", lambda: configstatus)
+    monkeypatch.setattr(compiler, "_compilation_required", lambda _status: True)
+
+    compiled_ids: list[Sequence[str]] = []
+    compile_aggregations = compiler._compile_aggregations
+
+    def record_compilation(
+        aggregations: dict[str, BIAggregation], aggr_ids: Sequence[str]
+    ) -> object:
+        compiled_ids.append(aggr_ids)
+        return compile_aggregations(aggregations, aggr_ids)
+
+    monkeypatch.setattr(compiler, "_compile_aggregations", record_compilation)
+
+    compiler.load_compiled_aggregations()
+    branches = len(compiler.compiled_aggregations["default_aggregation"].branches)
+    assert branches == 2
+
+    # A site restart without changes of the monitored objects
+    compiler.load_compiled_aggregations()
+    assert len(compiler.compiled_aggregations["default_aggregation"].branches) == branches
+
+    # Changed structure data
+    del structure_states["heute"]
+    compiler.load_compiled_aggregations()
+    assert len(compiler.compiled_aggregations["default_aggregation"].branches) == branches - 1
+
+    # Changed aggregation
+    aggregation = bi_packs_sample_config.get_aggregation("default_aggregation")
+    assert aggregation is not None
+    aggregation.comment = "changed"
+    compiler.load_compiled_aggregations()
+
+    assert compiled_ids == [
+        ["default_aggregation"],
+        [],
+        ["default_aggregation"],
+        ["default_aggregation"],
+    ]
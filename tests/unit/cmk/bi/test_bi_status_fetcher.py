@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# Copyright (C) 2023 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+
+from collections.abc import Sequence
+
+import pytest
+
+from livestatus import LivestatusOutputFormat, LivestatusResponse, LivestatusRow, SiteId
+
+from cmk.utils.hostaddress import HostName
+
+from cmk.bi import data_fetcher
+from cmk.bi.data_fetcher import BIStatusFetcher
+from cmk.bi.lib import BIHostSpec, SitesCallback
+
+
+def _status_row(site: str, host_name: str) -> LivestatusRow:
+    return LivestatusRow([site, host_name, 0, 1, 0, "OK", 0, 1, 0, []])
+
+
+class _RecordingQueryCallback:
+    def __init__(self, rows: Sequence[LivestatusRow]) -> None:
+        self.rows = rows
+        self.queries: list[tuple[str, list[SiteId] | None]] = []
+
+    def __call__(
+        self,
+        query: str,
+        only_sites: list[SiteId] | None = None,
+        output_format: LivestatusOutputFormat = LivestatusOutputFormat.PYTHON,
+        fetch_full_data: bool = False,
+    ) -> LivestatusResponse:
+        self.queries.append((query, only_sites))
+        return LivestatusResponse(
+            [row for row in self.rows if only_sites is None or row[0] in only_sites]
+        )
+
+
+@pytest.fixture(name="query_callback")
+def fixture_query_callback(monkeypatch: pytest.MonkeyPatch) -> _RecordingQueryCallback:
+    monkeypatch.setattr(data_fetcher, "MAX_FILTERED_HOSTS", 2)
+    monkeypatch.setattr(BIStatusFetcher, "_status_snapshots", {})
+    return _RecordingQueryCallback(
+        [
+            _status_row("site_a", "host1"),
+            _status_row("site_a", "host2"),
+            _status_row("site_a", "host3"),
+            _status_row("site_b", "host1"),
+            _status_row("site_b", "host4"),
+        ]
+    )
+
+
+def _fetched_hosts(
+    query_callback: _RecordingQueryCallback,
+    required_hosts: Sequence[tuple[str, str]],
+    scope: str | None = None,
+) -> set[BIHostSpec]:
+    fetcher = BIStatusFetcher(
+        SitesCallback(
+            lambda: [],
+            query_callback,
+            lambda s: s,
+            status_cache_scope=None if scope is None else lambda: scope,
+        )
+    )
+    fetcher.update_states(
+        {(SiteId(site), HostName(host_name), None) for site, host_name in required_hosts}
+    )
+    return set(fetcher.states)
+
+
+def test_status_of_few_hosts_is_filtered(query_callback: _RecordingQueryCallback) -> None:
+    assert _fetched_hosts(query_callback, [("site_a", "host1"), ("site_b", "host4")]) == {
+        BIHostSpec(SiteId("site_a"), HostName("host1")),
+        BIHostSpec(SiteId("site_b"), HostName("host4")),
+    }
+    [(query, only_sites)] = query_callback.queries
+    assert "Filter: name = host1\nFilter: name = host4\nOr: 2\n" in query
+    assert sorted(only_sites or []) == ["site_a", "site_b"]
+
+
+def test_status_of_many_hosts_is_shared(query_callback: _RecordingQueryCallback) -> None:
+    required_hosts = [("site_a", "host1"), ("site_a", "host2"), ("site_a", "host3")]
+    expected_hosts = {BIHostSpec(SiteId(site), HostName(host)) for site, host in required_hosts}
+
+    assert _fetched_hosts(query_callback, required_hosts, "user") == expected_hosts
+    assert _fetched_hosts(query_callback, required_hosts[1:], "user") == expected_hosts - {
+        BIHostSpec(SiteId("site_a"), HostName("host1"))
+    }
+    assert len(query_callback.queries) == 1
+    assert "Filter:" not in query_callback.queries[0][0]
+
+    _fetched_hosts(query_callback, required_hosts, "other_user")
+    _fetched_hosts(query_callback, required_hosts)
+    assert len(query_callback.queries) == 3
@@ -164,6 +164,35 @@ class TestAgentParser:
         assert ahs.piggybacked_raw_data == {}
         assert not store.load()
 
+    def test_crlf_and_blank_lines(
+        self, parser: AgentParser, store: SectionStore[Sequence[AgentRawDataSectionElem]]
+    ) -> None:
+        raw_data = AgentRawData(
+            b"\r\n".join(
+                (
+                    b"<<<a_section>>>",
+                    b"",
+                    b"  first line  ",
+                    b"   ",
+                    b"<<<another_section:nostrip>>>",
+                    b"  first line  ",
+                    b"<<<<piggyback>>>>",
+                    b"<<<a_section>>>",
+                    b"  first line  ",
+                    b"<<<<>>>>",
+                    b"",
+                )
+            )
+        )
+
+        ahs = parser.parse(raw_data, selection=NO_SELECTION)
+
+        assert ahs.sections == {
+            SectionName("a_section"): [["first", "line"]],
+            SectionName("another_section"): [["first", "line"]],
+        }
+        assert ahs.piggybacked_raw_data[HostName("piggyback")][1:] == [b"  first line  "]
+
     def test_partial_header_is_not_a_header(
         self, parser: AgentParser, store: SectionStore[Sequence[AgentRawDataSectionElem]]
     ) -> None:
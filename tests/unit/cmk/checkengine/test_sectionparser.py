@@ -16,6 +16,7 @@ from cmk.checkengine.parser import AgentRawDataSection, AgentRawDataSectionElem,
 from cmk.checkengine.sectionparser import _ParsingResult as ParsingResult
 from cmk.checkengine.sectionparser import (
     ParsedSectionName,
+    ParsedSectionsCache,
     ParsedSectionsResolver,
     ResolvedResult,
     SectionPlugin,
@@ -289,3 +290,55 @@ class TestSectionsParser:
         section_name = SectionName("one")
 
         assert sections_parser.parse(section_name, lambda *args, **kw: None) is None
+
+
+class TestParsedSectionsCache:
+    @staticmethod
+    def _parse(cache: ParsedSectionsCache, raw_data: Sequence[AgentRawDataSectionElem]) -> object:
+        parser = SectionsParser[AgentRawDataSectionElem](
+            host_sections=HostSections[SectionMap[AgentRawDataSectionElem]](
+                sections={SectionName("one"): raw_data}
+            ),
+            host_name=HostName("some-host"),
+            error_handling=lambda *args, **kw: "error",
+            cache=cache,
+        )
+        result = parser.parse(SectionName("one"), TestParsedSectionsCache._parse_function)
+        assert result is not None
+        return result.data
+
+    calls: list[object] = []
+
+    @staticmethod
+    def _parse_function(string_table: object) -> object:
+        TestParsedSectionsCache.calls.append(string_table)
+        return {"parsed": string_table}
+
+    def test_shared_between_parsers(self) -> None:
+        self.calls.clear()
+        cache = ParsedSectionsCache(maxsize=10)
+        first = self._parse(cache, NODE_1)
+        assert self._parse(cache, NODE_1) is first
+        assert len(self.calls) == 1
+
+        # Different raw data is parsed again
+        assert self._parse(cache, NODE_2) == {"parsed": NODE_2}
+        assert len(self.calls) == 2
+        assert len(cache) == 2
+
+    def test_eviction(self) -> None:
+        self.calls.clear()
+        cache = ParsedSectionsCache(maxsize=1)
+        self._parse(cache, NODE_1)
+        self._parse(cache, NODE_2)
+        assert len(cache) == 1
+        self._parse(cache, NODE_1)
+        assert len(self.calls) == 3
+
+    def test_disabled(self) -> None:
+        self.calls.clear()
+        cache = ParsedSectionsCache(maxsize=0)
+        self._parse(cache, NODE_1)
+        self._parse(cache, NODE_1)
+        assert len(self.calls) == 2
+        assert not cache
@@ -13,6 +13,7 @@ from cmk.ec.config import Config, Rule, ServiceLevel
 from cmk.ec.defaults import default_rule_pack
 from cmk.ec.event import Event
 from cmk.ec.main import EventServer
+from cmk.ec.perfcounters import Perfcounters
 
 RULE = Rule(
     actions=[],
@@ -61,3 +62,30 @@ def test_event_rewrite(
 
     assert event["text"] == "SUPERWARN"
     assert event["state"] == 2
+
+
+def test_queued_event_processing(
+    event_server: EventServer,
+    config: Config,
+    perfcounters: Perfcounters,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Events submitted to the queue are processed in the order of their arrival."""
+    queued_config: Config = config.copy()
+    queued_config["event_queue_len"] = 2
+    event_server.reload_configuration(config=queued_config)
+    processed: list[str] = []
+    monkeypatch.setattr(
+        event_server, "process_potential_event", lambda event: processed.append(event["text"])
+    )
+
+    event_queue, stop_processing, event_processor = event_server._start_event_processor()
+    assert event_queue is not None and event_processor is not None
+    for text in ("one", "two", "three"):
+        event_server._submit_events(event_queue, 1, [Event(text=text)])
+    stop_processing.set()
+    event_processor.join()
+
+    assert processed == ["one", "two", "three"]
+    assert perfcounters._counters["messages"] == 3
+    assert perfcounters._counters["queue_drops"] == 0
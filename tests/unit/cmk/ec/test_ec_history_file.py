@@ -12,6 +12,7 @@ import pytest
 from tests.testlib import on_time
 
 from cmk.ec.config import Config
+from cmk.ec.event import Event
 from cmk.ec.history import (
     _current_history_period,
     _grep_pipeline,
@@ -82,3 +83,15 @@ def test_history_parse(history: History, tmp_path: Path) -> None:
 
     assert len(new_entries) == 4
     assert new_entries[0][1] == 1666942292.3000507
+
+
+def test_batched_history_entries(history: History) -> None:
+    """Entries added in a batch are written at once when leaving it."""
+    logfile = history._settings.paths.history_dir.value
+    with history.batched():
+        history.add(Event(id=1, text="one"), "NEW")
+        history.add(Event(id=2, text="two"), "NEW")
+        assert not list(logfile.glob("*.log"))
+
+    (path,) = logfile.glob("*.log")
+    assert [line.split("\t")[1] for line in path.read_text().splitlines()] == ["NEW", "NEW"]
@@ -3,3 +3,121 @@
 # This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
 # conditions defined in the file COPYING, which is part of this source code package.
 """EC History sqlite backend"""
+import logging
+import time
+
+import pytest
+
+from tests.testlib import CMKEventConsole
+
+from cmk.utils.hostaddress import HostName
+
+from cmk.ec.config import Config
+from cmk.ec.event import Event
+from cmk.ec.history import History
+from cmk.ec.main import StatusServer, StatusTableEvents, StatusTableHistory
+from cmk.ec.query import Query, QueryGET
+from cmk.ec.settings import Settings
+
+logger = logging.getLogger("cmk.mkeventd")
+
+
+@pytest.fixture(name="history_sqlite")
+def fixture_history_sqlite(settings: Settings, config: Config) -> History:
+    sqlite_config: Config = config.copy()
+    sqlite_config["archive_mode"] = "sqlite"
+    return History(
+        settings,
+        sqlite_config,
+        logger,
+        StatusTableEvents.columns,
+        StatusTableHistory.columns,
+    )
+
+
+def _query(status_server: StatusServer, *headers: str) -> QueryGET:
+    query = Query.make(status_server, ["GET history", *headers], logger)
+    assert isinstance(query, QueryGET)
+    return query
+
+
+def _add_events(history: History) -> None:
+    for event_id, host in enumerate(["heute", "gestern", "heute", "morgen"], start=1):
+        history.add(
+            CMKEventConsole.new_event(
+                Event(
+                    id=event_id,
+                    host=HostName(host),
+                    text=f"Message {event_id}",
+                    match_groups=("a", "b"),
+                    host_in_downtime=True,
+                )
+            ),
+            "NEW",
+        )
+
+
+def test_sqlite_history_get(history_sqlite: History, status_server: StatusServer) -> None:
+    _add_events(history_sqlite)
+
+    entries = list(history_sqlite.get(_query(status_server, "Filter: event_host = heute")))
+
+    assert [(e[0], e[5], e[12]) for e in entries] == [(3, 3, "heute"), (1, 1, "heute")]
+    # Converted back like the entries of the history files
+    assert entries[0][2] == "NEW"
+    assert entries[0][22] == ("a", "b")
+    assert entries[0][28] is True
+
+
+def test_sqlite_history_get_filtered_in_python(
+    history_sqlite: History, status_server: StatusServer
+) -> None:
+    _add_events(history_sqlite)
+
+    entries = history_sqlite.get(
+        _query(status_server, "Filter: event_text ~ message [24]", "Filter: event_id > 1")
+    )
+
+    assert [e[5] for e in entries] == []
+    entries = history_sqlite.get(
+        _query(status_server, "Filter: event_text ~~ message [24]", "Filter: event_id > 1")
+    )
+    assert [e[5] for e in entries] == [4, 2]
+
+
+def test_sqlite_history_limit(history_sqlite: History, status_server: StatusServer) -> None:
+    _add_events(history_sqlite)
+
+    assert [e[5] for e in history_sqlite.get(_query(status_server, "Limit: 2"))] == [4, 3]
+    assert [
+        e[5]
+        for e in history_sqlite.get(
+            _query(status_server, "Filter: event_host in HEUTE morgen", "Limit: 2")
+        )
+    ] == [4, 3]
+
+
+def test_sqlite_history_batched(history_sqlite: History, status_server: StatusServer) -> None:
+    with history_sqlite.batched():
+        _add_events(history_sqlite)
+        assert not list(history_sqlite.get(_query(status_server)))
+
+    assert len(list(history_sqlite.get(_query(status_server)))) == 4
+
+
+def test_sqlite_history_housekeeping(
+    history_sqlite: History, status_server: StatusServer, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    _add_events(history_sqlite)
+
+    history_sqlite.housekeeping()
+    assert len(list(history_sqlite.get(_query(status_server)))) == 4
+
+    now = time.time()
+    monkeypatch.setattr("time.time", lambda: now + 366 * 86400)
+    history_sqlite.housekeeping()
+    assert not list(history_sqlite.get(_query(status_server)))
+
+    _add_events(history_sqlite)
+    history_sqlite.flush()
+    assert not list(history_sqlite.get(_query(status_server)))
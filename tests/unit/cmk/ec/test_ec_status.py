@@ -132,3 +132,29 @@ def test_mkevent_query_filters(
     status_server.handle_client(status_socket, True, "127.0.0.1")
     response = status_socket.get_response()
     assert (len(response) == 2) is is_match
+
+
+def test_event_index(event_status: EventStatus) -> None:
+    events = [
+        CMKEventConsole.new_event({"rule_id": rule_id, "host": HostName(host), "core_host": None})
+        for rule_id, host in [("a", "h1"), ("b", "h1"), ("a", "h2"), ("a", "h1")]
+    ]
+    for event in events:
+        event_status.new_event(event)
+
+    assert event_status.events_of_rule("a") == [events[0], events[2], events[3]]
+    assert event_status.events_of_rule_and_host("a", HostName("h1")) == [events[0], events[3]]
+    assert not event_status.events_of_rule("c")
+
+    event_status.remove_event(events[0], "DELETE")
+    assert event_status.events_of_rule("a") == [events[2], events[3]]
+    assert event_status.events_of_rule_and_host("a", HostName("h1")) == [events[3]]
+
+    # Counting up an event with another host moves it in the index
+    event_status.count_event_up(events[2], {"rule_id": "a", "host": HostName("h1")})
+    assert event_status.events_of_rule("a") == [events[2], events[3]]
+    assert event_status.events_of_rule_and_host("a", HostName("h1")) == [events[2], events[3]]
+    assert not event_status.events_of_rule_and_host("a", HostName("h2"))
+
+    event_status.unpack_status(event_status.pack_status())
+    assert event_status.events_of_rule_and_host("b", HostName("h1")) == [events[1]]
@@ -21,6 +21,16 @@ def test_perfcounters_count() -> None:
     assert not [(k, v) for k, v in c._counters.items() if k != "messages" and v > 0]
 
 
+def test_perfcounters_gauge() -> None:
+    c = Perfcounters(logger)
+    c.set_gauge("event_queue_length", 42)
+    c.set_gauge("event_queue_length", 23)
+    assert (
+        dict(zip([n for n, _d in c.status_columns()], c.get_status()))["status_event_queue_length"]
+        == 23
+    )
+
+
 def test_perfcounters_count_time() -> None:
     c = Perfcounters(logger)
     assert "processing" not in c._times
@@ -127,6 +137,9 @@ def test_perfcounters_correct_status_values() -> None:
             counter_name = column_name.split("_")[-2]
             assert column_value == c._rates.get(counter_name, 0.0)
 
+        elif column_name.startswith("status_") and column_name[7:] in c._gauges:
+            assert column_value == c._gauges[column_name[7:]]
+
         elif column_name.startswith("status_"):
             counter_name = "_".join(column_name.split("_")[1:])
             assert column_value == c._counters[counter_name], "Invalid value {!r}: {!r}".format(
@@ -7,6 +7,8 @@ import pytest
 
 from livestatus import SiteId
 
+from cmk.utils.hostaddress import HostName
+
 from cmk.ec.config import MatchGroups, Rule, TextMatchResult
 from cmk.ec.event import Event
 from cmk.ec.rule_matcher import (
@@ -15,7 +17,9 @@ from cmk.ec.rule_matcher import (
     MatchPriority,
     MatchResult,
     MatchSuccess,
+    required_regex_literal,
     RuleMatcher,
+    RulePrefilter,
 )
 
 
@@ -409,3 +413,86 @@ def test_match_ipaddress(result: MatchResult, rule: Rule, event: Event) -> None:
 def test_match_facility(result: MatchResult, rule: Rule, event: Event) -> None:
     m = RuleMatcher(None, SiteId("test_site"), lambda time_period_name: True)
     assert m.event_rule_matches_facility(rule, event) == result
+
+
+@pytest.mark.parametrize(
+    "regex,literal",
+    [
+        ("foo", "foo"),
+        ("^Disk (.*) FULL$", "disk "),
+        ("ab*cd", "cd"),
+        ("ab+cd", "ab"),
+        (r"link\.down", "link.down"),
+        (r"ab\dcdef", "cdef"),
+        ("x[abc]yz{2}", "x"),
+        ("a(b|c)d", "a"),
+        ("foo|barbaz", ""),
+        ("[|(]bar", "bar"),
+        ("bär", "b"),
+        (r"foo\x41barbaz", "barbaz"),
+        (r"ab\101cde", "cde"),
+        (r"ab\01cde", "cde"),
+        (r"(a)bc\1def", "def"),
+        (r"abc\u00e4defg", "defg"),
+        (r"abc\U000000e4defg", "defg"),
+        (r"abc\N{LATIN SMALL LETTER A WITH DIAERESIS}defg", "defg"),
+        (r"abc\sdefg", "defg"),
+    ],
+)
+def test_required_regex_literal(regex: str, literal: str) -> None:
+    assert required_regex_literal(regex) == literal
+
+
+@pytest.mark.parametrize(
+    "event",
+    [
+        {"text": "Disk sda is full", "application": "kernel", "host": "srv01"},
+        {"text": "disk SDA IS FULL", "application": "KERNEL", "host": "SRV01"},
+        {"text": "Disk ok", "application": "kernel", "host": "srv01"},
+        {"text": "Disk sda is full", "application": "sshd", "host": "srv01"},
+        {"text": "Disk sda is full", "application": "kernel", "host": "db01"},
+        {"text": "Di\u017fk sda i\u017f full", "application": "kernel", "host": "srv01"},
+        {"text": "Link down", "application": "", "host": ""},
+    ],
+)
+def test_rule_prefilter_keeps_matching_rules(event: Event) -> None:
+    rules: list[Rule] = [
+        {"id": "plain", "match": "disk"},
+        {"id": "regex", "match": "^disk .* is full$"},
+        {"id": "cancel", "match": "is full", "match_ok": "disk ok"},
+        {"id": "application", "match_application": "kern.l"},
+        {"id": "cancel_application", "cancel_application": "kernel"},
+        {"id": "host", "match_host": "srv\\d+"},
+        {"id": "inverted", "match": "link down", "invert_matching": True},
+        {"id": "alternative", "match": "link|disk"},
+        {"id": "unspecific"},
+        {"id": "escapes", "match": r"di\x73k\x20sda\040is"},
+    ]
+    for rule in rules:
+        rule["pack"] = "pack"
+        compile_rule(rule)
+    event = {"facility": 1, "priority": 2, "ipaddress": "", **event}
+
+    m = RuleMatcher(None, SiteId("test_site"), lambda time_period_name: True)
+    matching = [r for r in rules if isinstance(m.event_rule_matches(r, event), MatchSuccess)]
+    candidates = list(RulePrefilter(rules).filter(rules, event))
+
+    assert all(rule in candidates for rule in matching)
+    assert [r for r in rules if r in candidates] == candidates
+
+
+def test_rule_prefilter_sorts_out_rules() -> None:
+    rules: list[Rule] = [
+        {"id": "disk", "match": "^disk .* is full$"},
+        {"id": "link", "match": "link down"},
+        {"id": "host", "match": "disk", "match_host": "db\\d+"},
+    ]
+    for rule in rules:
+        compile_rule(rule)
+    event: Event = {
+        "text": "Disk sda is full",
+        "application": "kernel",
+        "host": HostName("srv01"),
+    }
+
+    assert [r["id"] for r in RulePrefilter(rules).filter(rules, event)] == ["disk"]
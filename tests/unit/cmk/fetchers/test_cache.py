@@ -6,6 +6,11 @@
 import copy
 import json
 import logging
+from pathlib import Path
+
+from pytest import MonkeyPatch
+
+from cmk.utils.sectionname import MutableSectionMap, SectionName
 
 from cmk.fetchers import Mode
 from cmk.fetchers.cache import SectionStore
@@ -36,6 +41,70 @@ class TestSectionStore:
             str,
         )
 
+    def test_update_stores_only_changes(self, tmp_path: Path, monkeypatch: MonkeyPatch) -> None:
+        section_store = SectionStore[str](tmp_path / "store", logger=logging.getLogger("test"))
+        stored = []
+        store = section_store.store
+
+        def store_and_record(sections: MutableSectionMap[tuple[int, int, str]]) -> None:
+            stored.append(sections)
+            store(sections)
+
+        monkeypatch.setattr(section_store, "store", store_and_record)
+
+        def update(
+            sections: dict[SectionName, str], now: int, valid_until: int = 200
+        ) -> dict[SectionName, str]:
+            return dict(
+                section_store.update(
+                    sections,
+                    {},
+                    # Just like the agent parser: every received section is created "now",
+                    # its validity is given by the (cached) agent output.
+                    lambda section_name: (now, valid_until)
+                    if section_name == SectionName("one")
+                    else None,
+                    now=now,
+                    keep_outdated=False,
+                )
+            )
+
+        assert update({SectionName("one"): "1", SectionName("two"): "2"}, 150) == {
+            SectionName("one"): "1",
+            SectionName("two"): "2",
+        }
+        assert len(stored) == 1
+
+        # Unchanged persisted section: no rewrite, the persisted timestamps are kept
+        assert update({SectionName("two"): "2"}, 160) == {
+            SectionName("one"): "1",
+            SectionName("two"): "2",
+        }
+        assert update({SectionName("one"): "1"}, 170) == {SectionName("one"): "1"}
+        assert len(stored) == 1
+        assert section_store.load() == {SectionName("one"): (150, 200, "1")}
+
+        # Same content, but valid for longer: rewrite
+        assert update({SectionName("one"): "1"}, 180, valid_until=260) == {SectionName("one"): "1"}
+        assert len(stored) == 2
+        assert section_store.load() == {SectionName("one"): (180, 260, "1")}
+
+        # Still valid after the first validity ended
+        assert update({}, 230) == {SectionName("one"): "1"}
+        assert len(stored) == 2
+
+        # Changed section: rewrite
+        assert update({SectionName("one"): "1.1"}, 240, valid_until=260) == {
+            SectionName("one"): "1.1"
+        }
+        assert len(stored) == 3
+        assert section_store.load() == {SectionName("one"): (240, 260, "1.1")}
+
+        # Expired section: rewrite
+        assert not update({}, 270)
+        assert len(stored) == 4
+        assert not (tmp_path / "store").exists()
+
 
 class TestMaxAge:
     def test_repr(self) -> None:
@@ -3,10 +3,15 @@
 # This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
 # conditions defined in the file COPYING, which is part of this source code package.
 
+import logging
 from pathlib import Path
 
 import pytest
 
+from cmk.utils.hostaddress import HostAddress, HostName
+
+from cmk.snmplib import SNMPBackendEnum, SNMPHostConfig
+
 import cmk.fetchers.snmp_backend._utils as utils
 from cmk.fetchers.snmp_backend import StoredWalkSNMPBackend
 
@@ -26,21 +31,6 @@ def test_strip_snmp_value(value: str, expected: bytes) -> None:
 
 @pytest.mark.usefixtures("create_files")
 class TestStoredWalkSNMPBackend:
-    @pytest.mark.parametrize(
-        "a, b, result",
-        [
-            ("1.2.3", "1.2.3", 0),
-            ("1.2.3", ".1.2.3", 0),
-            (".1.2.3", "1.2.3", 0),
-            (".1.2.3", ".1.2.3", 0),
-            ("1.2.3", "1.2.3.4", 0),
-            ("1.2.3.4", "1.2.3", 1),
-            ("1.2.3", "4.5.6", -1),
-        ],
-    )
-    def test_compare_oids(self, a: str, b: str, result: int) -> None:
-        assert StoredWalkSNMPBackend._compare_oids(a, b) == result
-
     def test_read_walk_data(self, tmpdir: Path) -> None:
         assert StoredWalkSNMPBackend.read_walk_from_path(tmpdir / "walkdata" / "1.txt") == [
             ".1.2.3 foo\n",
@@ -51,6 +41,56 @@ class TestStoredWalkSNMPBackend:
             ".1.2.5 test\n",
         ]
 
+    def test_get_index(self, tmpdir: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        backend = _stored_walk_backend(Path(tmpdir / "walkdata" / "3.txt"))
+        keys, lines = backend._get_index()
+        assert keys == [(1, 2, 1), (1, 2, 3, 2), (1, 2, 3, 10), (1, 2, 30)]
+        assert lines == [".1.2.1 foo\n", ".1.2.3.2 bar\n", ".1.2.3.10 baz\n", ".1.2.30 test\n"]
+
+        # The walk file is only read once per backend
+        monkeypatch.setattr(backend, "read_walk_data", lambda: pytest.fail("read again"))
+        assert backend._get_index() == (keys, lines)
+
+    def test_walk(self, tmpdir: Path) -> None:
+        backend = _stored_walk_backend(Path(tmpdir / "walkdata" / "3.txt"))
+        assert backend.walk(".1.2.3", context="") == [
+            (".1.2.3.2", b"bar"),
+            (".1.2.3.10", b"baz"),
+        ]
+        assert backend.walk(".1.2.3.*", context="") == [(".1.2.3.2", b"bar")]
+        assert backend.walk(".1.2", context="") == [
+            (".1.2.1", b"foo"),
+            (".1.2.3.2", b"bar"),
+            (".1.2.3.10", b"baz"),
+            (".1.2.30", b"test"),
+        ]
+        assert not backend.walk(".1.2.4", context="")
+        assert backend.get(".1.2.30", context="") == b"test"
+        assert backend.get(".1.2.3", context="") is None
+
+
+def _stored_walk_backend(path: Path) -> StoredWalkSNMPBackend:
+    return StoredWalkSNMPBackend(
+        SNMPHostConfig(
+            is_ipv6_primary=False,
+            hostname=HostName("testhost"),
+            ipaddress=HostAddress("1.2.3.4"),
+            credentials="",
+            port=42,
+            is_bulkwalk_host=False,
+            is_snmpv2or3_without_bulkwalk_host=False,
+            bulk_walk_size_of=0,
+            timing={},
+            oid_range_limits={},
+            snmpv3_contexts=[],
+            snmpv3_contexts_skip_on_timeout=False,
+            character_encoding="ascii",
+            snmp_backend=SNMPBackendEnum.STORED_WALK,
+        ),
+        logging.getLogger("test"),
+        path=path,
+    )
+
 
 @pytest.fixture
 def create_files(tmpdir):
@@ -59,3 +99,5 @@ def create_files(tmpdir):
     p1.write(".1.2.3 foo\n.1.2.4 bar\nfoobar\n")
     p2 = (tmpdir / "walkdata").join("2.txt")
     p2.write(".1.2.3 foo\n\n\n.1.2.5 test\n")
+    p3 = (tmpdir / "walkdata").join("3.txt")
+    p3.write(".1.2.1 foo\n.1.2.3.2 bar\n.1.2.3.10 baz\n.1.2.30 test\n")
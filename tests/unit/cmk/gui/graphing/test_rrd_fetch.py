@@ -61,10 +61,9 @@ def _setup_livestatus(mock_livestatus: MockLiveStatusConnection) -> Iterator[Non
         )
         mock_live.expect_query(
             """GET services
-Columns: rrddata:temp:temp.max:1681985455:1681999855:20
+Columns: host_name service_description rrddata:temp:temp.max:1681985455:1681999855:20
 Filter: host_name = my-host
 Filter: service_description = Temperature Zone 6
-ColumnHeaders: off
 
             """,
             sites=["NO_SITE"],
@@ -139,6 +138,67 @@ def test_fetch_rrd_data_for_graph_with_conversion(
         }
 
 
+def test_fetch_rrd_data_for_graph_of_many_services(
+    mock_livestatus: MockLiveStatusConnection,
+) -> None:
+    zones = ["Temperature Zone 6", "Temperature Zone 7", "Temperature Zone 8"]
+    graph_recipe = _GRAPH_RECIPE.model_copy(
+        update={
+            "metrics": [
+                _GRAPH_RECIPE.metrics[0].model_copy(
+                    update={
+                        "operation": MetricOpRRDSource(
+                            site_id=SiteId("NO_SITE"),
+                            host_name=HostName("my-host"),
+                            service_name=zone,
+                            metric_name="temp",
+                            consolidation_func_name="max",
+                            scale=1,
+                        )
+                    }
+                )
+                for zone in zones[:2]
+            ]
+        }
+    )
+    with mock_livestatus(expect_status_query=True) as mock_live:
+        mock_live.add_table(
+            "services",
+            [
+                {
+                    "host_name": "my-host",
+                    "service_description": zone,
+                    "rrddata:temp:temp.max:1681985455:1681999855:20": [1, 2, 3, 4, index, None],
+                }
+                for index, zone in enumerate(zones)
+            ],
+        )
+        mock_live.expect_query(
+            """GET services
+Columns: host_name service_description rrddata:temp:temp.max:1681985455:1681999855:20
+Filter: host_name = my-host
+Filter: service_description = Temperature Zone 6
+And: 2
+Filter: host_name = my-host
+Filter: service_description = Temperature Zone 7
+And: 2
+Or: 2
+
+            """,
+            sites=["NO_SITE"],
+        )
+        assert fetch_rrd_data_for_graph(graph_recipe, _GRAPH_DATA_RANGE, lambda _specs: ()) == {
+            ("NO_SITE", "my-host", "Temperature Zone 6", "temp", "max", 1): TimeSeries(
+                [4, 0, None],
+                time_window=(1, 2, 3),
+            ),
+            ("NO_SITE", "my-host", "Temperature Zone 7", "temp", "max", 1): TimeSeries(
+                [4, 1, None],
+                time_window=(1, 2, 3),
+            ),
+        }
+
+
 def test_translate_and_merge_rrd_columns() -> None:
     assert translate_and_merge_rrd_columns(
         MetricName("my_metric"),
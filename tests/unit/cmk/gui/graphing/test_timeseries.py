@@ -47,3 +47,36 @@ def test__time_series_math_exc(args: tuple[Operators, list[TimeSeries]]) -> None
 def test__time_series_math_stable_singles(operator: Operators) -> None:
     test_ts = TimeSeries([0, 180, 60, 6, 5, 10, None, -2, -3.14])
     assert _time_series_math(operator, [test_ts]) == test_ts
+
+
+@pytest.mark.parametrize(
+    "operator, result",
+    [
+        pytest.param("+", [4, 2, 3, None], id="Sum"),
+        pytest.param("*", [3, None, None, None], id="Product"),
+        pytest.param("-", [-2, None, None, None], id="Difference"),
+        pytest.param("/", [1 / 3, None, None, None], id="Fraction"),
+        pytest.param("MAX", [3, 2, 3, None], id="Maximum"),
+        pytest.param("MIN", [1, 2, 3, None], id="Minimum"),
+        pytest.param("AVERAGE", [2, 2, 3, None], id="Average"),
+        pytest.param("MERGE", [1, 2, 3, None], id="Merge"),
+    ],
+)
+def test__time_series_math_with_gaps(operator: Operators, result: list[float | None]) -> None:
+    assert _time_series_math(
+        operator,
+        [
+            TimeSeries([1, 2, None, None], time_window=(0, 240, 60)),
+            TimeSeries([3, None, 3, None], time_window=(0, 240, 60)),
+        ],
+    ) == TimeSeries(result, time_window=(0, 240, 60))
+
+
+def test__time_series_math_fraction_by_zero() -> None:
+    assert _time_series_math(
+        "/",
+        [
+            TimeSeries([1, 0, 2], time_window=(0, 180, 60)),
+            TimeSeries([0, 0, 4], time_window=(0, 180, 60)),
+        ],
+    ) == TimeSeries([None, None, 0.5], time_window=(0, 180, 60))
@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+# Copyright (C) 2023 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+
+import calendar
+import time
+
+import pytest
+from pytest import MonkeyPatch
+
+from livestatus import SiteId
+
+from cmk.utils.hostaddress import HostName
+
+import cmk.gui.availability as availability
+
+HOURS = 3600
+
+DAYS = 24 * HOURS
+
+MIDNIGHT = calendar.timegm((2023, 5, 1, 0, 0, 0, 0, 0, 0))
+
+
+@pytest.fixture(autouse=True)
+def fix_localaity(monkeypatch: MonkeyPatch) -> None:
+    monkeypatch.setattr(time, "localtime", time.gmtime)
+    monkeypatch.setattr(time, "mktime", calendar.timegm)
+
+
+@pytest.mark.parametrize(
+    "time_range, now, annotations, expected",
+    [
+        pytest.param(
+            (MIDNIGHT + 6 * HOURS, MIDNIGHT + 3 * DAYS + 6 * HOURS),
+            MIDNIGHT + 10 * DAYS,
+            {},
+            (
+                [
+                    (MIDNIGHT + 6 * HOURS, MIDNIGHT + DAYS),
+                    (MIDNIGHT + 3 * DAYS, MIDNIGHT + 3 * DAYS + 6 * HOURS),
+                ],
+                [
+                    (MIDNIGHT + DAYS, MIDNIGHT + 2 * DAYS),
+                    (MIDNIGHT + 2 * DAYS, MIDNIGHT + 3 * DAYS),
+                ],
+            ),
+            id="partial days at both edges",
+        ),
+        pytest.param(
+            (MIDNIGHT, MIDNIGHT + 3 * DAYS),
+            MIDNIGHT + 10 * DAYS,
+            {},
+            (
+                [(MIDNIGHT + 2 * DAYS, MIDNIGHT + 3 * DAYS)],
+                [(MIDNIGHT, MIDNIGHT + DAYS), (MIDNIGHT + DAYS, MIDNIGHT + 2 * DAYS)],
+            ),
+            id="last day is always raw",
+        ),
+        pytest.param(
+            (MIDNIGHT, MIDNIGHT + 3 * DAYS),
+            MIDNIGHT + DAYS + 12 * HOURS,
+            {},
+            (
+                [(MIDNIGHT + DAYS, MIDNIGHT + 3 * DAYS)],
+                [(MIDNIGHT, MIDNIGHT + DAYS)],
+            ),
+            id="no rollups of the future",
+        ),
+        pytest.param(
+            (MIDNIGHT, MIDNIGHT + 4 * DAYS),
+            MIDNIGHT + 10 * DAYS,
+            {
+                (SiteId("heute"), HostName("heute"), None): [
+                    {"from": MIDNIGHT + DAYS + HOURS, "until": MIDNIGHT + DAYS + 2 * HOURS},
+                ]
+            },
+            (
+                [
+                    (MIDNIGHT + DAYS, MIDNIGHT + 2 * DAYS),
+                    (MIDNIGHT + 3 * DAYS, MIDNIGHT + 4 * DAYS),
+                ],
+                [(MIDNIGHT, MIDNIGHT + DAYS), (MIDNIGHT + 2 * DAYS, MIDNIGHT + 3 * DAYS)],
+            ),
+            id="annotated days are raw",
+        ),
+        pytest.param(
+            (MIDNIGHT + HOURS, MIDNIGHT + 2 * HOURS),
+            MIDNIGHT + 10 * DAYS,
+            {},
+            ([(MIDNIGHT + HOURS, MIDNIGHT + 2 * HOURS)], []),
+            id="within one day",
+        ),
+    ],
+)
+def test_split_time_range_for_rollups(
+    time_range: availability.AVTimeRange,
+    now: float,
+    annotations: availability.AVAnnotations,
+    expected: tuple[list[availability.AVTimeRange], list[availability.AVTimeRange]],
+) -> None:
+    assert availability.split_time_range_for_rollups(time_range, now, annotations) == expected
+
+
+def _span(service: str, from_time: float, until_time: float, state: int) -> availability.AVSpan:
+    return {
+        "site": "heute",
+        "host_name": "heute",
+        "service_description": service,
+        "duration": until_time - from_time,
+        "from": from_time,
+        "until": until_time,
+        "state": state,
+        "host_down": 0,
+        "in_downtime": 0,
+        "in_host_downtime": 0,
+        "in_notification_period": 1,
+        "in_service_period": 1,
+        "is_flapping": 0,
+        "service_display_name": service.upper(),
+    }
+
+
+def test_get_availability_rollup_spans(monkeypatch: MonkeyPatch) -> None:
+    rollup_days: list[availability.AVTimeRange] = [
+        (MIDNIGHT, MIDNIGHT + DAYS),
+        (MIDNIGHT + DAYS, MIDNIGHT + 2 * DAYS),
+    ]
+    computed: list[tuple[list[SiteId], availability.AVTimeRange]] = []
+
+    def compute_availability_rollups(
+        what: availability.AVObjectType,
+        site_ids: list[SiteId],
+        rollup_day: availability.AVTimeRange,
+        timelimit: int,
+    ) -> dict[SiteId, availability.AVRollup]:
+        computed.append((site_ids, rollup_day))
+        return {
+            SiteId("heute"): {
+                (HostName("heute"), "CPU load", 0, 0, 0, 0, 1, 1, 0): 20 * HOURS,
+                (HostName("heute"), "CPU load", 2, 0, 0, 0, 1, 1, 0): 4 * HOURS,
+                (HostName("heute"), "Removed", 0, 0, 0, 0, 1, 1, 0): DAYS,
+            }
+        }
+
+    monkeypatch.setattr(availability, "compute_availability_rollups", compute_availability_rollups)
+
+    raw_spans = [_span("CPU load", MIDNIGHT + 2 * DAYS, MIDNIGHT + 2 * DAYS + HOURS, 1)]
+    for _ in range(2):
+        rollup_spans = availability.get_availability_rollup_spans(
+            "service", raw_spans, rollup_days, 30
+        )
+        assert rollup_spans == [
+            _span("CPU load", MIDNIGHT, MIDNIGHT + 2 * DAYS, 0) | {"duration": 40 * HOURS},
+            _span("CPU load", MIDNIGHT, MIDNIGHT + 2 * DAYS, 2) | {"duration": 8 * HOURS},
+        ]
+
+    # The rollups have been persisted during the first run
+    assert computed == [([SiteId("heute")], rollup_day) for rollup_day in rollup_days]
+
+
+def test_compute_availability_with_rollup_spans() -> None:
+    avoptions = availability.get_default_avoptions((MIDNIGHT, MIDNIGHT + 2 * DAYS))
+    raw_spans = [
+        _span("CPU load", MIDNIGHT, MIDNIGHT + 3 * HOURS, 0),
+        _span("CPU load", MIDNIGHT + 3 * HOURS, MIDNIGHT + 7 * HOURS, 2),
+        _span("CPU load", MIDNIGHT + 7 * HOURS, MIDNIGHT + DAYS + 3 * HOURS, 0),
+        _span("CPU load", MIDNIGHT + DAYS + 3 * HOURS, MIDNIGHT + 2 * DAYS, 1),
+    ]
+    rolled_up_spans = [
+        _span("CPU load", MIDNIGHT, MIDNIGHT + DAYS, 0) | {"duration": 20 * HOURS},
+        _span("CPU load", MIDNIGHT, MIDNIGHT + DAYS, 2) | {"duration": 4 * HOURS},
+        _span("CPU load", MIDNIGHT + DAYS, MIDNIGHT + DAYS + 3 * HOURS, 0),
+        _span("CPU load", MIDNIGHT + DAYS + 3 * HOURS, MIDNIGHT + 2 * DAYS, 1),
+    ]
+
+    def availability_of(spans: list[availability.AVSpan]) -> list[tuple[object, ...]]:
+        return [
+            (entry["states"], entry["considered_duration"], entry["total_duration"])
+            for entry in availability.compute_availability(
+                "service", availability.spans_by_object(spans), avoptions
+            )
+        ]
+
+    assert availability_of(rolled_up_spans) == availability_of(raw_spans)
+
+
+def test_compute_availability_with_rollup_spans_around_annotated_day(
+    monkeypatch: MonkeyPatch,
+) -> None:
+    time_range = (MIDNIGHT, MIDNIGHT + 4 * DAYS)
+    annotations: availability.AVAnnotations = {
+        (SiteId("heute"), HostName("heute"), "CPU load"): [
+            {
+                "from": MIDNIGHT + DAYS + HOURS,
+                "until": MIDNIGHT + DAYS + 2 * HOURS,
+                "downtime": True,
+            }
+        ]
+    }
+    monkeypatch.setattr(availability, "load_annotations", lambda lock=False: annotations)
+
+    def compute_availability_rollups(
+        what: availability.AVObjectType,
+        site_ids: list[SiteId],
+        rollup_day: availability.AVTimeRange,
+        timelimit: int,
+    ) -> dict[SiteId, availability.AVRollup]:
+        return {
+            SiteId("heute"): {
+                (HostName("heute"), "CPU load", 0, 0, 0, 0, 1, 1, 0): 20 * HOURS,
+                (HostName("heute"), "CPU load", 2, 0, 0, 0, 1, 1, 0): 4 * HOURS,
+            }
+        }
+
+    monkeypatch.setattr(availability, "compute_availability_rollups", compute_availability_rollups)
+
+    raw_spans = [
+        _span("CPU load", day_start, day_start + 20 * HOURS, 0)
+        for day_start in (MIDNIGHT, MIDNIGHT + DAYS, MIDNIGHT + 2 * DAYS)
+    ] + [
+        _span("CPU load", day_start + 20 * HOURS, day_start + DAYS, 2)
+        for day_start in (MIDNIGHT, MIDNIGHT + DAYS, MIDNIGHT + 2 * DAYS)
+    ]
+    raw_spans.append(_span("CPU load", MIDNIGHT + 3 * DAYS, MIDNIGHT + 4 * DAYS, 1))
+
+    raw_time_ranges, rollup_days = availability.split_time_range_for_rollups(
+        time_range, MIDNIGHT + 10 * DAYS, annotations
+    )
+    assert rollup_days == [(MIDNIGHT, MIDNIGHT + DAYS), (MIDNIGHT + 2 * DAYS, MIDNIGHT + 3 * DAYS)]
+    queried_spans = [
+        span
+        for span in raw_spans
+        if any(from_time <= span["from"] < until_time for from_time, until_time in raw_time_ranges)
+    ]
+    rolled_up_spans = queried_spans + availability.get_availability_rollup_spans(
+        "service", queried_spans, rollup_days, 30
+    )
+    # No rollup span covers the annotated day
+    assert all(
+        span["until"] <= MIDNIGHT + DAYS or span["from"] >= MIDNIGHT + 2 * DAYS
+        for span in rolled_up_spans
+        if span["duration"] != span["until"] - span["from"]
+    )
+
+    avoptions = availability.get_default_avoptions(time_range)
+
+    def availability_of(spans: list[availability.AVSpan]) -> list[tuple[object, ...]]:
+        return [
+            (entry["states"], entry["considered_duration"], entry["total_duration"])
+            for entry in availability.compute_availability(
+                "service", availability.spans_by_object(spans), avoptions
+            )
+        ]
+
+    assert availability_of(rolled_up_spans) == availability_of(raw_spans)
@@ -4,6 +4,7 @@
 # conditions defined in the file COPYING, which is part of this source code package.
 
 
+import numpy as np
 import pytest
 
 from cmk.gui.time_series import rrd_timestamps, TimeSeries, TimeSeriesValues, TimeWindow
@@ -101,3 +102,9 @@ class TestTimeseries:
             ).count(None)
             == 2
         )
+
+    def test_array_round_trip(self) -> None:
+        ts = TimeSeries([1, 2, 3, 4, None, 5.5])
+        array = ts.to_array()
+        assert np.isnan(array[1])
+        assert TimeSeries.from_array(array, ts.twindow) == ts
@@ -1229,6 +1229,7 @@ def test_grouped_rulespecs() -> None:
             "bulkwalk_hosts",
             "management_bulkwalk_hosts",
             "snmp_bulk_size",
+            "snmp_batch_table_walks",
             "snmp_without_sys_descr",
             "snmpv2c_hosts",
             "snmpv3_contexts",
@@ -104,6 +104,7 @@ def test_registered_configvars() -> None:
         "enable_sounds",
         "escape_plugin_output",
         "event_limit",
+        "event_queue_len",
         "eventsocket_queue_len",
         "failed_notification_horizon",
         "hard_query_limit",
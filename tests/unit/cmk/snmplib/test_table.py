@@ -226,3 +226,44 @@ def test_walk_raises_on_timeout_without_snmpv3_context_skip_on_timeout() -> None
 
     # pylint: disable=unidiomatic-typecheck
     assert type(excinfo.value) is SNMPContextTimeout
+
+
+def test_get_snmp_table_with_batched_table_walk() -> None:
+    class Backend(SNMPBackend):
+        def __init__(self, *args: object, **kw: object) -> None:
+            super().__init__(*args, **kw)  # type: ignore[arg-type]
+            self.walked: list[str] = []
+
+        def get(self, /, *args: object, **kw: object) -> NoReturn:
+            assert False
+
+        def walk(self, /, oid, *, context, **kw):
+            self.walked.append(oid)
+            rows = [
+                (".1.2.3.1.1", b"if1"),
+                (".1.2.3.1.2", b"if2"),
+                (".1.2.3.2.1", b"up"),
+                (".1.2.3.2.2", b"down"),
+                (".1.2.3.4.1", b"unused"),
+            ]
+            return [(o, v) for o, v in rows if o.startswith(f"{oid}.")]
+
+    backend = Backend(SNMPConfig._replace(batch_table_walks=True), logger)
+    walk_cache: dict[str, tuple[bool, list[tuple[str, bytes]]]] = {}
+    assert get_snmp_table(
+        section_name=SectionName("unit_test"),
+        tree=BackendSNMPTree(
+            base=".1.2.3",
+            oids=[
+                BackendOIDSpec(SpecialColumn.END, "string", False),
+                BackendOIDSpec("1", "string", True),
+                BackendOIDSpec("2", "string", False),
+                BackendOIDSpec("3", "string", False),
+            ],
+        ),
+        walk_cache=walk_cache,
+        backend=backend,
+    ) == [["1", "if1", "up", ""], ["2", "if2", "down", ""]]
+    # One walk for the table, the column missing in the table is walked separately.
+    assert backend.walked == [".1.2.3", ".1.2.3.3"]
+    assert walk_cache[".1.2.3.1"] == (True, [(".1.2.3.1.1", b"if1"), (".1.2.3.1.2", b"if2")])
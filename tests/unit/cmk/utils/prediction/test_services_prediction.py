@@ -11,6 +11,7 @@ from tests.testlib import repo_path
 
 from livestatus import RRDResponse
 
+from cmk.utils.hostaddress import HostName
 from cmk.utils.prediction import _prediction
 
 
@@ -206,3 +207,27 @@ def test_calculate_data_for_prediction(
     assert len(expected_reference.points) == len(data_for_pred.points)
     for cal, ref in zip(data_for_pred.points, expected_reference.points):
         assert cal == pytest.approx(ref, rel=1e-12, abs=1e-12)
+
+
+def test_get_rrd_data_fetches_all_time_ranges_at_once(monkeypatch: pytest.MonkeyPatch) -> None:
+    time_windows = [(1531612800, 1531699200), (1531008000, 1531094400)]
+    queried_time_ranges = []
+
+    def fake_get_rrd_data_of_time_ranges(
+        _connection: object,
+        _host_name: str,
+        _service_description: str,
+        _rpn: str,
+        time_ranges: list[tuple[int, int]],
+    ) -> list[RRDResponse]:
+        queried_time_ranges.append(time_ranges)
+        return [_load_fake_rrd_response(start, end) for start, end in time_ranges]
+
+    monkeypatch.setattr(
+        _prediction.livestatus, "get_rrd_data_of_time_ranges", fake_get_rrd_data_of_time_ranges
+    )
+
+    assert _prediction.get_rrd_data_with_mk_general_exception(
+        HostName("test-prediction"), "CPU load", "load15", time_windows
+    ) == [_load_fake_rrd_response(start, end) for start, end in time_windows]
+    assert queried_time_ranges == [time_windows]
@@ -4,7 +4,9 @@
 # conditions defined in the file COPYING, which is part of this source code package.
 
 import gzip
+import os
 import shutil
+import struct
 from collections.abc import Iterable, Mapping, Sequence
 from pathlib import Path
 from typing import Literal
@@ -28,6 +30,7 @@ from cmk.utils.structured_data import (
     SDNodeName,
     SDPath,
     SDRetentionFilterChoices,
+    TreeOrArchiveStore,
     TreeStore,
     UpdateResult,
 )
@@ -834,6 +837,159 @@ def test_save_tree(tmp_path: Path) -> None:
         f.read()
 
 
+def test_save_tree_indexed(tmp_path: Path) -> None:
+    host_name = HostName("heute")
+    tree = MutableTree()
+    tree.add(path=("path-to", "node"), pairs=[{"foo": 1, "bär": 2}])
+    tree.add(path=("path-to", "node", "sub"), key_columns=["k"], rows=[{"k": "a", "v": 3}])
+    tree.add(path=("path-to", "another"), pairs=[{"foo": 3}])
+    tree.add(path=("path-to-another",), pairs=[{"foo": 4}])
+    tree_store = TreeStore(tmp_path / "inventory")
+    tree_store.save(host_name=host_name, tree=tree)
+
+    assert (tmp_path / "inventory" / "heute.indexed").exists()
+    assert tree_store.load(host_name=host_name) == tree
+
+    subtree = tree_store.load(host_name=host_name, path=("path-to", "node"))
+    assert list(subtree.nodes_by_name) == ["path-to"]
+    assert list(subtree.get_tree(("path-to",)).nodes_by_name) == ["node"]
+    assert subtree.get_tree(("path-to", "node")) == tree.get_tree(("path-to", "node"))
+    assert subtree.get_tree(("path-to", "node", "sub")).path == ("path-to", "node", "sub")
+    assert subtree.get_rows(("path-to", "node", "sub")) == [{"k": "a", "v": 3}]
+
+    assert not tree_store.load(host_name=host_name, path=("unknown",))
+
+
+def test_load_subtree_without_index(tmp_path: Path) -> None:
+    host_name = HostName("heute")
+    tree = MutableTree()
+    tree.add(path=("path-to", "node"), pairs=[{"foo": 1}])
+    tree.add(path=("path-to", "another"), pairs=[{"foo": 2}])
+    tree_store = TreeStore(tmp_path / "inventory")
+    tree_store.save(host_name=host_name, tree=tree)
+    (tmp_path / "inventory" / "heute.indexed").unlink()
+
+    assert tree_store.load(host_name=host_name) == tree
+    subtree = tree_store.load(host_name=host_name, path=("path-to", "node"))
+    assert list(subtree.get_tree(("path-to",)).nodes_by_name) == ["node"]
+    assert subtree.get_attribute(("path-to", "node"), "foo") == 1
+
+
+def test_load_tree_ignores_outdated_index(tmp_path: Path) -> None:
+    host_name = HostName("heute")
+    tree = MutableTree()
+    tree.add(path=("path-to", "node"), pairs=[{"foo": 1}])
+    tree_store = TreeStore(tmp_path / "inventory")
+    tree_store.save(host_name=host_name, tree=tree)
+
+    tree_filepath = tmp_path / "inventory" / "heute"
+    tree_filepath.write_text(repr({"Attributes": {}, "Table": {}, "Nodes": {}}) + "\n")
+    indexed_filepath = tmp_path / "inventory" / "heute.indexed"
+    mtime_ns = tree_filepath.stat().st_mtime_ns
+    os.utime(indexed_filepath, ns=(mtime_ns - 10**9, mtime_ns - 10**9))
+
+    assert not tree_store.load(host_name=host_name)
+
+
+def _save_and_archive(
+    tree_or_archive_store: TreeOrArchiveStore, tree_dir: Path, value: int, timestamp: int
+) -> None:
+    tree = MutableTree()
+    tree.add(path=("path-to", "node"), pairs=[{"value": value}])
+    tree_or_archive_store.save(host_name=HostName("heute"), tree=tree)
+    os.utime(tree_dir / "heute", (timestamp, timestamp))
+    tree_or_archive_store.archive(host_name=HostName("heute"))
+
+
+def test_archive_records_deltas(tmp_path: Path) -> None:
+    host_name = HostName("heute")
+    tree_or_archive_store = TreeOrArchiveStore(tmp_path / "inventory", tmp_path / "archive")
+    for timestamp in range(1, 26):
+        _save_and_archive(tree_or_archive_store, tmp_path / "inventory", timestamp, timestamp)
+
+    # First tree, keyframe and latest tree
+    assert sorted(
+        int(fp.name) for fp in (tmp_path / "archive" / "heute").iterdir() if fp.name.isdigit()
+    ) == [1, 21, 25]
+    assert tree_or_archive_store.get_history_timestamps(host_name=host_name) == list(range(1, 26))
+    assert (
+        tree_or_archive_store.load_previous(host_name=host_name).get_attribute(
+            ("path-to", "node"), "value"
+        )
+        == 25
+    )
+
+    history_deltas = tree_or_archive_store.load_history_deltas(host_name=host_name)
+    assert [(d.previous_timestamp, d.timestamp) for d in history_deltas] == [(None, 1)] + [
+        (t - 1, t) for t in range(2, 26)
+    ]
+    assert history_deltas[0].delta_tree.get_tree(("path-to", "node")).attributes.pairs == {
+        "value": (None, 1)
+    }
+    assert history_deltas[9].delta_tree.get_tree(("path-to", "node")).attributes.pairs == {
+        "value": (9, 10)
+    }
+
+
+def test_load_history_deltas_of_time_range(tmp_path: Path) -> None:
+    host_name = HostName("heute")
+    tree_or_archive_store = TreeOrArchiveStore(tmp_path / "inventory", tmp_path / "archive")
+    for timestamp in range(1, 6):
+        _save_and_archive(tree_or_archive_store, tmp_path / "inventory", timestamp, timestamp * 10)
+
+    assert [
+        d.timestamp
+        for d in tree_or_archive_store.load_history_deltas(
+            host_name=host_name, from_timestamp=20, until_timestamp=40
+        )
+    ] == [20, 30, 40]
+    assert not tree_or_archive_store.load_history_deltas(host_name=HostName("unknown"))
+
+
+def test_archive_drops_incomplete_delta_record(tmp_path: Path) -> None:
+    host_name = HostName("heute")
+    tree_or_archive_store = TreeOrArchiveStore(tmp_path / "inventory", tmp_path / "archive")
+    for timestamp in (1, 2):
+        _save_and_archive(tree_or_archive_store, tmp_path / "inventory", timestamp, timestamp)
+
+    # Simulate an interrupted write of the record of the third tree
+    deltas_file = tmp_path / "archive" / "heute" / "deltas"
+    complete = deltas_file.read_bytes()
+    deltas_file.write_bytes(complete + struct.pack("!qI", 3, 100) + b"partial")
+    assert tree_or_archive_store.get_history_timestamps(host_name=host_name) == [1, 2]
+
+    _save_and_archive(tree_or_archive_store, tmp_path / "inventory", 4, 4)
+
+    assert deltas_file.read_bytes().startswith(complete)
+    assert [
+        (d.previous_timestamp, d.timestamp)
+        for d in tree_or_archive_store.load_history_deltas(host_name=host_name)
+    ] == [(None, 1), (1, 2), (2, 4)]
+
+
+def test_archive_keeps_legacy_archive(tmp_path: Path) -> None:
+    host_name = HostName("heute")
+    tree_or_archive_store = TreeOrArchiveStore(tmp_path / "inventory", tmp_path / "archive")
+    for timestamp in (1, 2):
+        tree = MutableTree()
+        tree.add(path=("path-to", "node"), pairs=[{"value": timestamp}])
+        (archive_host_dir := tmp_path / "archive" / "heute").mkdir(parents=True, exist_ok=True)
+        (archive_host_dir / str(timestamp)).write_text(repr(tree.serialize()))
+
+    _save_and_archive(tree_or_archive_store, tmp_path / "inventory", 3, 3)
+    _save_and_archive(tree_or_archive_store, tmp_path / "inventory", 4, 4)
+
+    assert sorted(int(fp.name) for fp in archive_host_dir.iterdir() if fp.name.isdigit()) == [
+        1,
+        2,
+        4,
+    ]
+    assert [
+        (d.previous_timestamp, d.timestamp)
+        for d in tree_or_archive_store.load_history_deltas(host_name=host_name)
+    ] == [(2, 3), (3, 4)]
+
+
 @pytest.mark.parametrize(
     "tree_name",
     [
@@ -397,6 +397,154 @@ def test_get_source_and_piggyback_hosts() -> None:
     )
 
 
+@pytest.mark.usefixtures("setup_files")
+def test_store_piggyback_raw_data_indexes_previous_files() -> None:
+    piggyback.store_piggyback_raw_data(
+        HostName("source1"),
+        {HostName("pig"): [b"<<<check_mk>>>", b"lulu"]},
+    )
+
+    source_index = piggyback._load_source_index(
+        piggyback._get_source_index_file_path(HostName("source1"))
+    )
+    assert source_index is not None
+    assert sorted(source_index) == ["pig", "test-host"]
+    assert source_index[_TEST_HOST_NAME] == _REF_TIME
+
+
+def test_get_source_and_piggyback_hosts_from_source_index(monkeypatch: MonkeyPatch) -> None:
+    piggyback.store_piggyback_raw_data(
+        HostName("source1"),
+        {
+            HostName("test-host"): [b"<<<check_mk>>>", b"source1"],
+            HostName("test-host2"): [b"<<<check_mk>>>", b"source1"],
+        },
+    )
+
+    def _no_search() -> None:
+        raise AssertionError("piggyback folders searched")
+
+    monkeypatch.setattr(piggyback, "_get_piggybacked_host_folders", _no_search)
+
+    assert sorted(
+        piggyback.get_source_and_piggyback_hosts(
+            [(None, "max_cache_age", _PIGGYBACK_MAX_CACHEFILE_AGE)]
+        )
+    ) == [
+        (HostName("source1"), HostName("test-host")),
+        (HostName("source1"), HostName("test-host2")),
+    ]
+
+
+def test_rename_host_in_piggyback_indexes(monkeypatch: MonkeyPatch) -> None:
+    monkeypatch.setattr(piggyback, "_SEGMENT_MIN_HOSTS", 2)
+    time_settings: piggyback.PiggybackTimeSettings = [
+        (None, "max_cache_age", _PIGGYBACK_MAX_CACHEFILE_AGE)
+    ]
+    piggyback.store_piggyback_raw_data(
+        HostName("source1"),
+        {
+            HostName("old-host"): [b"<<<check_mk>>>", b"old-host"],
+            HostName("test-host"): [b"<<<check_mk>>>", b"test-host"],
+        },
+    )
+    piggyback.store_piggyback_raw_data(
+        HostName("old-host"),
+        {HostName("test-host2"): [b"<<<check_mk>>>", b"old-host"]},
+    )
+
+    # Done by the host renaming before
+    piggyback_dir = cmk.utils.paths.piggyback_dir
+    (piggyback_dir / "old-host").rename(piggyback_dir / "new-host")
+    (piggyback_dir / "test-host2" / "old-host").rename(piggyback_dir / "test-host2" / "new-host")
+
+    assert piggyback.rename_host_in_piggyback_indexes(HostName("old-host"), HostName("new-host"))
+    assert not piggyback.rename_host_in_piggyback_indexes(
+        HostName("old-host"), HostName("new-host")
+    )
+
+    def _no_search() -> None:
+        raise AssertionError("piggyback folders searched")
+
+    monkeypatch.setattr(piggyback, "_get_piggybacked_host_folders", _no_search)
+
+    assert sorted(piggyback.get_source_and_piggyback_hosts(time_settings)) == [
+        (HostName("new-host"), HostName("test-host2")),
+        (HostName("source1"), HostName("new-host")),
+        (HostName("source1"), HostName("test-host")),
+    ]
+    assert _get_only_raw_data_element(HostName("new-host"), time_settings).raw_data == (
+        b"<<<check_mk>>>\nold-host\n"
+    )
+    assert _get_only_raw_data_element(HostName("test-host"), time_settings).raw_data == (
+        b"<<<check_mk>>>\ntest-host\n"
+    )
+
+
+def test_cleanup_piggyback_files_removes_from_source_index() -> None:
+    piggyback.store_piggyback_raw_data(
+        HostName("source1"),
+        {HostName("test-host"): [b"<<<check_mk>>>", b"source1"]},
+    )
+    source_index_file_path = piggyback._get_source_index_file_path(HostName("source1"))
+    assert source_index_file_path.exists()
+
+    piggyback.cleanup_piggyback_files([(None, "max_cache_age", -1)])
+
+    assert not source_index_file_path.exists()
+    assert not list(cmk.utils.paths.piggyback_dir.glob("*"))
+    assert not piggyback.get_piggyback_raw_data(
+        HostName("test-host"), [(None, "max_cache_age", _PIGGYBACK_MAX_CACHEFILE_AGE)]
+    )
+
+
+@pytest.mark.usefixtures("setup_files")
+def test_store_piggyback_raw_data_as_segment(monkeypatch: MonkeyPatch) -> None:
+    monkeypatch.setattr(piggyback, "_SEGMENT_MIN_HOSTS", 2)
+    time_settings: piggyback.PiggybackTimeSettings = [
+        (None, "max_cache_age", _PIGGYBACK_MAX_CACHEFILE_AGE),
+    ]
+
+    piggyback.store_piggyback_raw_data(
+        HostName("source2"),
+        {
+            _TEST_HOST_NAME: [b"<<<check_mk>>>", b"lulu"],
+            HostName("test-host2"): [b"<<<check_mk>>>", b"lala"],
+        },
+    )
+
+    file_stats = [
+        (cmk.utils.paths.piggyback_dir / piggybacked_hostname / "source2").stat()
+        for piggybacked_hostname in (_TEST_HOST_NAME, "test-host2")
+    ]
+    assert file_stats[0].st_ino == file_stats[1].st_ino
+    assert not list(cmk.utils.paths.piggyback_dir.glob(".*"))
+
+    raw_data_map = {
+        rd.info.source_hostname: rd
+        for rd in piggyback.get_piggyback_raw_data(_TEST_HOST_NAME, time_settings)
+    }
+    assert raw_data_map[HostName("source1")].raw_data == _PAYLOAD
+    assert raw_data_map[HostName("source2")].info.successfully_processed is True
+    assert raw_data_map[HostName("source2")].raw_data == b"<<<check_mk>>>\nlulu\n"
+    assert _get_only_raw_data_element(HostName("test-host2"), time_settings).raw_data == (
+        b"<<<check_mk>>>\nlala\n"
+    )
+
+    # A following run only replaces the files of its own piggybacked hosts
+    piggyback.store_piggyback_raw_data(
+        HostName("source2"),
+        {HostName("test-host2"): [b"<<<check_mk>>>", b"lili"]},
+    )
+    assert {
+        rd.info.source_hostname: rd.raw_data
+        for rd in piggyback.get_piggyback_raw_data(_TEST_HOST_NAME, time_settings)
+    }[HostName("source2")] == b"<<<check_mk>>>\nlulu\n"
+    assert _get_only_raw_data_element(HostName("test-host2"), time_settings).raw_data == (
+        b"<<<check_mk>>>\nlili\n"
+    )
+
+
 @pytest.mark.parametrize(
     "time_settings, successfully_processed, reason, reason_status",
     [
@@ -5,9 +5,12 @@
 
 # pylint: disable=redefined-outer-name
 
+import ast
 import errno
 import socket
 import ssl
+import threading
+import time
 from collections.abc import Sequence
 from contextlib import closing
 from pathlib import Path
@@ -75,6 +78,21 @@ def test_quote_dict(inp: str, expected_result: str) -> None:
     assert result == expected_result
 
 
+@pytest.mark.parametrize(
+    "data",
+    [
+        "[]\n",
+        '[["host",0,1.5e+09,None,[],{"a":None}],\n["None None",-1,2,[None],["x"],{}]]\n',
+        '[["\\u0022None\\u0022 \\u005c\\u00e4\\u000a"]]\n',
+        '[["\\U0001f600",None]]\n',
+        '[[b"\\x00\\xffNone",None]]\n',
+        "[['python repr', \"it's None\", None]]",
+    ],
+)
+def test_decode_python3(data: str) -> None:
+    assert livestatus._decode_python3(data) == ast.literal_eval(data)
+
+
 def test_livestatus_local_connection_omd_root_not_set(
     monkeypatch: MonkeyPatch, tmp_path: Path
 ) -> None:
@@ -111,6 +129,56 @@ def test_livestatus_local_connection(sock_path: Path) -> None:
     assert isinstance(live, livestatus.SingleSiteConnection)
 
 
+def _serve_livestatus(sock: socket.socket, chunks: Sequence[bytes], delay: float) -> None:
+    """Answer a single query with a response sent in chunks"""
+    conn, _addr = sock.accept()
+    with conn:
+        data = b""
+        while not data.endswith(b"\n\n"):
+            data += conn.recv(4096)
+        for chunk in chunks:
+            time.sleep(delay)
+            conn.sendall(chunk)
+        time.sleep(0.5)
+
+
+def test_multisite_connection_receives_in_parallel(tmp_path: Path) -> None:
+    bodies = {
+        "slow": b'[["slow", 1]]\n',
+        "fast": b'[["fast", 1], ["fast", 2]]\n',
+    }
+    sites = {}
+    threads = []
+    for site_id, body in bodies.items():
+        sock = socket.socket(socket.AF_UNIX)
+        sock.bind(str(tmp_path / site_id))
+        sock.listen(1)
+        response = b"200 %11d\n" % len(body) + body
+        chunks = [response[:10], response[10:20], response[20:]]
+        threads.append(
+            threading.Thread(
+                target=_serve_livestatus, args=(sock, chunks, 0.1 if site_id == "slow" else 0.0)
+            )
+        )
+        sites[livestatus.SiteId(site_id)] = livestatus.SiteConfiguration(
+            socket=f"unix:{tmp_path / site_id}"
+        )
+    for thread in threads:
+        thread.start()
+
+    live = livestatus.MultiSiteConnection(livestatus.SiteConfigurations(sites))
+    live.set_prepend_site(True)
+    assert list(live.iter_query("GET services\nColumns: description id\n")) == [
+        ["fast", "fast", 1],
+        ["fast", "fast", 2],
+        ["slow", "slow", 1],
+    ]
+    assert not live.dead_sites()
+    assert [site.id for site in live.connections] == ["slow", "fast"]
+    for thread in threads:
+        thread.join()
+
+
 def test_livestatus_ipv4_connection() -> None:
     with closing(socket.socket(socket.AF_INET)) as sock:
         sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)